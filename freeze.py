@@ -28,6 +28,10 @@ bdist_msi_options = {
     # generated with str(uuid.uuid3(uuid.NAMESPACE_DNS, 'io.github.dummerle.rare')).upper()
     'upgrade_code': '{85D9FCC2-733E-3D74-8DD4-8FE33A07ADF8}'
 }
+build_exe_options = {
+    # lk: the rcc bundle is loaded from next to the resources package, it isn't imported
+    "include_files": [("rare/resources/resources.rcc", "lib/rare/resources/resources.rcc")],
+}
 base = "Win32GUI"
 
 exe = Executable(
@@ -43,6 +47,7 @@ setup(
     author=author,
     description=description,
     options={
+        "build_exe": build_exe_options,
         "bdist_msi": bdist_msi_options,
     },
     executables=[exe]
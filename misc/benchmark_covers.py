@@ -0,0 +1,50 @@
+"""
+Measure the throughput of cover conversion, serially and through the conversion process pool.
+
+Usage: python misc/benchmark_covers.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent import futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from rare.utils.image_convert import convert_cover, conversion_pool  # noqa: E402
+
+IMG_TYPES = ("DieselGameBoxTall", "Thumbnail", "DieselGameBoxLogo", "OfferImageTall")
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), "../rare/resources/images/")
+
+
+def main(count: int) -> None:
+    images = dict(zip(IMG_TYPES, [None] * len(IMG_TYPES)))
+    with open(os.path.join(IMAGES_DIR, "cover.png"), "rb") as f:
+        images["DieselGameBoxTall"] = f.read()
+    with open(os.path.join(IMAGES_DIR, "Rare_nonsquared.png"), "rb") as f:
+        images["DieselGameBoxLogo"] = f.read()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        icons = [os.path.join(tmp, f"icon_{i}.png") for i in range(count)]
+
+        start = time.perf_counter()
+        for icon in icons:
+            convert_cover(images, IMG_TYPES, icon, "PNG")
+        serial = time.perf_counter() - start
+        print(f"serial:  {count} covers in {serial:.2f}s, {count / serial:.1f} covers/s")
+
+        with conversion_pool() as pool:
+            # lk: spawn the workers before timing, the library population reuses them for every cover
+            list(pool.map(int, range(os.cpu_count())))
+            start = time.perf_counter()
+            for conversion in futures.as_completed(
+                [pool.submit(convert_cover, images, IMG_TYPES, icon, "PNG") for icon in icons]
+            ):
+                conversion.result()
+            pooled = time.perf_counter() - start
+        print(f"pooled:  {count} covers in {pooled:.2f}s, {count / pooled:.1f} covers/s ({os.cpu_count()} processes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
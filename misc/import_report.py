@@ -0,0 +1,80 @@
+"""
+Report the time spent importing Rare's modules at startup, aggregated per package.
+
+Runs the imports in a fresh interpreter with `-X importtime` and sums the self time of
+every module into its package, `depth` levels below `rare`. Third-party modules are
+summed into their top level package.
+
+Usage: python misc/import_report.py [--module rare.components] [--depth 3] [--limit MS]
+
+With `--limit` the script exits with an error if the total import time exceeds it.
+"""
+
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser
+from collections import defaultdict
+from typing import Dict, Tuple
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def measure(module: str) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us = int(fields[0])
+        except ValueError:
+            continue
+        times[fields[2].strip()] = self_us
+    return times
+
+
+def aggregate(times: Dict[str, int], depth: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+    packages = defaultdict(int)
+    counts = defaultdict(int)
+    for name, self_us in times.items():
+        parts = name.split(".")
+        package = ".".join(parts[:depth]) if parts[0] == "rare" else parts[0]
+        packages[package] += self_us
+        counts[package] += 1
+    return packages, counts
+
+
+def main() -> int:
+    parser = ArgumentParser()
+    parser.add_argument("--module", default="rare.components", help="Module to import")
+    parser.add_argument("--depth", type=int, default=3, help="Package depth to aggregate Rare modules at")
+    parser.add_argument("--limit", type=float, default=None, help="Fail if the total exceeds this many ms")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages to list")
+    args = parser.parse_args()
+
+    times = measure(args.module)
+    packages, counts = aggregate(times, args.depth)
+    total = sum(times.values()) / 1000
+    rare_total = sum(us for name, us in packages.items() if name.startswith("rare")) / 1000
+
+    print(f"{'package':<48} {'modules':>8} {'ms':>10}")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<48} {counts[package]:>8} {self_us / 1000:>10.1f}")
+    print(f"{'rare (all)':<48} {'':>8} {rare_total:>10.1f}")
+    print(f"{'total':<48} {len(times):>8} {total:>10.1f}")
+
+    if args.limit is not None and total > args.limit:
+        print(f"Importing {args.module} took {total:.1f} ms, more than the limit of {args.limit:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,7 @@ python -m nuitka \
 --include-package-data=qtawesome \
 --include-data-dir=rare/resources/images=rare/resources/images \
 --include-data-files=rare/resources/languages=rare/resources/languages="*.qm" \
+--include-data-files=rare/resources/resources.rcc=rare/resources/resources.rcc \
 --windows-icon-from-ico=rare/resources/images/Rare.ico \
 --windows-company-name=Rare \
 --windows-product-name=Rare \
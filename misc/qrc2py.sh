@@ -25,6 +25,7 @@ then
   pyrcc5 -compress 6 \
       rare/resources/resources.qrc \
       -o rare/resources/resources.py
+  python misc/qrc2rcc.py
 fi
 
 if [[ $(git diff --name-only HEAD "rare/resources/stylesheets/RareStyle/") ]]
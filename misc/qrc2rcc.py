@@ -0,0 +1,130 @@
+"""
+Compile Rare's main resources into a binary resource bundle, `rare/resources/resources.rcc`.
+
+Qt maps the bundle into memory when it is registered, instead of keeping a copy of the data
+inside a Python module, which is what `resources.py` does. `rare.resources` falls back to
+`resources.py` if the bundle is missing.
+
+pyrcc5 can only emit Python, so the qrc is compiled with it and the bundle is assembled
+from the data, name and tree blobs of the generated module, which are the same blobs
+`rcc -binary` writes after its header.
+
+Usage: python misc/qrc2rcc.py [--measure]
+
+With `--measure` the script compares the import time and the resident memory of loading
+the bundle against importing `resources.py`.
+"""
+
+import ast
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from typing import Dict
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+QRC = os.path.join(ROOT, "rare", "resources", "resources.qrc")
+RCC = os.path.join(ROOT, "rare", "resources", "resources.rcc")
+
+# lk: header of the binary format: magic, version, tree offset, data offset, names offset
+RCC_MAGIC = b"qres"
+RCC_VERSION = 2
+RCC_HEADER = struct.Struct(">4sIIII")
+
+
+def compile_qrc(qrc: str) -> Dict[str, bytes]:
+    from PyQt5.pyrcc import RCCResourceLibrary
+
+    library = RCCResourceLibrary()
+    library.setInputFiles([qrc])
+    library.setCompressLevel(6)
+    if not library.readFiles():
+        raise RuntimeError(f"Failed to read {qrc}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, "resources.py")
+        if not library.output(output):
+            raise RuntimeError(f"Failed to compile {qrc}")
+        with open(output, "r", encoding="utf-8") as file:
+            module = ast.parse(file.read())
+    # lk: read the blobs without executing the module, it registers them when imported
+    blobs = {}
+    for node in module.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            if isinstance(node.value.value, bytes):
+                blobs[node.targets[0].id] = node.value.value
+    return blobs
+
+
+def write_rcc(blobs: Dict[str, bytes], path: str) -> int:
+    data = blobs["qt_resource_data"]
+    names = blobs["qt_resource_name"]
+    tree = blobs["qt_resource_struct_v2"]
+    data_offset = RCC_HEADER.size
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+    with open(path, "wb") as file:
+        file.write(RCC_HEADER.pack(RCC_MAGIC, RCC_VERSION, tree_offset, data_offset, names_offset))
+        file.write(data)
+        file.write(names)
+        file.write(tree)
+    return tree_offset + len(tree)
+
+
+MEASURE_RCC = f"""
+from PyQt5.QtCore import QResource
+assert QResource.registerResource({RCC!r})
+"""
+
+MEASURE_PY = """
+import rare.resources.resources
+"""
+
+MEASURE = """
+import resource, time
+from PyQt5.QtCore import QFile, QIODevice
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+rss = int(open("/proc/self/statm").read().split()[1]) * resource.getpagesize()
+start = time.perf_counter()
+exec(compile({code!r}, "<measure>", "exec"))
+elapsed = time.perf_counter() - start
+file = QFile(":/images/Rare.png")
+assert file.open(QIODevice.ReadOnly) and file.readAll().size()
+rss = int(open("/proc/self/statm").read().split()[1]) * resource.getpagesize() - rss
+print(elapsed * 1000, rss / 1024)
+"""
+
+
+def measure(code: str, runs: int = 5) -> tuple:
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE.format(code=code)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+            env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+        ).stdout.split()
+        results.append((float(output[0]), float(output[1])))
+    # lk: the first run compiles resources.py, report the best of the rest
+    results = sorted(results[1:])
+    return results[0]
+
+
+def main() -> int:
+    parser = ArgumentParser()
+    parser.add_argument("--measure", action="store_true", help="Compare loading the bundle and the module")
+    args = parser.parse_args()
+
+    size = write_rcc(compile_qrc(QRC), RCC)
+    print(f"Wrote {size} bytes to {os.path.relpath(RCC, ROOT)}")
+
+    if args.measure:
+        for name, code in (("resources.py", MEASURE_PY), ("resources.rcc", MEASURE_RCC)):
+            elapsed, rss = measure(code)
+            print(f"{name:<16} {elapsed:>8.1f} ms {rss:>10.0f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
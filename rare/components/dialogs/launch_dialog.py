@@ -5,6 +5,7 @@ from requests.exceptions import ConnectionError, HTTPError
 
 from rare.components.dialogs.login import LoginDialog
 from rare.shared import RareCore
+from rare.utils.metrics import span
 from rare.ui.components.dialogs.launch_dialog import Ui_LaunchDialog
 from rare.widgets.dialogs import BaseDialog
 from rare.widgets.elide_label import ElideLabel
@@ -53,7 +54,9 @@ class LaunchDialog(BaseDialog):
                 # Force an update check and notice in case there are API changes
                 # self.core.check_for_updates(force=True)
                 # self.core.force_show_update = True
-                if not self.core.login(force_refresh=True):
+                with span("Login", "LaunchDialog"):
+                    logged_in = self.core.login(force_refresh=True)
+                if not logged_in:
                     raise ValueError("You are not logged in. Opening login window.")
                 logger.info("You are logged in")
                 self.login_dialog.close()
@@ -3,12 +3,11 @@ from PyQt5.QtWidgets import QMenu, QTabWidget, QWidget, QWidgetAction, QShortcut
 
 from rare.shared import RareCore, LegendaryCoreSingleton, GlobalSignalsSingleton, ArgumentsSingleton
 from rare.utils.misc import qta_icon, ExitCodes
+from rare.widgets.lazy_widget import LazyWidget
 from .account import AccountWidget
 from .downloads import DownloadsTab
 from .games import GamesTab
 from .settings import SettingsTab
-from .settings.debug import DebugSettings
-from .store import StoreTab
 from .tab_widgets import MainTabBar, TabButtonWidget
 
 
@@ -39,7 +38,7 @@ class MainTabWidget(QTabWidget):
         self.setTabEnabled(self.downloads_index, not self.args.offline)
 
         if not self.args.offline:
-            self.store_tab = StoreTab(self.core, parent=self)
+            self.store_tab = LazyWidget(self.__create_store_tab, parent=self)
             self.store_index = self.addTab(self.store_tab, self.tr("Store (Beta)"))
             self.setTabEnabled(self.store_index, not self.args.offline)
 
@@ -79,6 +78,11 @@ class MainTabWidget(QTabWidget):
             QShortcut("Alt+3", self).activated.connect(lambda: self.setCurrentIndex(self.store_index))
         QShortcut("Alt+4", self).activated.connect(lambda: self.setCurrentIndex(self.settings_index))
 
+    def __create_store_tab(self, parent: QWidget) -> QWidget:
+        # lk: import the store with its queries and models only when it is opened
+        from .store import StoreTab
+        return StoreTab(self.core, parent=parent)
+
     @pyqtSlot(int)
     def __on_downloads_update_title(self, num_downloads: int):
         self.setTabText(self.indexOf(self.downloads_tab), self.tr("Downloads ({})").format(num_downloads))
@@ -1,9 +1,9 @@
 import datetime
 import platform
 from logging import getLogger
-from typing import Union, Optional
+from typing import Union, Optional, Dict, Set
 
-from PyQt5.QtCore import pyqtSignal, QSettings, pyqtSlot, QThreadPool, Qt
+from PyQt5.QtCore import pyqtSignal, QSettings, pyqtSlot, QThreadPool, Qt, QTimer
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import (
     QWidget,
@@ -21,10 +21,10 @@ from rare.shared.workers.install_info import InstallInfoWorker
 from rare.shared.workers.uninstall import UninstallWorker
 from rare.utils.misc import format_size
 from rare.utils.paths import create_desktop_link, desktop_links_supported
+from .budget import DownloadBudget, in_schedule
 from .download import DownloadWidget
-from .groups import UpdateGroup, QueueGroup
+from .groups import UpdateGroup, QueueGroup, ActiveGroup
 from .thread import DlThread, DlResultModel, DlResultCode
-from .widgets import UpdateWidget, QueueWidget
 
 logger = getLogger("Download")
 
@@ -44,12 +44,26 @@ class DownloadsTab(QWidget):
         self.signals = RareCore.instance().signals()
         self.args = RareCore.instance().args()
 
-        self.__thread: Optional[DlThread] = None
+        settings = QSettings(self)
+        self.__budget = DownloadBudget(
+            settings.value(*options.max_downloads),
+            settings.value(*options.download_memory_budget) * 1024 * 1024,
+            settings.value(*options.download_workers_budget),
+        )
+        # lk: running downloads in the order they were started, the first one is shown in `download_widget`
+        self.__threads: Dict[str, DlThread] = {}
+        self.__current: Optional[str] = None
+        # lk: re-evaluate the rate limits periodically to follow the off-peak hours and changed settings
+        self.__rate_timer = QTimer(self)
+        self.__rate_timer.setInterval(60 * 1000)
+        self.__rate_timer.timeout.connect(self.__update_rate_limits)
+        self.__rate_timer.start()
 
         layout = QVBoxLayout(self)
 
         self.download_widget = DownloadWidget(self)
-        self.download_widget.ui.kill_button.clicked.connect(self.stop_download)
+        self.download_widget.ui.kill_button.clicked.connect(self.__on_kill_clicked)
+        self.download_widget.pause_button.toggled.connect(lambda paused: self.__set_paused(self.__current, paused))
         layout.addWidget(self.download_widget)
 
         self.queue_scrollarea = QScrollArea(self)
@@ -67,6 +81,11 @@ class DownloadsTab(QWidget):
         queue_contents_layout = QVBoxLayout(queue_contents)
         queue_contents_layout.setContentsMargins(0, 0, 3, 0)
 
+        self.active_group = ActiveGroup(self)
+        self.active_group.stop.connect(lambda app_name: self.stop_download(app_name=app_name))
+        self.active_group.pause.connect(self.__set_paused)
+        queue_contents_layout.addWidget(self.active_group)
+
         self.queue_group = QueueGroup(self)
         self.queue_group.update_count.connect(self.update_queues_count)
         self.queue_group.removed.connect(self.__on_queue_removed)
@@ -87,17 +106,17 @@ class DownloadsTab(QWidget):
         self.signals.download.dequeue.connect(self.__remove_update)
 
         self.__forced_item: Optional[InstallQueueItemModel] = None
-        self.__omit_requeue = False
+        self.__omit_requeue: Set[str] = set()
 
     @pyqtSlot()
     @pyqtSlot(int)
     def update_queues_count(self):
-        count = self.updates_group.count() + self.queue_group.count() + (1 if self.is_download_active else 0)
+        count = self.updates_group.count() + self.queue_group.count() + len(self.__threads)
         self.update_title.emit(count)
 
     @property
     def is_download_active(self):
-        return self.__thread is not None
+        return bool(self.__threads)
 
     def __check_updates(self):
         for rgame in self.rcore.updates:
@@ -124,8 +143,8 @@ class DownloadsTab(QWidget):
 
     @pyqtSlot(str)
     def __remove_update(self, app_name):
-        if self.__thread and self.__thread.item.options.app_name == app_name:
-            self.stop_download(omit_queue=True)
+        if app_name in self.__threads:
+            self.stop_download(omit_queue=True, app_name=app_name)
         if self.queue_group.contains(app_name):
             self.queue_group.remove(app_name)
         if self.updates_group.contains(app_name):
@@ -150,30 +169,48 @@ class DownloadsTab(QWidget):
 
     @pyqtSlot(InstallQueueItemModel)
     def __on_queue_force(self, item: InstallQueueItemModel):
-        if self.__thread:
-            self.stop_download()
-            self.__forced_item = item
-        else:
+        if self.__budget.admits(item.download.dlm):
             self.__start_download(item)
+        elif self.__current is not None:
+            # lk: make room by stopping the download shown at the top
+            self.__forced_item = item
+            self.stop_download(app_name=self.__current)
+
+    @pyqtSlot()
+    def __on_kill_clicked(self):
+        # lk: stop_download() stops every download without an app_name
+        if self.__current is not None:
+            self.stop_download(app_name=self.__current)
+
+    def __set_paused(self, app_name: Optional[str], paused: bool):
+        if (thread := self.__threads.get(app_name)) is not None:
+            thread.set_paused(paused)
 
-    def stop_download(self, omit_queue=False):
+    def stop_download(self, omit_queue=False, app_name: Optional[str] = None):
         """
-        Stops the active download, by optionally skipping the queue
+        Stops an active download, by optionally skipping the queue
 
         :param omit_queue: bool
             If `True`, the stopped download won't be added back to the queue.
             Defaults to `False`
+        :param app_name: str
+            The download to stop, all active downloads are stopped if it is `None`
         :return:
         """
-        self.__thread.kill()
-        self.download_widget.ui.kill_button.setEnabled(False)
-        # lk: if we are exiting Rare, wait for thread to finish
-        # `self.on_exit` control whether we try to add the download
-        # back in the queue. If we are on exit we wait for the thread
-        # to finish, we do not care about handling the result really
-        self.__omit_requeue = omit_queue
-        if omit_queue:
-            self.__thread.wait()
+        for name in [app_name] if app_name is not None else list(self.__threads):
+            thread = self.__threads[name]
+            # lk: if we are exiting Rare, wait for thread to finish
+            # `self.on_exit` control whether we try to add the download
+            # back in the queue. If we are on exit we wait for the thread
+            # to finish, we do not care about handling the result really
+            if omit_queue:
+                self.__omit_requeue.add(name)
+            thread.kill()
+            if name == self.__current:
+                self.download_widget.ui.kill_button.setEnabled(False)
+                self.download_widget.pause_button.setEnabled(False)
+            if omit_queue:
+                thread.wait()
 
     def __refresh_download(self, item: InstallQueueItemModel):
         worker = InstallInfoWorker(self.core, item.options)
@@ -201,25 +238,78 @@ class DownloadsTab(QWidget):
         if item.expired:
             self.__refresh_download(item)
             return
+        if not self.__budget.reserve(item.options.app_name, item.download.dlm):
+            # lk: other downloads were started while this one was being refreshed
+            self.queue_group.push_front(item, rgame.igame)
+            self.update_queues_count()
+            return
+        settings = QSettings(self)
+        if settings.value(*options.download_autotune):
+            # lk: the budget's share is the upper bound, start from where the last tuned download settled
+            item.download.dlm.autotune = True
+            item.download.dlm.autotune_workers = settings.value(*options.download_autotune_workers)
         dl_thread = DlThread(item, rgame, self.core, self.args.debug)
         dl_thread.result.connect(self.__on_download_result)
         dl_thread.progress.connect(self.__on_download_progress)
         dl_thread.finished.connect(dl_thread.deleteLater)
+        self.__threads[item.options.app_name] = dl_thread
+        self.__update_rate_limits()
         dl_thread.start()
-        self.__thread = dl_thread
-        self.download_widget.ui.kill_button.setDisabled(False)
-        self.download_widget.ui.dl_name.setText(item.download.game.app_title)
-        self.download_widget.setPixmap(
-            RareCore.instance().image_manager().get_pixmap(rgame.app_name, True)
-        )
+        if self.__current is None:
+            self.__show_download(item)
+        else:
+            self.active_group.append(item, rgame.igame)
+        self.update_queues_count()
 
         self.signals.application.notify.emit(
             self.tr("Downloads"),
             self.tr("Starting: \"{}\" is now downloading.").format(rgame.app_title)
         )
 
-    @pyqtSlot(UIUpdate, object)
-    def __on_download_progress(self, ui_update: UIUpdate, dl_size: int):
+    def __show_download(self, item: InstallQueueItemModel):
+        self.__current = item.options.app_name
+        self.download_widget.ui.kill_button.setDisabled(False)
+        self.download_widget.pause_button.setDisabled(False)
+        # lk: a download moved up from the active group keeps its state
+        self.download_widget.pause_button.setChecked(self.__threads[self.__current].paused)
+        self.download_widget.ui.dl_name.setText(item.download.game.app_title)
+        self.download_widget.setPixmap(
+            RareCore.instance().image_manager().get_pixmap(item.options.app_name, True)
+        )
+
+    @pyqtSlot()
+    def __update_rate_limits(self):
+        settings = QSettings(self)
+        if in_schedule(settings.value(*options.download_offpeak_hours), datetime.datetime.now().time()):
+            total = settings.value(*options.download_offpeak_rate_limit)
+        else:
+            total = settings.value(*options.download_rate_limit)
+        per_download = settings.value(*options.download_item_rate_limit)
+        # lk: running downloads pick up the new limits through their control channel
+        for app_name, limit in self.__budget.rate_limits(total * 1024, per_download * 1024).items():
+            self.__threads[app_name].set_rate_limit(limit)
+
+    def __start_queued(self):
+        # lk: start queued downloads in order while the budget has room for them
+        while self.queue_group.count():
+            item = self.queue_group.front()
+            if item.download is None or not self.__budget.admits(item.download.dlm):
+                break
+            self.__start_download(self.queue_group.pop_front())
+            if item.expired:
+                # lk: it is started, or queued again, once it has been refreshed
+                break
+
+    @pyqtSlot(str, UIUpdate, object)
+    def __on_download_progress(self, app_name: str, ui_update: UIUpdate, dl_size: int):
+        if app_name != self.__current:
+            self.active_group.update_progress(
+                app_name,
+                int(ui_update.progress),
+                f"{format_size(ui_update.total_downloaded)} / {format_size(dl_size)}, "
+                f"{format_size(ui_update.download_compressed_speed)}/s, {get_time(ui_update.estimated_time_left)}",
+            )
+            return
         self.download_widget.ui.progress_bar.setValue(int(ui_update.progress))
         self.download_widget.ui.dl_speed.setText(f"{format_size(ui_update.download_compressed_speed)}/s")
         self.download_widget.ui.cache_used.setText(
@@ -238,8 +328,25 @@ class DownloadsTab(QWidget):
 
     @pyqtSlot(DlResultModel)
     def __on_download_result(self, result: DlResultModel):
+        app_name = result.options.app_name
+        self.__threads.pop(app_name, None)
+        self.__budget.release(app_name)
+        self.__update_rate_limits()
+        omit_requeue = app_name in self.__omit_requeue
+        self.__omit_requeue.discard(app_name)
+        if app_name == self.__current:
+            if self.active_group.count():
+                self.__show_download(self.active_group.pop_front())
+            else:
+                self.__reset_download()
+        elif self.active_group.contains(app_name):
+            self.active_group.remove(app_name)
+        self.update_queues_count()
+
         if result.code == DlResultCode.FINISHED:
             logger.info(f"Download finished: {result.options.app_name}")
+            if result.tuned_workers:
+                QSettings(self).setValue(options.download_autotune_workers.key, result.tuned_workers)
             if result.shortcut and desktop_links_supported():
                 if not create_desktop_link(
                     app_name=result.options.app_name,
@@ -266,7 +373,7 @@ class DownloadsTab(QWidget):
 
         elif result.code == DlResultCode.STOPPED:
             logger.info(f"Download stopped: {result.options.app_name}")
-            if not self.__omit_requeue:
+            if not omit_requeue:
                 self.__requeue_download(InstallQueueItemModel(options=result.options))
             else:
                 return
@@ -275,13 +382,11 @@ class DownloadsTab(QWidget):
         if self.updates_group.contains(result.options.app_name):
             self.updates_group.set_widget_enabled(result.options.app_name, True)
 
-        if result.code == DlResultCode.FINISHED and self.queue_group.count():
-            self.__start_download(self.queue_group.pop_front())
+        if result.code == DlResultCode.FINISHED:
+            self.__start_queued()
         elif result.code == DlResultCode.STOPPED and self.__forced_item:
             self.__start_download(self.__forced_item)
             self.__forced_item = None
-        else:
-            self.__reset_download()
 
     def __reset_download(self):
         self.download_widget.setPixmap(QPixmap())
@@ -292,7 +397,9 @@ class DownloadsTab(QWidget):
         self.download_widget.ui.time_left.setText("...")
         self.download_widget.ui.cache_used.setText("...")
         self.download_widget.ui.downloaded.setText("...")
-        self.__thread = None
+        self.__current = None
+        self.download_widget.pause_button.setChecked(False)
+        self.download_widget.pause_button.setDisabled(True)
 
     @pyqtSlot(InstallOptionsModel)
     def __get_install_options(self, options: InstallOptionsModel):
@@ -314,8 +421,8 @@ class DownloadsTab(QWidget):
             rgame.state = RareGame.State.IDLE
             return
         if item:
-            # lk: start update only if there is no other active thread and there is no queue
-            if self.__thread is None and not self.queue_group.count():
+            # lk: start update only if there is room for it and there is no queue
+            if not self.queue_group.count() and self.__budget.admits(item.download.dlm):
                 self.__start_download(item)
             else:
                 rgame = self.rcore.get_game(item.options.app_name)
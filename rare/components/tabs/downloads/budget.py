@@ -0,0 +1,112 @@
+from datetime import time
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+from rare.lgndr.downloader.mp.manager import DLManager
+
+logger = getLogger("DownloadBudget")
+
+
+def in_schedule(schedule: str, now: time) -> bool:
+    """
+    Check if a time is inside a daily window
+
+    @param schedule: The window as "HH:MM-HH:MM", it wraps around midnight if the end is before the start
+    @param now: The time to check
+    @return: True if `now` is inside the window, False if it isn't or the window is empty or invalid
+    """
+    if not schedule:
+        return False
+    try:
+        start, end = (time.fromisoformat(part.strip()) for part in schedule.split("-"))
+    except ValueError:
+        logger.warning("Invalid schedule %s, expected HH:MM-HH:MM", schedule)
+        return False
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+class DownloadBudget:
+    """
+    Divides shared memory and download workers between the downloads running at the same time.
+
+    Each download is limited to an equal share of the budget, so a large install cannot take all of
+    it and keep smaller downloads waiting. A download that needs more shared memory than its share
+    is given what it needs if the budget has room for it. The first download always starts, even if
+    it needs more than the whole budget, otherwise it could never run.
+    """
+
+    def __init__(self, slots: int, memory: int, workers: int):
+        """
+        @param slots: Maximum number of downloads running at the same time
+        @param memory: Shared memory in bytes divided between the downloads
+        @param workers: Download worker processes divided between the downloads
+        """
+        self.__slots = max(1, slots)
+        self.__memory = memory
+        self.__workers = max(1, workers)
+        # app_name: (shared memory, workers)
+        self.__reserved: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def free_memory(self) -> int:
+        return max(0, self.__memory - sum(memory for memory, _ in self.__reserved.values()))
+
+    @property
+    def free_workers(self) -> int:
+        return max(0, self.__workers - sum(workers for _, workers in self.__reserved.values()))
+
+    def admits(self, dlm: Optional[DLManager] = None) -> bool:
+        """
+        Check if there is room to start a download
+
+        @param dlm: The download manager of the download, if it has been prepared already
+        @return: True if the download can be started now
+        """
+        if not self.__reserved:
+            return True
+        if len(self.__reserved) >= self.__slots or not self.free_workers:
+            return False
+        return dlm is None or dlm.analysis.min_memory <= self.free_memory
+
+    def reserve(self, app_name: str, dlm: DLManager) -> bool:
+        """
+        Reserve a share of the budget and limit the download manager to it
+
+        @param app_name: The app_name of the download
+        @param dlm: The download manager, it has to be started after this
+        @return: True if the share was reserved, False if there was no room for it
+        """
+        if not self.admits(dlm):
+            return False
+        min_memory = dlm.analysis.min_memory
+        memory = max(min_memory, min(self.__memory // self.__slots, self.free_memory))
+        workers = max(1, min(self.__workers // self.__slots, self.free_workers))
+        # lk: never give a download more than it was configured with
+        dlm.max_shared_memory = min(dlm.max_shared_memory, memory)
+        dlm.max_workers = min(dlm.max_workers, workers)
+        self.__reserved[app_name] = (dlm.max_shared_memory, dlm.max_workers)
+        logger.info(
+            "Reserved %.01f MiB of shared memory and %s workers for %s",
+            dlm.max_shared_memory / 1024 / 1024, dlm.max_workers, app_name,
+        )
+        return True
+
+    def rate_limits(self, total: int, per_download: int) -> Dict[str, int]:
+        """
+        Divide a bandwidth limit equally between the running downloads
+
+        @param total: Bytes per second shared by all downloads, 0 for unlimited
+        @param per_download: Bytes per second for each download, 0 for unlimited
+        @return: The limit of each download by app_name, 0 for unlimited
+        """
+        if not self.__reserved:
+            return {}
+        share = total // len(self.__reserved)
+        limit = min(share, per_download) if share and per_download else share or per_download
+        return {app_name: limit for app_name in self.__reserved}
+
+    def release(self, app_name: str) -> None:
+        self.__reserved.pop(app_name, None)
+
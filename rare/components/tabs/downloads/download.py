@@ -1,4 +1,4 @@
-from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtCore import QRect, Qt, pyqtSlot
 from PyQt5.QtGui import (
     QPixmap,
     QImage,
@@ -8,6 +8,7 @@ from PyQt5.QtGui import (
     QPaintEvent,
     QPalette,
 )
+from PyQt5.QtWidgets import QPushButton
 
 from rare.ui.components.tabs.downloads.download_widget import Ui_DownloadWidget
 from rare.widgets.image_widget import ImageWidget
@@ -19,6 +20,16 @@ class DownloadWidget(ImageWidget):
         self.ui = Ui_DownloadWidget()
         self.ui.setupUi(self)
 
+        self.pause_button = QPushButton(self.tr("Pause"), self)
+        self.pause_button.setCheckable(True)
+        self.pause_button.setEnabled(False)
+        self.pause_button.toggled.connect(self.__on_pause_toggled)
+        self.ui.active_download_layout.addWidget(self.pause_button, 2, 4, 1, 1)
+
+    @pyqtSlot(bool)
+    def __on_pause_toggled(self, paused: bool):
+        self.pause_button.setText(self.tr("Resume") if paused else self.tr("Pause"))
+
     """
     Painting overrides
     Let them live here until a better alternative is divised.
@@ -1,7 +1,7 @@
 from collections import deque
 from enum import IntEnum
 from logging import getLogger
-from typing import Optional, Deque
+from typing import Optional, Deque, List
 
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt
 from PyQt5.QtWidgets import (
@@ -13,7 +13,7 @@ from PyQt5.QtWidgets import (
 )
 from legendary.models.game import Game, InstalledGame
 
-from rare.components.tabs.downloads.widgets import QueueWidget, UpdateWidget
+from rare.components.tabs.downloads.widgets import QueueWidget, UpdateWidget, ActiveWidget
 from rare.models.install import InstallOptionsModel, InstallQueueItemModel
 from rare.utils.misc import widget_object_name
 
@@ -82,6 +82,59 @@ class UpdateGroup(QGroupBox):
         return widget.version()
 
 
+class ActiveGroup(QGroupBox):
+    """
+    Downloads running next to the one shown at the top of the tab
+    """
+
+    # str: app_name
+    stop = pyqtSignal(str)
+    # str: app_name, bool: paused
+    pause = pyqtSignal(str, bool)
+
+    def __init__(self, parent=None):
+        super(ActiveGroup, self).__init__(parent=parent)
+        self.setObjectName(type(self).__name__)
+        self.setTitle(self.tr("Downloading"))
+        self.setVisible(False)
+        QVBoxLayout(self)
+        # lk: keep the order the downloads were started in
+        self.__active: List[str] = []
+
+    def __find_widget(self, app_name: str) -> Optional[ActiveWidget]:
+        return self.findChild(ActiveWidget, name=widget_object_name(ActiveWidget, app_name))
+
+    def count(self) -> int:
+        return len(self.__active)
+
+    def contains(self, app_name: str) -> bool:
+        return app_name in self.__active
+
+    def append(self, item: InstallQueueItemModel, old_igame: Optional[InstalledGame]):
+        self.__active.append(item.options.app_name)
+        widget = ActiveWidget(item, old_igame, parent=self)
+        widget.stop.connect(self.stop)
+        widget.pause.connect(self.pause)
+        self.layout().addWidget(widget)
+        self.setVisible(True)
+
+    def remove(self, app_name: str):
+        self.__active.remove(app_name)
+        widget: ActiveWidget = self.__find_widget(app_name)
+        self.layout().removeWidget(widget)
+        widget.deleteLater()
+        self.setVisible(bool(self.__active))
+
+    def pop_front(self) -> InstallQueueItemModel:
+        widget: ActiveWidget = self.__find_widget(self.__active[0])
+        self.remove(self.__active[0])
+        return widget.item
+
+    def update_progress(self, app_name: str, progress: int, status: str):
+        widget: ActiveWidget = self.__find_widget(app_name)
+        widget.update_progress(progress, status)
+
+
 class QueueGroup(QGroupBox):
     update_count = pyqtSignal(int)
     removed = pyqtSignal(str)
@@ -157,6 +210,10 @@ class QueueGroup(QGroupBox):
             other: QueueWidget = self.__find_widget(app_name)
             other.toggle_arrows(len(self.__queue) - 2, len(self.__queue))
 
+    def front(self) -> InstallQueueItemModel:
+        widget: QueueWidget = self.__find_widget(self.__queue[0])
+        return widget.item
+
     def pop_front(self) -> InstallQueueItemModel:
         app_name = self.__queue.popleft()
         widget: QueueWidget = self.__find_widget(app_name)
@@ -1,16 +1,17 @@
 import os
 import platform
-import queue
 import time
 from dataclasses import dataclass
 from enum import IntEnum
 from logging import getLogger
+from threading import Lock
 from typing import List, Optional, Dict
 
-from PyQt5.QtCore import QThread, pyqtSignal, QProcess
+from PyQt5.QtCore import QThread, pyqtSignal, QProcess, QObject, QSocketNotifier, QTimer, Qt
 
 from rare.lgndr.cli import LegendaryCLI
 from rare.lgndr.core import LegendaryCore
+from rare.lgndr.downloader.mp.manager import DLManager
 from rare.lgndr.glue.monkeys import DLManagerSignals
 from rare.lgndr.models.downloading import UIUpdate
 from rare.models.game import RareGame
@@ -18,6 +19,9 @@ from rare.models.install import InstallQueueItemModel, InstallOptionsModel
 
 logger = getLogger("DownloadThread")
 
+# Minimum time in milliseconds between two status updates shown for a download
+STATUS_INTERVAL = 250
+
 
 class DlResultCode(IntEnum):
     ERROR = 1
@@ -36,11 +40,83 @@ class DlResultModel:
     shortcut: bool = False
     folder_name: str = ""
     app_title: str = ""
+    # Workers an autotuned download settled on, 0 if it wasn't autotuned
+    tuned_workers: int = 0
+
+
+class DlStatusReader(QObject):
+    """
+    Reads the status updates of a running DLManager as they arrive, without polling.
+
+    The reading end of the status channel is watched with a QSocketNotifier, so the thread sleeps
+    in its event loop between updates. Updates that arrive faster than `interval` are coalesced
+    and only the latest one is emitted. `closed` is emitted once the DLManager process has exited.
+    """
+    status = pyqtSignal(UIUpdate)
+    closed = pyqtSignal()
+
+    def __init__(self, dlm: DLManager, interval: int = STATUS_INTERVAL, parent=None):
+        super(DlStatusReader, self).__init__(parent=parent)
+        self.__dlm = dlm
+        self.__latest: Optional[UIUpdate] = None
+        self.__closed = False
+
+        self.__notifier = QSocketNotifier(dlm.status_reader.fileno(), QSocketNotifier.Read, self)
+        self.__notifier.activated.connect(self.__read)
+
+        self.__frame = QTimer(self)
+        self.__frame.setSingleShot(True)
+        self.__frame.setInterval(interval)
+        self.__frame.timeout.connect(self.__flush)
+
+        # lk: the channel reports EOF when the process exits, this covers the case it doesn't
+        self.__alive = QTimer(self)
+        self.__alive.setInterval(1000)
+        self.__alive.timeout.connect(self.__check_alive)
+        self.__alive.start()
+
+    def __drain(self) -> bool:
+        try:
+            while self.__dlm.status_reader.poll():
+                self.__latest = self.__dlm.status_reader.recv()
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def __read(self):
+        if not self.__drain():
+            self.__close()
+            return
+        # lk: emit right away if nothing was emitted recently, otherwise at the end of the interval
+        if not self.__frame.isActive():
+            self.__flush()
+            self.__frame.start()
+
+    def __flush(self):
+        if self.__latest is not None:
+            status, self.__latest = self.__latest, None
+            self.status.emit(status)
+
+    def __check_alive(self):
+        if not self.__dlm.is_alive():
+            self.__drain()
+            self.__close()
+
+    def __close(self):
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__notifier.setEnabled(False)
+        self.__frame.stop()
+        self.__alive.stop()
+        self.__flush()
+        self.closed.emit()
 
 
 class DlThread(QThread):
     result = pyqtSignal(DlResultModel)
-    progress = pyqtSignal(UIUpdate, object)
+    # str: app_name, UIUpdate: status, object: download size
+    progress = pyqtSignal(str, UIUpdate, object)
 
     def __init__(self, item: InstallQueueItemModel, rgame: RareGame, core: LegendaryCore, debug: bool = False):
         super(DlThread, self).__init__()
@@ -50,6 +126,8 @@ class DlThread(QThread):
         self.dl_size = item.download.analysis.dl_size
         self.rgame = rgame
         self.debug = debug
+        self.workers = 0
+        self.__signals_lock = Lock()
 
     def __finish(self, result):
         if result.code == DlResultCode.FINISHED:
@@ -59,7 +137,8 @@ class DlThread(QThread):
         self.result.emit(result)
 
     def __status_callback(self, status: UIUpdate):
-        self.progress.emit(status, self.dl_size)
+        self.workers = status.max_workers or self.workers
+        self.progress.emit(self.item.options.app_name, status, self.dl_size)
         self.rgame.signals.progress.update.emit(int(status.progress))
 
     def run(self):
@@ -68,26 +147,24 @@ class DlThread(QThread):
         self.item.download.dlm.proc_debug = self.debug
         result = DlResultModel(self.item.options)
         start_t = time.time()
+        dlm = self.item.download.dlm
         try:
-            self.item.download.dlm.start()
+            dlm.rate_limit = self.dlm_signals.rate_limit or 0
+            dlm.start()
+            # lk: close the ends used by the DLManager process, so reading the status reports EOF when it exits
+            dlm.status_writer.close()
+            dlm.control_reader.close()
             self.rgame.state = RareGame.State.DOWNLOADING
             self.rgame.signals.progress.start.emit()
-            time.sleep(1)
-            while self.item.download.dlm.is_alive():
-                try:
-                    self.__status_callback(self.item.download.dlm.status_queue.get(timeout=1.0))
-                except queue.Empty:
-                    pass
-                if self.dlm_signals.update:
-                    try:
-                        self.item.download.dlm.signals_queue.put(self.dlm_signals, block=False, timeout=1.0)
-                    except queue.Full:
-                        pass
-                time.sleep(self.item.download.dlm.update_interval / 10)
-            self.item.download.dlm.join()
+            reader = DlStatusReader(dlm)
+            reader.status.connect(self.__status_callback, Qt.DirectConnection)
+            reader.closed.connect(self.quit, Qt.DirectConnection)
+            self.exec_()
+            dlm.join()
         except Exception as e:
             self.kill()
-            self.item.download.dlm.join()
+            dlm.join()
+            self.__close_channels()
             end_t = time.time()
             logger.error(f"Installation failed after {end_t - start_t:.02f} seconds.")
             logger.warning(f"The following exception occurred while waiting for the downloader to finish: {e!r}.")
@@ -96,6 +173,7 @@ class DlThread(QThread):
             self.__finish(result)
             return
         else:
+            self.__close_channels()
             end_t = time.time()
             if self.dlm_signals.kill is True:
                 logger.info(f"Download stopped after {end_t - start_t:.02f} seconds.")
@@ -105,6 +183,8 @@ class DlThread(QThread):
             logger.info(f"Download finished in {end_t - start_t:.02f} seconds.")
 
             result.code = DlResultCode.FINISHED
+            if self.item.download.dlm.autotune:
+                result.tuned_workers = self.workers
 
             if self.item.options.overlay:
                 self.core.finish_overlay_install(self.item.download.igame)
@@ -179,5 +259,43 @@ class DlThread(QThread):
         else:
             logger.info("Automatic installation not available on Linux.")
 
+    def __send_signals(self):
+        # lk: sent right away, the DLManager waits on the channel between status updates
+        with self.__signals_lock:
+            try:
+                self.item.download.dlm.control_writer.send(self.dlm_signals)
+            except OSError as e:
+                logger.debug(f"Failed to send signals to the downloader: {e!r}")
+
+    def __close_channels(self):
+        with self.__signals_lock:
+            self.item.download.dlm.status_reader.close()
+            self.item.download.dlm.control_writer.close()
+
+    def set_rate_limit(self, rate: int):
+        """
+        Change the download rate limit, it is sent to the running DLManager
+
+        @param rate: Bytes per second, 0 for unlimited
+        """
+        if rate != self.dlm_signals.rate_limit:
+            self.dlm_signals.rate_limit = rate
+            self.__send_signals()
+
+    def set_paused(self, paused: bool):
+        """
+        Pause or resume the download, the chunks in flight still complete
+
+        @param paused: True to pause, False to resume
+        """
+        if paused != self.dlm_signals.pause:
+            self.dlm_signals.pause = paused
+            self.__send_signals()
+
+    @property
+    def paused(self) -> bool:
+        return self.dlm_signals.pause
+
     def kill(self):
         self.dlm_signals.kill = True
+        self.__send_signals()
@@ -2,7 +2,7 @@ from logging import getLogger
 from typing import Optional
 
 from PyQt5.QtCore import pyqtSignal, Qt, QThreadPool, pyqtSlot
-from PyQt5.QtWidgets import QWidget, QFrame
+from PyQt5.QtWidgets import QWidget, QFrame, QProgressBar, QLabel, QVBoxLayout, QPushButton
 from legendary.models.downloading import AnalysisResult
 from legendary.models.game import Game, InstalledGame
 from qtawesome import icon
@@ -50,7 +50,7 @@ class QueueInfoWidget(QWidget):
 
         if old_igame:
             self.ui.title.setText(old_igame.title)
-            self.image.setPixmap(self.image_manager.get_pixmap(old_igame.app_name, color=True))
+            self.image.setPixmap(self.image_manager.get_pixmap(old_igame.app_name, color=True, preset=ImageSize.Icon))
 
     def update_information(self, game, igame, analysis, old_igame):
         self.ui.title.setText(game.app_title)
@@ -60,7 +60,7 @@ class QueueInfoWidget(QWidget):
         self.ui.local_version.setText(elide_text(self.ui.local_version, igame.version))
         self.ui.dl_size.setText(format_size(analysis.dl_size) if analysis else "")
         self.ui.install_size.setText(format_size(analysis.install_size) if analysis else "")
-        self.image.setPixmap(self.image_manager.get_pixmap(game.app_name, color=True))
+        self.image.setPixmap(self.image_manager.get_pixmap(game.app_name, color=True, preset=ImageSize.Icon))
 
 
 class UpdateWidget(QFrame):
@@ -161,3 +161,56 @@ class QueueWidget(QFrame):
     def toggle_arrows(self, index: int, length: int):
         self.ui.move_up_button.setEnabled(bool(index))
         self.ui.move_down_button.setEnabled(bool(length - (index + 1)))
+
+
+class ActiveWidget(QFrame):
+    # str: app_name
+    stop = pyqtSignal(str)
+    # str: app_name, bool: paused
+    pause = pyqtSignal(str, bool)
+
+    def __init__(self, item: InstallQueueItemModel, old_igame: Optional[InstalledGame], parent=None):
+        super(ActiveWidget, self).__init__(parent=parent)
+        self.ui = Ui_QueueBaseWidget()
+        self.ui.setupUi(self)
+        # lk: setObjectName has to be after `setupUi` because it is also set in that function
+        self.setObjectName(widget_object_name(self, item.options.app_name))
+
+        self.item = item
+
+        self.ui.move_buttons.setVisible(False)
+        self.ui.update_buttons.setVisible(False)
+        self.ui.force_button.setVisible(False)
+        self.ui.remove_button.setText(self.tr("Stop download"))
+        self.ui.remove_button.clicked.connect(self.__on_stop)
+
+        self.pause_button = QPushButton(self.tr("Pause"), self.ui.queue_buttons)
+        self.pause_button.setCheckable(True)
+        self.pause_button.toggled.connect(self.__on_pause)
+        self.ui.queue_buttons_layout.insertWidget(0, self.pause_button, 0, Qt.AlignBottom)
+
+        self.info_widget = QueueInfoWidget(
+            item.download.game, item.download.igame, item.download.analysis, old_igame, parent=self
+        )
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.status = QLabel("...", self)
+
+        info_layout = QVBoxLayout()
+        info_layout.addWidget(self.info_widget)
+        info_layout.addWidget(self.progress_bar)
+        info_layout.addWidget(self.status)
+        self.ui.info_layout.addLayout(info_layout)
+
+    def __on_stop(self):
+        self.ui.remove_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.stop.emit(self.item.options.app_name)
+
+    def __on_pause(self, paused: bool):
+        self.pause_button.setText(self.tr("Resume") if paused else self.tr("Pause"))
+        self.pause.emit(self.item.options.app_name, paused)
+
+    def update_progress(self, progress: int, status: str):
+        self.progress_bar.setValue(progress)
+        self.status.setText(status)
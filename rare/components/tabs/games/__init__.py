@@ -1,4 +1,5 @@
 from logging import getLogger
+from typing import List
 
 from PyQt5.QtCore import QSettings, Qt, pyqtSlot
 from PyQt5.QtGui import QShowEvent
@@ -13,12 +14,13 @@ from rare.shared import (
 )
 from rare.shared import RareCore
 from rare.models.options import options
+from rare.utils.metrics import span
+from rare.widgets.lazy_widget import LazyWidget
 from .game_info import GameInfoTabs
 from .game_widgets import LibraryWidgetController, LibraryFilter, LibraryOrder, LibraryView
 from .game_widgets.icon_game_widget import IconGameWidget
 from .game_widgets.list_game_widget import ListGameWidget
 from .head_bar import GameListHeadBar
-from .integrations import IntegrationsTabs
 
 logger = getLogger("GamesTab")
 
@@ -48,8 +50,7 @@ class GamesTab(QStackedWidget):
         self.game_info_page.import_clicked.connect(self.show_import)
         self.addWidget(self.game_info_page)
 
-        self.integrations_page = IntegrationsTabs(self)
-        self.integrations_page.back_clicked.connect(lambda: self.setCurrentWidget(self.games_page))
+        self.integrations_page = LazyWidget(self.__create_integrations_page, self)
         self.addWidget(self.integrations_page)
 
         self.view_scroll = QScrollArea(self.games_page)
@@ -67,7 +68,8 @@ class GamesTab(QStackedWidget):
         self.head_bar.filterChanged.connect(self.scroll_to_top)
         self.head_bar.orderChanged.connect(self.order_games)
         self.head_bar.orderChanged.connect(self.scroll_to_top)
-        self.head_bar.refresh_list.clicked.connect(self.library_controller.update_game_views)
+        self.rcore.reconciled.connect(self.__on_library_reconciled)
+        self.rcore.entitlements_changed.connect(self.__on_entitlements_changed)
 
         # signals
         self.signals.game.installed.connect(self.update_count_games_label)
@@ -88,21 +90,27 @@ class GamesTab(QStackedWidget):
             self.view_scroll.verticalScrollBar().minimum()
         )
 
+    def __create_integrations_page(self, parent: QWidget) -> QWidget:
+        from .integrations import IntegrationsTabs
+        page = IntegrationsTabs(parent)
+        page.back_clicked.connect(lambda: self.setCurrentWidget(self.games_page))
+        return page
+
     @pyqtSlot()
     @pyqtSlot(str)
     def show_import(self, app_name: str = None):
         self.setCurrentWidget(self.integrations_page)
-        self.integrations_page.show_import(app_name)
+        self.integrations_page.widget().show_import(app_name)
 
     @pyqtSlot()
     def show_egl_sync(self):
         self.setCurrentWidget(self.integrations_page)
-        self.integrations_page.show_egl_sync()
+        self.integrations_page.widget().show_egl_sync()
 
     @pyqtSlot()
     def show_eos_ubisoft(self):
         self.setCurrentWidget(self.integrations_page)
-        self.integrations_page.show_eos_ubisoft()
+        self.integrations_page.widget().show_eos_ubisoft()
 
     @pyqtSlot(RareGame)
     def show_game_info(self, rgame):
@@ -117,14 +125,39 @@ class GamesTab(QStackedWidget):
         )
 
     def setup_game_list(self):
-        for rgame in self.rcore.games:
-            widget = self.add_library_widget(rgame)
-            if not widget:
-                logger.warning("Excluding %s from the game list", rgame.app_title)
-                continue
+        with span("Create library widgets", "GamesTab"):
+            for rgame in self.rcore.games:
+                widget = self.add_library_widget(rgame)
+                if not widget:
+                    logger.warning("Excluding %s from the game list", rgame.app_title)
+                    continue
+            self.filter_games(self.head_bar.current_filter())
+            self.update_count_games_label()
+
+    @pyqtSlot()
+    @pyqtSlot(list, list, list)
+    def __on_library_reconciled(self, added: List[str], changed: List[str], removed: List[str]):
+        # lk: the game list has not been set up yet, it will be built from the reconciled library
+        if self.init:
+            return
+        # lk: changed games have updated their own widgets, the views only need to be sorted and filtered again
+        if not any((added, changed, removed)):
+            return
+        for app_name in added:
+            rgame = self.rcore.get_game(app_name)
+            if rgame in self.rcore.games and not self.library_controller.contains(app_name):
+                self.add_library_widget(rgame)
+        self.library_controller.update_game_views()
         self.filter_games(self.head_bar.current_filter())
         self.update_count_games_label()
 
+    @pyqtSlot()
+    def __on_entitlements_changed(self):
+        # lk: grant dates might have changed, which only matters for ordering by date
+        if self.init or self.head_bar.current_order() not in (LibraryOrder.NEWEST, LibraryOrder.OLDEST):
+            return
+        self.order_games(self.head_bar.current_order())
+
     def add_library_widget(self, rgame: RareGame):
         try:
             widget = self.library_controller.add_game(rgame)
@@ -30,7 +30,7 @@ class GameDlcWidget(QFrame):
         self.ui.version.setText(rdlc.version)
         self.ui.app_name.setText(rdlc.app_name)
 
-        self.image.setPixmap(rdlc.pixmap)
+        self.image.setPixmap(rdlc.pixmap(ImageSize.Icon))
 
         self.__update()
         rdlc.signals.widget.update.connect(self.__update)
@@ -38,13 +38,13 @@ class GameDlcWidget(QFrame):
     @pyqtSlot()
     def __update(self):
         self.ui.action_button.setEnabled(self.rdlc.is_idle)
-        self.image.setPixmap(self.rdlc.pixmap)
+        self.image.setPixmap(self.rdlc.pixmap(ImageSize.Icon))
 
     def showEvent(self, a0: QShowEvent) -> None:
         if a0.spontaneous():
             return super().showEvent(a0)
-        if self.rdlc.pixmap.isNull():
-            self.rdlc.load_pixmap()
+        if self.rdlc.pixmap(ImageSize.Icon).isNull():
+            self.rdlc.load_pixmap(preset=ImageSize.Icon)
         super().showEvent(a0)
 
 
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 from typing import Tuple, List, Union, Type, TypeVar
 
-from PyQt5.QtCore import QObject, pyqtSlot, Qt
+from PyQt5.QtCore import QObject, pyqtSlot, Qt, QTimer, QRect, QPoint
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QScrollArea
 
 from rare.lgndr.core import LegendaryCore
@@ -71,12 +71,22 @@ class ViewContainer(QWidget):
         app_names = {iw.rgame.app_name for iw in widgets}
         games = list(self.rcore.games)
         game_app_names = {g.app_name for g in games}
+        # lk: games that were removed from the library when it was reconciled with a fetch
+        for widget in widgets:
+            if widget.rgame.app_name not in game_app_names:
+                self.layout().removeWidget(widget)
+                widget.deleteLater()
         new_app_names = game_app_names.difference(app_names)
         for app_name in new_app_names:
             game = self.rcore.get_game(app_name)
             w = widget_type(game, self)
             self.layout().addWidget(w)
 
+    def _prefetch_view(self, widget_type: Type[ViewWidget]):
+        for widget in self.findChildren(widget_type):
+            if widget.isVisible() and widget.pixmap() is None:
+                widget.rgame.load_pixmap(widget.geometry(), widget.image_preset)
+
     def _find_widget(self, widget_type: Type[ViewWidget], app_name: str) -> ViewWidget:
         w = self.findChild(widget_type, app_name)
         return w
@@ -104,6 +114,9 @@ class IconViewContainer(ViewContainer):
     def update_view(self):
         self._update_view(IconGameWidget)
 
+    def prefetch_view(self):
+        self._prefetch_view(IconGameWidget)
+
     def find_widget(self, app_name: str) -> ViewWidget:
         return self._find_widget(IconGameWidget, app_name)
 
@@ -149,6 +162,9 @@ class ListViewContainer(ViewContainer):
     def update_view(self):
         self._update_view(ListGameWidget)
 
+    def prefetch_view(self):
+        self._prefetch_view(ListGameWidget)
+
     def find_widget(self, app_name: str) -> ViewWidget:
         return self._find_widget(ListGameWidget, app_name)
 
@@ -187,10 +203,37 @@ class LibraryWidgetController(QObject):
         else:
             self._container: ListViewContainer = ListViewContainer(self.rcore, parent)
         parent.setWidget(self._container)
+        self.__scroll_area = parent
 
         self.signals.game.installed.connect(self.order_game_views)
         self.signals.game.uninstalled.connect(self.order_game_views)
 
+        # lk: throttle viewport updates while scrolling, they walk the whole view
+        self.__scroll_value: int = 0
+        self.__scroll_direction: int = 0
+        self.__viewport_timer = QTimer(self)
+        self.__viewport_timer.setSingleShot(True)
+        self.__viewport_timer.setInterval(100)
+        self.__viewport_timer.timeout.connect(self.__update_viewport)
+        parent.verticalScrollBar().valueChanged.connect(self.__on_scroll)
+        parent.verticalScrollBar().rangeChanged.connect(lambda _min, _max: self.__viewport_timer.start())
+
+    @pyqtSlot(int)
+    def __on_scroll(self, value: int):
+        if value != self.__scroll_value:
+            self.__scroll_direction = 1 if value > self.__scroll_value else -1
+        self.__scroll_value = value
+        if not self.__viewport_timer.isActive():
+            self.__viewport_timer.start()
+
+    @pyqtSlot()
+    def __update_viewport(self):
+        viewport = QRect(
+            QPoint(0, self.__scroll_area.verticalScrollBar().value()), self.__scroll_area.viewport().size()
+        )
+        self.rcore.image_manager().set_viewport(viewport, self.__scroll_direction)
+        self._container.prefetch_view()
+
     def add_game(self, rgame: RareGame):
         return self.add_widgets(rgame)
 
@@ -215,3 +258,6 @@ class LibraryWidgetController(QObject):
 
     def __find_widget(self, app_name: str) -> Union[ViewWidget, None]:
         return self._container.find_widget(app_name)
+
+    def contains(self, app_name: str) -> bool:
+        return self.__find_widget(app_name) is not None
@@ -1,5 +1,4 @@
 import platform
-import random
 from logging import getLogger
 
 from PyQt5.QtCore import pyqtSignal, Qt, pyqtSlot, QObject, QEvent, QTimer
@@ -7,6 +6,7 @@ from PyQt5.QtGui import QMouseEvent, QShowEvent, QPaintEvent
 from PyQt5.QtWidgets import QMessageBox, QAction
 
 from rare.models.game import RareGame
+from rare.models.image import ImageSize
 from rare.shared import (
     LegendaryCoreSingleton,
     GlobalSignalsSingleton,
@@ -58,7 +58,7 @@ class GameWidget(LibraryWidget):
         self.update_actions()
 
         # signals
-        self.rgame.signals.widget.update.connect(lambda: self.setPixmap(self.rgame.pixmap))
+        self.rgame.signals.widget.update.connect(lambda: self.setPixmap(self.rgame.pixmap(self.image_preset)))
         self.rgame.signals.widget.update.connect(self.update_buttons)
         self.rgame.signals.widget.update.connect(self.update_state)
         self.rgame.signals.game.installed.connect(self.update_actions)
@@ -66,8 +66,8 @@ class GameWidget(LibraryWidget):
 
         self.rgame.signals.progress.start.connect(
             lambda: self.showProgress(
-                self.image_manager.get_pixmap(self.rgame.app_name, True),
-                self.image_manager.get_pixmap(self.rgame.app_name, False)
+                self.image_manager.get_pixmap(self.rgame.app_name, True, self.image_preset),
+                self.image_manager.get_pixmap(self.rgame.app_name, False, self.image_preset)
             )
         )
         self.rgame.signals.progress.update.connect(
@@ -106,17 +106,15 @@ class GameWidget(LibraryWidget):
     # lk: attributes as `GameWidgetUi` class
     __slots__ = "ui"
 
+    @property
+    def image_preset(self) -> ImageSize.Preset:
+        return self._image_size if self._image_size is not None else ImageSize.Display
+
     def paintEvent(self, a0: QPaintEvent) -> None:
-        if not self.visibleRegion().isNull() and self.rgame.pixmap.isNull():
-            self.startTimer(random.randrange(42, 2361, 129), Qt.CoarseTimer)
-            # self.startTimer(random.randrange(42, 2361, 363), Qt.VeryCoarseTimer)
-            # self.rgame.load_pixmap()
+        if not self.visibleRegion().isNull() and self.pixmap() is None:
+            self.rgame.load_pixmap(self.geometry(), self.image_preset)
         super().paintEvent(a0)
 
-    def timerEvent(self, a0):
-        self.killTimer(a0.timerId())
-        self.rgame.load_pixmap()
-
     def showEvent(self, a0: QShowEvent) -> None:
         if a0.spontaneous():
             return super().showEvent(a0)
@@ -1,10 +1,9 @@
+from PyQt5.QtWidgets import QWidget
+
 from rare.shared import ArgumentsSingleton
+from rare.widgets.lazy_widget import LazyWidget
 from rare.widgets.side_tab import SideTabWidget
 from .about import About
-from .debug import DebugSettings
-from .settings import GameSettings
-from .legendary import LegendarySettings
-from .rare import RareSettings
 
 
 class SettingsTab(SideTabWidget):
@@ -12,13 +11,14 @@ class SettingsTab(SideTabWidget):
         super(SettingsTab, self).__init__(parent=parent)
         self.args = ArgumentsSingleton()
 
-        rare_settings = RareSettings(self)
+        # lk: the pages are created when they are opened, except for `About` which checks for updates
+        rare_settings = LazyWidget(self.__create_rare_settings, self)
         self.rare_index = self.addTab(rare_settings, "Rare")
 
-        legendary_settings = LegendarySettings(self)
+        legendary_settings = LazyWidget(self.__create_legendary_settings, self)
         self.legendary_index = self.addTab(legendary_settings, "Legendary")
 
-        game_settings = GameSettings(self)
+        game_settings = LazyWidget(self.__create_game_settings, self)
         self.settings_index = self.addTab(game_settings, self.tr("Defaults"))
 
         self.about = About(self)
@@ -30,6 +30,26 @@ class SettingsTab(SideTabWidget):
 
         if self.args.debug:
             title = self.tr("Debug")
-            self.debug_index = self.addTab(DebugSettings(self), title, title)
+            self.debug_index = self.addTab(LazyWidget(self.__create_debug_settings, self), title, title)
 
         self.setCurrentIndex(self.rare_index)
+
+    @staticmethod
+    def __create_rare_settings(parent: QWidget) -> QWidget:
+        from .rare import RareSettings
+        return RareSettings(parent)
+
+    @staticmethod
+    def __create_legendary_settings(parent: QWidget) -> QWidget:
+        from .legendary import LegendarySettings
+        return LegendarySettings(parent)
+
+    @staticmethod
+    def __create_game_settings(parent: QWidget) -> QWidget:
+        from .settings import GameSettings
+        return GameSettings(parent)
+
+    @staticmethod
+    def __create_debug_settings(parent: QWidget) -> QWidget:
+        from .debug import DebugSettings
+        return DebugSettings(parent)
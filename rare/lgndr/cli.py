@@ -1,9 +1,9 @@
 import functools
 import logging
 import os
-import queue
 import subprocess
 import time
+from multiprocessing.connection import wait
 from typing import Optional, Union, Tuple
 
 from legendary.cli import LegendaryCLI as LegendaryCLIReal
@@ -248,18 +248,24 @@ class LegendaryCLI(LegendaryCLIReal):
             dlm.proc_debug = args.dlm_debug
 
             dlm.start()
+            # Rare: close the ends used by the DLManager process, so reading the status reports EOF when it exits
+            dlm.status_writer.close()
+            dlm.control_reader.close()
             while dlm.is_alive():
-                try:
-                    args.ui_update(dlm.status_queue.get(timeout=1.0))
-                except queue.Empty:
-                    pass
+                # Rare: wake up on status updates, and often enough to forward control signals
+                if wait([dlm.status_reader], dlm.update_interval / 10):
+                    try:
+                        args.ui_update(dlm.status_reader.recv())
+                    except EOFError:
+                        break
                 if args.dlm_signals.update:
                     try:
-                        dlm.signals_queue.put(args.dlm_signals, block=False, timeout=1.0)
-                    except queue.Full:
+                        dlm.control_writer.send(args.dlm_signals)
+                    except OSError:
                         pass
-                time.sleep(dlm.update_interval / 10)
             dlm.join()
+            dlm.status_reader.close()
+            dlm.control_writer.close()
         except Exception as e:
             end_t = time.time()
             logger.info(f'Installation failed after {end_t - start_t:.02f} seconds.')
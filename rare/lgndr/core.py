@@ -2,8 +2,12 @@ import functools
 import json
 import logging
 import os
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from multiprocessing import Queue
 from sys import platform as sys_platform
+from typing import Dict, List, Optional
 from uuid import uuid4
 
 # On Windows the monkeypatching of `run_real` below doesn't work like on Linux
@@ -14,9 +18,10 @@ from legendary.core import LegendaryCore as LegendaryCoreReal
 from legendary.lfs.utils import delete_folder
 from legendary.models.downloading import AnalysisResult
 from legendary.models.egl import EGLManifest
-from legendary.models.game import Game, InstalledGame
+from legendary.models.game import Game, GameAsset, InstalledGame, SaveGameFile, SaveGameStatus
 from legendary.models.manifest import ManifestMeta
 
+from rare.lgndr.downloader.mp.channel import socket_pipe
 from rare.lgndr.downloader.mp.manager import DLManager
 from rare.lgndr.glue.exception import LgndrException, LgndrLogHandler
 from rare.lgndr.lfs.lgndry import LGDLFS
@@ -34,6 +39,7 @@ class LegendaryCore(LegendaryCoreReal):
         self.log.info("Using config in %s", self.lgd.path)
         self.handler = LgndrLogHandler(logging.CRITICAL)
         self.log.addHandler(self.handler)
+        self.__prefetched_platforms = set()
 
     @staticmethod
     def unlock_installed(func):
@@ -64,6 +70,79 @@ class LegendaryCore(LegendaryCoreReal):
     def update_notice_enabled(self):
         return False
 
+    @contextmanager
+    def prefetched_assets(self, platform_assets: Dict[str, List[Dict]], entitlements_ttl: float = 0):
+        """
+        Store assets of multiple platforms that were requested outside of `get_assets()`
+
+        Within the context `get_assets()` does not request the assets of these platforms again,
+        even if `update_assets` is set, which allows requesting them concurrently beforehand.
+
+        @param platform_assets: Asset API responses by platform
+        @param entitlements_ttl: Seconds the stored entitlements are used for, even if the assets changed
+        """
+        if not platform_assets:
+            yield
+            return
+        assets = self.lgd.assets.copy() if self.lgd.assets else dict()
+        for platform, response in platform_assets.items():
+            assets[platform] = [GameAsset.from_egs_json(a) for a in response]
+        # lk: same as in `get_assets()`, only get entitlements if there was an asset update,
+        # lk: and only if the stored ones have expired, see `EntitlementsWorker`
+        age = self.lgd.entitlements_age
+        if not self.lgd.entitlements or (self.lgd.assets != assets and (age is None or age >= entitlements_ttl)):
+            self.log.info('Updating entitlements.')
+            self.lgd.entitlements = self.egs.get_user_entitlements_full()
+        if self.lgd.assets != assets:
+            self.lgd.assets = assets
+        self.__prefetched_platforms.update(platform_assets.keys())
+        try:
+            yield
+        finally:
+            self.__prefetched_platforms.difference_update(platform_assets.keys())
+
+    def get_assets(self, update_assets=False, platform='Windows') -> List[GameAsset]:
+        if platform in self.__prefetched_platforms:
+            update_assets = False
+        return super(LegendaryCore, self).get_assets(update_assets=update_assets, platform=platform)
+
+    def get_non_asset_library_items(self, force_refresh=False, skip_ue=True, library_items: Optional[List[Dict]] = None):
+        # lk: this is a copy of the respective method in legendary, which also accepts library items
+        # lk: that were requested beforehand, concurrently with the assets
+        _ret = []
+        _dlc = defaultdict(list)
+        # get all the appnames we have to ignore
+        ignore = set(i.app_name for i in self.get_assets())
+        # broken old app name that we should always ignore
+        ignore |= {'1'}
+
+        if library_items is None:
+            library_items = self.egs.get_library_items()
+        for libitem in library_items:
+            if libitem['namespace'] == 'ue' and skip_ue:
+                continue
+            if 'appName' not in libitem:
+                continue
+            if libitem['appName'] in ignore:
+                continue
+            if libitem['sandboxType'] == 'PRIVATE':
+                continue
+
+            game = self.lgd.get_game_meta(libitem['appName'])
+            if not game or force_refresh:
+                eg_meta = self.egs.get_game_info(libitem['namespace'], libitem['catalogItemId'])
+                game = Game(app_name=libitem['appName'], app_title=eg_meta['title'], metadata=eg_meta)
+                self.lgd.set_game_meta(game.app_name, game)
+
+            if game.is_dlc:
+                _dlc[game.metadata['mainGameItem']['id']].append(game)
+            elif not any(i['path'] == 'mods' for i in game.metadata.get('categories', [])):
+                _ret.append(game)
+
+        # Force refresh to make sure these titles are included in aliasing
+        self.update_aliases(force=True)
+        return _ret, _dlc
+
     # skip_sync defaults to false but since Rare is persistent, skip by default
     # def get_installed_game(self, app_name, skip_sync=True) -> InstalledGame:
     #     return super(LegendaryCore, self).get_installed_game(app_name, skip_sync)
@@ -97,11 +176,11 @@ class LegendaryCore(LegendaryCoreReal):
         # lk: monkeypatch run_real (the method that emits the stats) into DLManager
         # pylint: disable=E1111
         dlm.run_real = DLManager.run_real.__get__(dlm, DLManager)
-        # lk: set the queue for reporting statistics back the UI
-        dlm.status_queue = Queue()
-        # lk: set the queue to send control signals to the DLManager
+        # lk: set the channel for reporting statistics back the UI
+        dlm.status_reader, dlm.status_writer = socket_pipe()
+        # lk: set the channel to send control signals to the DLManager
         # lk: this doesn't exist in the original class, but it is monkeypatched in
-        dlm.signals_queue = Queue()
+        dlm.control_reader, dlm.control_writer = socket_pipe()
         return dlm, analysis, igame
 
     def uninstall_game(self, installed_game: InstalledGame, delete_files=True, delete_root_directory=False):
@@ -176,16 +255,49 @@ class LegendaryCore(LegendaryCoreReal):
         finally:
             pass
 
+    def check_savegame_state(self, path: str, save: SaveGameFile, latest: Optional[float] = None):
+        # lk: this is a copy of the respective method in legendary, which also accepts the latest
+        # lk: modification time in the save path, so it can be determined once for all of a game's saves
+        if latest is None:
+            latest = 0
+            for _dir, _, _files in os.walk(path):
+                for _file in _files:
+                    s = os.stat(os.path.join(_dir, _file))
+                    latest = max(latest, s.st_mtime)
+
+        if not latest and not save:
+            return SaveGameStatus.NO_SAVE, (None, None)
+
+        # timezones are fun!
+        dt_local = datetime.fromtimestamp(latest).replace(tzinfo=self.local_timezone).astimezone(timezone.utc)
+        if not save:
+            return SaveGameStatus.LOCAL_NEWER, (dt_local, None)
+
+        dt_remote = datetime.strptime(save.manifest_name, '%Y.%m.%d-%H.%M.%S.manifest').replace(tzinfo=timezone.utc)
+        if not latest:
+            return SaveGameStatus.REMOTE_NEWER, (None, dt_remote)
+
+        self.log.debug(f'Local save date: {str(dt_local)}, Remote save date: {str(dt_remote)}')
+
+        # Ideally we check the files themselves based on manifest,
+        # this is mostly a guess but should be accurate enough.
+        if abs((dt_local - dt_remote).total_seconds()) < 60:
+            return SaveGameStatus.SAME_AGE, (dt_local, dt_remote)
+        elif dt_local > dt_remote:
+            return SaveGameStatus.LOCAL_NEWER, (dt_local, dt_remote)
+        else:
+            return SaveGameStatus.REMOTE_NEWER, (dt_local, dt_remote)
+
     def prepare_overlay_install(self, path=None):
         dlm, analysis_result, igame = super(LegendaryCore, self).prepare_overlay_install(path)
         # lk: monkeypatch status_q (the queue for download stats)
         # pylint: disable=E1111
         dlm.run_real = DLManager.run_real.__get__(dlm, DLManager)
-        # lk: set the queue for reporting statistics back the UI
-        dlm.status_queue = Queue()
-        # lk: set the queue to send control signals to the DLManager
+        # lk: set the channel for reporting statistics back the UI
+        dlm.status_reader, dlm.status_writer = socket_pipe()
+        # lk: set the channel to send control signals to the DLManager
         # lk: this doesn't exist in the original class, but it is monkeypatched in
-        dlm.signals_queue = Queue()
+        dlm.control_reader, dlm.control_writer = socket_pipe()
         return dlm, analysis_result, igame
 
 # fmt: on
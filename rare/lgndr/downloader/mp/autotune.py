@@ -0,0 +1,109 @@
+import math
+from typing import List, Optional
+
+
+class Autotuner:
+    """
+    Tunes the number of download workers and usable shared memory segments while downloading.
+
+    Throughput is averaged over a window of status updates. After each window the worker count is
+    moved one step in the current direction, the direction is kept while throughput improves and
+    reversed when it drops. When the cache is nearly full the disk is the bottleneck, so workers
+    are removed instead of added. Every window that doesn't improve throughput by more than
+    `tolerance` is a sign of being close to the peak, after `patience` of them tuning stops at the
+    worker count with the best throughput seen.
+
+    The segment count follows the worker count: the segments the analysis needs for reused chunks,
+    plus room for in-flight downloads and pending writes of every worker.
+    """
+
+    # lk: the download manager keeps up to two tasks in flight for each worker (`max_workers * 2`)
+    tasks_per_worker = 2
+    # lk: every in-flight task holds one segment downloading and one waiting to be written
+    segments_per_task = 2
+
+    def __init__(
+        self,
+        workers: int,
+        max_workers: int,
+        min_segments: int,
+        max_segments: int,
+        window: int = 5,
+        step: int = 2,
+        tolerance: float = 0.05,
+        patience: int = 3,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.workers = min(max(1, workers), self.max_workers)
+        self.min_segments = min(min_segments, max_segments)
+        self.max_segments = max_segments
+        self.window = window
+        self.step = step
+        self.tolerance = tolerance
+        self.patience = patience
+
+        self.converged = False
+        self.best_workers = self.workers
+        self.best_throughput = 0.0
+        self.__samples: List[float] = []
+        self.__last_throughput: Optional[float] = None
+        self.__direction = 1
+        self.__settled = 0
+
+    @property
+    def segments(self) -> int:
+        return min(
+            self.max_segments,
+            self.min_segments + self.workers * self.tasks_per_worker * self.segments_per_task
+        )
+
+    @staticmethod
+    def min_segments_for(min_memory: int, biggest_chunk: int) -> int:
+        return math.ceil(min_memory / biggest_chunk)
+
+    def __clamp(self, workers: int) -> int:
+        return min(max(1, workers), self.max_workers)
+
+    def update(self, throughput: float, cache_ratio: float) -> bool:
+        """
+        Add a status update
+
+        @param throughput: Decompressed bytes downloaded per second since the last update
+        @param cache_ratio: Used shared memory segments divided by the usable segments
+        @return: True if `workers` and `segments` changed
+        """
+        if self.converged:
+            return False
+        self.__samples.append(throughput)
+        if len(self.__samples) < self.window:
+            return False
+        throughput = sum(self.__samples) / len(self.__samples)
+        self.__samples.clear()
+
+        # lk: prefer fewer workers when they are about as fast
+        if throughput > self.best_throughput * (1 + self.tolerance) or (
+            throughput >= self.best_throughput * (1 - self.tolerance) and self.workers < self.best_workers
+        ):
+            self.best_throughput, self.best_workers = throughput, self.workers
+
+        last, self.__last_throughput = self.__last_throughput, throughput
+        if last is not None and throughput <= last * (1 + self.tolerance):
+            self.__settled += 1
+            if throughput < last * (1 - self.tolerance):
+                self.__direction = -self.__direction
+        if cache_ratio > 0.9:
+            self.__direction = -1
+
+        if self.__settled >= self.patience:
+            self.converged = True
+            changed = self.workers != self.best_workers
+            self.workers = self.best_workers
+            return changed
+
+        workers = self.__clamp(self.workers + self.__direction * self.step)
+        if workers == self.workers:
+            # lk: at a bound, turn around for the next window
+            self.__direction = -self.__direction
+            return False
+        self.workers = workers
+        return True
@@ -0,0 +1,17 @@
+import socket
+from multiprocessing.connection import Connection
+from typing import Tuple
+
+
+def socket_pipe() -> Tuple[Connection, Connection]:
+    """
+    Create a one-way channel between processes over a socket pair
+
+    Unlike `multiprocessing.Pipe`, the handles are sockets on every platform, so the reading
+    end can be waited on with `multiprocessing.connection.wait` in the download manager and
+    watched with a QSocketNotifier in the GUI. Both ends can be passed to a child process.
+
+    @return: The reading and the writing end
+    """
+    reader, writer = socket.socketpair()
+    return Connection(reader.detach(), writable=False), Connection(writer.detach(), readable=False)
@@ -0,0 +1,66 @@
+import time
+from threading import Lock
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Limits the rate at which bytes are handed out, to throttle a download.
+
+    Tokens accumulate at `rate` bytes per second, up to one second's worth. A request takes its
+    tokens immediately and waits until the bucket is no longer in debt, so requests larger than
+    the bucket, like a chunk under a very low limit, still go through at the configured rate.
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: int = 0):
+        self.__lock = Lock()
+        self.__rate = max(0, rate)
+        self.__tokens = float(self.__rate)
+        self.__last = time.monotonic()
+
+    @property
+    def rate(self) -> int:
+        return self.__rate
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(float(self.__rate), self.__tokens + (now - self.__last) * self.__rate)
+        self.__last = now
+
+    def __wait_time(self) -> float:
+        if not self.__rate or self.__tokens >= 0:
+            return 0.0
+        return -self.__tokens / self.__rate
+
+    def set_rate(self, rate: int) -> None:
+        """
+        Change the rate, requests that are already waiting continue at the new rate
+
+        @param rate: Bytes per second, 0 to disable the limit
+        """
+        with self.__lock:
+            self.__refill()
+            self.__rate = max(0, rate)
+            # lk: forget the debt when the limit is lifted, keep it when it is changed
+            self.__tokens = min(self.__tokens, float(self.__rate)) if self.__rate else 0.0
+
+    def consume(self, amount: int, running: Callable[[], bool] = lambda: True) -> None:
+        """
+        Take `amount` bytes from the bucket, waiting until the rate allows them
+
+        @param amount: The number of bytes
+        @param running: Called while waiting, stop waiting when it returns False
+        """
+        with self.__lock:
+            if not self.__rate:
+                return
+            self.__refill()
+            self.__tokens -= amount
+            wait = self.__wait_time()
+        # lk: sleep in short steps to pick up rate changes and stop requests
+        while wait > 0 and running():
+            time.sleep(min(wait, 0.1))
+            with self.__lock:
+                self.__refill()
+                wait = self.__wait_time()
@@ -1,18 +1,21 @@
 import logging
 import os
-import queue
 import time
+from collections import deque
 from multiprocessing import Queue as MPQueue
+from multiprocessing.connection import Connection, wait
 from multiprocessing.shared_memory import SharedMemory
 from sys import exit
-from threading import Condition, Thread
+from threading import Condition, Event, Thread
 
 from legendary.downloader.mp.manager import DLManager as DLManagerReal
 from legendary.downloader.mp.workers import DLWorker, FileWorker
-from legendary.models.downloading import ChunkTask, SharedMemorySegment, TerminateWorkerTask
+from legendary.models.downloading import ChunkTask, DownloaderTask, SharedMemorySegment, TerminateWorkerTask
 
 from rare.lgndr.glue.monkeys import DLManagerSignals
 from rare.lgndr.models.downloading import UIUpdate
+from .autotune import Autotuner
+from .limiter import TokenBucket
 
 
 # fmt: off
@@ -21,11 +24,137 @@ class DLManager(DLManagerReal):
         super(DLManager, self).__init__(*args, **kwargs)
         self.log.info("Using Rare's DLManager monkey")
 
-    # Rare: prototype to avoid undefined variable in type checkers
-    signals_queue: MPQueue
+    # Rare: prototypes to avoid undefined variables in type checkers
+    # Rare: status updates are sent to the GUI through `status_writer`
+    status_reader: Connection
+    status_writer: Connection
+    # Rare: control signals arrive from the GUI through `control_reader`
+    control_reader: Connection
+    control_writer: Connection
+    # Rare: download rate limit in bytes per second, 0 for unlimited, changed through control signals
+    rate_limit: int = 0
+    # Rare: tune the workers and shared memory segments while downloading, starting from `autotune_workers`
+    autotune: bool = False
+    autotune_workers: int = 0
+
+    def start_dl_worker(self):
+        # Rare: download workers are also started while downloading when autotuning
+        num = sum(isinstance(child, DLWorker) for child in self.children)
+        bind_ip = self.bind_ips[num % len(self.bind_ips)] if self.bind_ips else None
+        w = DLWorker(f'DLWorker {num + 1}', self.dl_worker_queue, self.dl_result_q,
+                     self.shared_memory.name, logging_queue=self.logging_queue,
+                     dl_timeout=self.dl_timeout, bind_addr=bind_ip)
+        self.children.append(w)
+        w.start()
+
+    def apply_tuning(self, num_shared_memory_segments: int):
+        # Rare: the worker processes and usable segments follow the autotuner
+        while self.max_workers < self.tuner.workers:
+            self.start_dl_worker()
+            self.max_workers += 1
+        while self.max_workers > self.tuner.workers:
+            # lk: the first worker to pick this up exits, the in-flight task limit drops right away
+            self.dl_worker_queue.put_nowait(TerminateWorkerTask())
+            self.max_workers -= 1
+        # lk: segments that are in use can't be held back, they are picked up on the next call
+        usable = num_shared_memory_segments - len(self.sms_held)
+        while usable > self.tuner.segments and self.sms:
+            self.sms_held.append(self.sms.pop())
+            usable -= 1
+        while usable < self.tuner.segments and self.sms_held:
+            self.sms.append(self.sms_held.pop())
+            usable += 1
+        shm_cond = self.conditions[0]
+        with shm_cond:
+            shm_cond.notify()
+
+    def download_job_manager(self, task_cond: Condition, shm_cond: Condition):
+        while self.chunks_to_dl and self.running:
+            while self.active_tasks < self.max_workers * 2 and self.chunks_to_dl:
+                # Rare: wait here while paused
+                self.resumed.wait()
+                try:
+                    sms = self.sms.popleft()
+                    no_shm = False
+                except IndexError:  # no free cache
+                    no_shm = True
+                    break
+
+                c_guid = self.chunks_to_dl.popleft()
+                chunk = self.chunk_data_list.get_chunk_by_guid(c_guid)
+                # Rare: hold the chunk back until the rate limit allows downloading it
+                self.bucket.consume(chunk.file_size, lambda: self.running)
+                self.log.debug(f'Adding {chunk.guid_num} (active: {self.active_tasks})')
+                try:
+                    self.dl_worker_queue.put(DownloaderTask(url=self.base_url + '/' + chunk.path,
+                                                            chunk_guid=c_guid, shm=sms),
+                                             timeout=1.0)
+                except Exception as e:
+                    self.log.warning(f'Failed to add to download queue: {e!r}')
+                    self.chunks_to_dl.appendleft(c_guid)
+                    break
+
+                self.active_tasks += 1
+            else:
+                # active tasks limit hit, wait for tasks to finish
+                with task_cond:
+                    self.log.debug('Waiting for download tasks to complete..')
+                    task_cond.wait(timeout=1.0)
+                    continue
+
+            if no_shm:
+                # if we break we ran out of shared memory, so wait for that.
+                with shm_cond:
+                    self.log.debug('Waiting for more shared memory...')
+                    shm_cond.wait(timeout=1.0)
+
+        self.log.debug('Download Job Manager quitting...')
+
+    def handle_signals(self, signals: DLManagerSignals) -> bool:
+        # Rare: apply a changed rate limit without restarting the download
+        if signals.rate_limit is not None and signals.rate_limit != self.bucket.rate:
+            if signals.rate_limit:
+                self.log.info(f'Changing download rate limit to {signals.rate_limit / 1024 / 1024:.02f} MiB/s')
+            else:
+                self.log.info('Changing download rate limit to unlimited')
+            self.bucket.set_rate(signals.rate_limit)
+        # Rare: hand out no new chunks while paused, the ones in flight still complete
+        if signals.pause == self.resumed.is_set():
+            if signals.pause:
+                self.log.info('Download paused')
+                self.resumed.clear()
+            else:
+                self.log.info('Download resumed')
+                self.resumed.set()
+        if signals.kill is True:
+            self.log.warning('Immediate stop requested!')
+            # lk: graceful but not what legendary does
+            self.running = False
+            self.resumed.set()
+            # send conditions to unlock threads if they aren't already
+            for cond in self.conditions:
+                with cond:
+                    cond.notify()
+            return True
+            # # lk: alternative way, but doesn't clean shm
+            # for i in range(self.max_workers):
+            #     self.dl_worker_queue.put_nowait(TerminateWorkerTask())
+            #
+            # self.log.info('Waiting for installation to finish...')
+            # self.writer_queue.put_nowait(TerminateWorkerTask())
+            # raise KeyboardInterrupt
+        return False
 
     # @staticmethod
     def run_real(self):
+        # Rare: shared by the download workers, the chunks are handed to them at this rate
+        self.bucket = TokenBucket(self.rate_limit)
+        # Rare: cleared while the download is paused
+        self.resumed = Event()
+        self.resumed.set()
+        if self.rate_limit:
+            self.log.info(f'Limiting download rate to {self.rate_limit / 1024 / 1024:.02f} MiB/s')
+
         self.shared_memory = SharedMemory(create=True, size=self.max_shared_memory)
         self.log.debug(f'Created shared memory of size: {self.shared_memory.size / 1024 / 1024:.02f} MiB')
 
@@ -37,6 +166,17 @@ class DLManager(DLManagerReal):
 
         self.log.debug(f'Created {len(self.sms)} shared memory segments.')
 
+        # Rare: start with fewer workers and segments, and tune them while downloading
+        self.tuner = None
+        self.sms_held = deque()
+        if self.autotune:
+            self.tuner = Autotuner(
+                self.autotune_workers or max(1, self.max_workers // 2), self.max_workers,
+                Autotuner.min_segments_for(self.analysis.min_memory, self.analysis.biggest_chunk), len(self.sms),
+            )
+            self.max_workers = self.tuner.workers
+            self.log.info(f'Autotuning download workers, starting with {self.max_workers}')
+
         # Create queues
         self.dl_worker_queue = MPQueue(-1)
         self.writer_queue = MPQueue(-1)
@@ -45,16 +185,8 @@ class DLManager(DLManagerReal):
 
         self.log.info(f'Starting download workers...')
 
-        bind_ip = None
         for i in range(self.max_workers):
-            if self.bind_ips:
-                bind_ip = self.bind_ips[i % len(self.bind_ips)]
-
-            w = DLWorker(f'DLWorker {i + 1}', self.dl_worker_queue, self.dl_result_q,
-                         self.shared_memory.name, logging_queue=self.logging_queue,
-                         dl_timeout=self.dl_timeout, bind_addr=bind_ip)
-            self.children.append(w)
-            w.start()
+            self.start_dl_worker()
 
         self.log.info('Starting file writing worker...')
         writer_p = FileWorker(self.writer_queue, self.writer_result_q, self.dl_dir,
@@ -80,6 +212,9 @@ class DLManager(DLManagerReal):
         task_cond = Condition()
         self.conditions = [shm_cond, task_cond]
 
+        if self.tuner is not None:
+            self.apply_tuning(num_shared_memory_segments)
+
         # start threads
         s_time = time.perf_counter()
         self.threads.append(Thread(target=self.download_job_manager, args=(task_cond, shm_cond)))
@@ -93,6 +228,7 @@ class DLManager(DLManagerReal):
 
         # Rare: kill requested
         kill_request = False
+        control_closed = False
 
         while processed_tasks < num_tasks:
             delta = time.perf_counter() - last_update
@@ -121,9 +257,19 @@ class DLManager(DLManagerReal):
 
             perc = (processed_chunks / num_chunk_tasks) * 100
             runtime = time.perf_counter() - s_time
-            total_avail = len(self.sms)
+            # Rare: segments held back by the autotuner are not in use
+            total_avail = len(self.sms) + len(self.sms_held)
             total_used = (num_shared_memory_segments - total_avail) * (self.analysis.biggest_chunk / 1024 / 1024)
 
+            # Rare: tune with the throughput of this update, a paused download doesn't tell anything
+            if self.tuner is not None and self.resumed.is_set():
+                usable = num_shared_memory_segments - len(self.sms_held)
+                cache_ratio = (num_shared_memory_segments - total_avail) / max(1, usable)
+                if self.tuner.update(dl_unc_speed, cache_ratio):
+                    self.log.info(f'Autotune: {self.tuner.workers} workers, {self.tuner.segments} segments '
+                                  f'at {dl_unc_speed / 1024 / 1024:.02f} MiB/s')
+                self.apply_tuning(num_shared_memory_segments)
+
             if runtime and processed_chunks:
                 average_speed = processed_chunks / runtime
                 estimate = (num_chunk_tasks - processed_chunks) / average_speed
@@ -153,10 +299,10 @@ class DLManager(DLManagerReal):
             # Rare: Restore previous logging level
             self.log.setLevel(log_level)
 
-            # send status update to back to instantiator (if queue exists)
-            if self.status_queue:
+            # Rare: send status update back to the GUI, it coalesces them if they come in too fast
+            if self.status_writer:
                 try:
-                    self.status_queue.put(UIUpdate(
+                    self.status_writer.send(UIUpdate(
                         progress=perc, download_speed=dl_unc_speed, write_speed=w_speed, read_speed=r_speed,
                         runtime=round(runtime),
                         estimated_time_left=round(estimate),
@@ -167,35 +313,27 @@ class DLManager(DLManagerReal):
                         cache_usage=total_used,
                         active_tasks=self.active_tasks,
                         download_compressed_speed=dl_speed,
-                        memory_usage=total_used * 1024 * 1024
-                    ), timeout=1.0)
+                        memory_usage=total_used * 1024 * 1024,
+                        max_workers=self.max_workers,
+                    ))
                 except Exception as e:
-                    self.log.warning(f'Failed to send status update to queue: {e!r}')
+                    self.log.warning(f'Failed to send status update: {e!r}')
 
-            # Rare: queue of control signals
-            try:
-                signals: DLManagerSignals = self.signals_queue.get(timeout=0.5)
-                self.log.warning('Immediate stop requested!')
-                if signals.kill is True:
-                    # lk: graceful but not what legendary does
-                    self.running = False
-                    # send conditions to unlock threads if they aren't already
-                    for cond in self.conditions:
-                        with cond:
-                            cond.notify()
-                    kill_request = True
+            # Rare: instead of sleeping until the next update, wait for control signals and handle them as they arrive
+            deadline = last_update + self.update_interval
+            while not kill_request and (timeout := deadline - time.perf_counter()) > 0:
+                if control_closed:
+                    time.sleep(timeout)
+                    break
+                if not wait([self.control_reader], timeout):
                     break
-                    # # lk: alternative way, but doesn't clean shm
-                    # for i in range(self.max_workers):
-                    #     self.dl_worker_queue.put_nowait(TerminateWorkerTask())
-                    #
-                    # self.log.info('Waiting for installation to finish...')
-                    # self.writer_queue.put_nowait(TerminateWorkerTask())
-                    # raise KeyboardInterrupt
-            except queue.Empty:
-                pass
-
-            time.sleep(self.update_interval)
+                try:
+                    kill_request = self.handle_signals(self.control_reader.recv())
+                except EOFError:
+                    # lk: the GUI's end was closed, keep downloading without control signals
+                    control_closed = True
+            if kill_request:
+                break
 
         for i in range(self.max_workers):
             self.dl_worker_queue.put_nowait(TerminateWorkerTask())
@@ -231,6 +369,12 @@ class DLManager(DLManagerReal):
         self.shared_memory.unlink()
         self.shared_memory = None
 
+        if self.tuner is not None:
+            segments_mib = self.tuner.segments * self.analysis.biggest_chunk / 1024 / 1024
+            self.log.info(f'Autotune {"settled" if self.tuner.converged else "stopped"} on '
+                          f'{self.tuner.workers} workers and {self.tuner.segments} segments ({segments_mib:.01f} MiB), '
+                          f'best throughput {self.tuner.best_throughput / 1024 / 1024:.02f} MiB/s')
+
         self.log.info('All done! Download manager quitting...')
         # finally, exit the process.
         exit(0)
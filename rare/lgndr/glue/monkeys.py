@@ -66,6 +66,8 @@ def ui_update_factory(callback: UiUpdateProtocol = None) -> UiUpdateProtocol:
 class DLManagerSignals:
     _kill = False
     _update = False
+    _rate_limit: Optional[int] = None
+    _pause = False
 
     @property
     def kill(self) -> bool:
@@ -77,6 +79,24 @@ class DLManagerSignals:
         self._update = True
         self._kill = value
 
+    @property
+    def rate_limit(self) -> Optional[int]:
+        return self._rate_limit
+
+    @rate_limit.setter
+    def rate_limit(self, value: int) -> None:
+        self._update = True
+        self._rate_limit = value
+
+    @property
+    def pause(self) -> bool:
+        return self._pause
+
+    @pause.setter
+    def pause(self, value: bool) -> None:
+        self._update = True
+        self._pause = value
+
     @property
     def update(self) -> bool:
         _update = self._update
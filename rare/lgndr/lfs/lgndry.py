@@ -1,4 +1,7 @@
 import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
 
 from filelock import FileLock
 from legendary.lfs.lgndry import LGDLFS as LGDLFSReal
@@ -10,6 +13,54 @@ class LGDLFS(LGDLFSReal):
         self.log.info("Using Rare's LGDLFS monkey")
         # Rare: Default FileLock in Python 3.11 is thread-local, so replace it with a non-local verison
         self._installed_lock = FileLock(os.path.join(self.path, 'installed.json') + '.lock', thread_local=False)
+        self._grant_dates: Optional[Dict[str, datetime]] = None
+
+    @property
+    def entitlements(self):
+        return LGDLFSReal.entitlements.fget(self)
+
+    @entitlements.setter
+    def entitlements(self, entitlements):
+        # Rare: the entitlements are set again from the thread that requested them, keep the index
+        # Rare: and the file as they are, the file's age is the age of the entitlements
+        if entitlements is self._entitlements:
+            return
+        self._grant_dates = None
+        LGDLFSReal.entitlements.fset(self, entitlements)
+
+    @property
+    def entitlements_age(self) -> Optional[float]:
+        """
+        Time since the entitlements were stored
+
+        @return: The age in seconds, None if they were never stored
+        """
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.path, 'entitlements.json'))
+        except OSError:
+            return None
+
+    @property
+    def grant_dates(self) -> Optional[Dict[str, datetime]]:
+        """
+        Index of the earliest grant date of the entitlements in each namespace
+
+        The index is built on first access after the entitlements change.
+
+        @return: Grant dates by namespace, None if there are no entitlements
+        """
+        if self._grant_dates is None:
+            if (entitlements := self.entitlements) is None:
+                return None
+            grant_dates = {}
+            for entitlement in entitlements:
+                grant_date = datetime.fromisoformat(entitlement["grantDate"].replace("Z", "+00:00"))
+                if grant_date.tzinfo is None:
+                    grant_date = grant_date.replace(tzinfo=timezone.utc)
+                if entitlement["namespace"] not in grant_dates or grant_date < grant_dates[entitlement["namespace"]]:
+                    grant_dates[entitlement["namespace"]] = grant_date
+            self._grant_dates = grant_dates
+        return self._grant_dates
 
     def unlock_installed(self):
         self._installed_lock.release(force=True)
@@ -23,3 +23,5 @@ class UIUpdate:
     active_tasks: int
     download_compressed_speed: float
     current_filename: Optional[str] = None
+    # Rare: number of running download workers, it changes when autotuning
+    max_workers: Optional[int] = None
@@ -44,6 +44,9 @@ def main() -> int:
     parser.add_argument(
         "--test-start", action="store_true", help="Quit immediately after launch"
     )
+    parser.add_argument(
+        "--trace", action="store_true", help="Write a Chrome trace of the session next to the logs on exit"
+    )
 
     parser.add_argument(
         "--desktop-shortcut",
@@ -82,6 +85,10 @@ def main() -> int:
 
     args = parser.parse_args()
 
+    if args.trace:
+        from rare.utils.metrics import tracer
+        tracer.enable()
+
     if args.desktop_shortcut or args.startmenu_shortcut:
         from rare.utils.paths import create_desktop_link
 
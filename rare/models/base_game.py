@@ -1,9 +1,10 @@
+import os
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum
 from logging import getLogger
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 
 from PyQt5.QtCore import QObject, pyqtSignal, QRunnable, QThreadPool, QSettings
 from legendary.lfs import eos
@@ -57,6 +58,7 @@ class RareGameBase(QObject):
             uninstalled = pyqtSignal(str)
             launched = pyqtSignal(str)
             finished = pyqtSignal(str)
+            saves_loaded = pyqtSignal(str)
 
         def __init__(self):
             super(RareGameBase.Signals, self).__init__()
@@ -211,6 +213,7 @@ class RareGameSlim(RareGameBase):
         # None if origin or not installed
         self.igame: Optional[InstalledGame] = self.core.get_installed_game(game.app_name)
         self.saves: List[RareSaveGame] = []
+        self.__save_mtimes: Dict[str, Tuple[int, float, List[str]]] = {}
 
     @property
     def is_installed(self) -> bool:
@@ -244,20 +247,59 @@ class RareGameSlim(RareGameBase):
             return saves[0]
         return None
 
-    @property
-    def save_game_state(self) -> Tuple[SaveGameStatus, Tuple[Optional[datetime], Optional[datetime]]]:
+    def __save_path_mtime(self, refresh: bool = False) -> float:
+        """
+        Get the latest modification time of the files in the save path
+
+        The modification time of each directory is cached along with the latest modification time
+        of its files and its subdirectories, so only the directories that changed since the last lookup
+        are listed again, the rest are only stat'ed. Adding, removing or replacing a file changes
+        the modification time of its directory, rewriting a file in place does not, so use `refresh`
+        when the result decides a sync.
+
+        @param refresh: Ignore the cached modification times
+        @return: The latest modification time, 0 if there are no files
+        """
+        cache = {} if refresh else self.__save_mtimes
+        self.__save_mtimes = {}
+
+        def walk(path: str) -> float:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                if (cached := cache.get(path, None)) is not None and cached[0] == mtime_ns:
+                    _, latest, subdirs = cached
+                else:
+                    latest, subdirs = 0, []
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            elif entry.is_file():
+                                latest = max(latest, entry.stat().st_mtime)
+            except OSError:
+                return 0
+            self.__save_mtimes[path] = (mtime_ns, latest, subdirs)
+            return max([latest, *(walk(subdir) for subdir in subdirs)])
+
+        return walk(self.save_path)
+
+    def __save_game_state(self, refresh: bool) -> Tuple[SaveGameStatus, Tuple[Optional[datetime], Optional[datetime]]]:
         if self.saves and self.save_path:
             latest = self.latest_save
             # lk: if the save path wasn't known at startup, dt_local will be None
             # In that case resolve the save again before returning
             latest.status, (latest.dt_local, latest.dt_remote) = self.core.check_savegame_state(
-                self.save_path, latest.file
+                self.save_path, latest.file, self.__save_path_mtime(refresh)
             )
             return latest.status, (latest.dt_local, latest.dt_remote)
         return SaveGameStatus.NO_SAVE, (None, None)
 
+    @property
+    def save_game_state(self) -> Tuple[SaveGameStatus, Tuple[Optional[datetime], Optional[datetime]]]:
+        return self.__save_game_state(refresh=False)
+
     def upload_saves(self, thread=True):
-        status, (dt_local, dt_remote) = self.save_game_state
+        status, (dt_local, dt_remote) = self.__save_game_state(refresh=True)
 
         def _upload():
             logger.info(f"Uploading save for {self.app_title}")
@@ -282,7 +324,7 @@ class RareGameSlim(RareGameBase):
             _upload()
 
     def download_saves(self, thread=True):
-        status, (dt_local, dt_remote) = self.save_game_state
+        status, (dt_local, dt_remote) = self.__save_game_state(refresh=True)
 
         def _download():
             logger.info(f"Downloading save for {self.app_title}")
@@ -309,13 +351,16 @@ class RareGameSlim(RareGameBase):
     def load_saves(self, saves: List[SaveGameFile]):
         """ Use only in a thread """
         self.saves.clear()
+        # lk: the state of the save path is the same for every save, determine it once
+        latest = self.__save_path_mtime(refresh=True) if self.save_path else None
         for save in saves:
             if self.save_path:
-                status, (dt_local, dt_remote) = self.core.check_savegame_state(self.save_path, save)
+                status, (dt_local, dt_remote) = self.core.check_savegame_state(self.save_path, save, latest)
                 rsave = RareSaveGame(save, status, dt_local, dt_remote)
             else:
                 rsave = RareSaveGame(save, SaveGameStatus.SAME_AGE, dt_local=None, dt_remote=save.datetime)
             self.saves.append(rsave)
+        self.signals.game.saves_loaded.emit(self.app_name)
         self.signals.widget.update.emit()
 
     def update_saves(self):
@@ -1,4 +1,3 @@
-import json
 import os
 import platform
 from dataclasses import dataclass, field
@@ -7,16 +6,18 @@ from logging import getLogger
 from threading import Lock
 from typing import List, Optional, Dict, Set
 
-from PyQt5.QtCore import QRunnable, pyqtSlot, QProcess, QThreadPool
-from PyQt5.QtGui import QPixmap, QPixmapCache
+from PyQt5.QtCore import QRunnable, pyqtSlot, QProcess, QThreadPool, QRect
+from PyQt5.QtGui import QPixmap
 from legendary.lfs import eos
 from legendary.models.game import Game, InstalledGame
 
 from rare.lgndr.core import LegendaryCore
 from rare.models.base_game import RareGameBase, RareGameSlim
+from rare.models.image import ImageSize
 from rare.models.install import InstallOptionsModel, UninstallOptionsModel
 from rare.shared.game_process import GameProcess
 from rare.shared.image_manager import ImageManager
+from rare.utils.metadata_store import MetadataStore
 from rare.utils.paths import data_dir, get_rare_executable
 from rare.utils.steam_grades import get_rating
 from rare.utils.config_helper import set_envvar
@@ -71,12 +72,13 @@ class RareGame(RareGameSlim):
         self.__origin_install_size: Optional[int] = None
 
         self.image_manager = image_manager
+        # lk: sizes requested through `load_pixmap()` while the images are being downloaded
+        self.__pending_presets: List[ImageSize.Preset] = []
 
         # Update names for Unreal Engine
         if self.game.app_title == "Unreal Engine":
             self.game.app_title += f" {self.game.app_name.split('_')[-1]}"
 
-        self.pixmap: QPixmap = QPixmap()
         self.metadata: RareGame.Metadata = RareGame.Metadata()
         self.__load_metadata()
         self.grant_date()
@@ -133,40 +135,22 @@ class RareGame(RareGameSlim):
         self.state = RareGame.State.IDLE
         self.signals.game.finished.emit(self.app_name)
 
-    __metadata_json: Optional[Dict] = None
+    __metadata_store: Optional[MetadataStore] = None
     __metadata_lock: Lock = Lock()
 
     @staticmethod
-    def __load_metadata_json() -> Dict:
-        if RareGame.__metadata_json is None:
-            metadata = {}
-            file = os.path.join(data_dir(), "game_meta.json")
-            try:
-                with open(file, "r") as f:
-                    metadata = json.load(f)
-            except FileNotFoundError:
-                logger.info("%s does not exist", file)
-            except json.JSONDecodeError:
-                logger.warning("%s is corrupt", file)
-            finally:
-                RareGame.__metadata_json = metadata
-        return RareGame.__metadata_json
+    def metadata_store() -> MetadataStore:
+        with RareGame.__metadata_lock:
+            if RareGame.__metadata_store is None:
+                RareGame.__metadata_store = MetadataStore(data_dir().joinpath("game_meta.json"))
+            return RareGame.__metadata_store
 
     def __load_metadata(self):
-        with RareGame.__metadata_lock:
-            metadata: Dict = self.__load_metadata_json()
-            # pylint: disable=unsupported-membership-test
-            if self.app_name in metadata:
-                # pylint: disable=unsubscriptable-object
-                self.metadata = RareGame.Metadata.from_dict(metadata[self.app_name])
+        if (metadata := self.metadata_store().get(self.app_name)) is not None:
+            self.metadata = RareGame.Metadata.from_dict(metadata)
 
     def __save_metadata(self):
-        with RareGame.__metadata_lock:
-            metadata: Dict = self.__load_metadata_json()
-            # pylint: disable=unsupported-assignment-operation
-            metadata[self.app_name] = vars(self.metadata)
-            with open(os.path.join(data_dir(), "game_meta.json"), "w+") as file:
-                json.dump(metadata, file, indent=2)
+        self.metadata_store().set(self.app_name, vars(self.metadata))
 
     def update_game(self):
         self.game = self.core.get_game(
@@ -291,7 +275,8 @@ class RareGame(RareGameSlim):
             self.core.egstore_delete(self.igame)
             self.igame = None
             self.signals.game.uninstalled.emit(self.app_name)
-        self.set_pixmap()
+        # lk: the widgets load the pixmap for the new state at the size they show
+        self.signals.widget.update.emit()
 
     @property
     def can_run_offline(self) -> bool:
@@ -463,17 +448,15 @@ class RareGame(RareGameSlim):
         self.signals.widget.update.emit()
 
     def grant_date(self, force=False) -> datetime:
-        if (entitlements := self.core.lgd.entitlements) is None:
+        if (grant_dates := self.core.lgd.grant_dates) is None:
             return self.metadata.grant_date.replace(tzinfo=UTC)
         if self.metadata.grant_date == datetime.min.replace(tzinfo=UTC) or force:
-            logger.debug("Grant date for %s not found in metadata, resolving", self.app_name)
-            matching = filter(lambda ent: ent["namespace"] == self.game.namespace, entitlements)
-            entitlement = next(matching, None)
-            grant_date = datetime.fromisoformat(
-                entitlement["grantDate"].replace("Z", "+00:00")
-            ) if entitlement else datetime.min.replace(tzinfo=UTC)
-            self.metadata.grant_date = grant_date
-            self.__save_metadata()
+            grant_date = grant_dates.get(self.game.namespace, datetime.min.replace(tzinfo=UTC))
+            # lk: only store resolved dates, this is called for every sort key
+            if grant_date != self.metadata.grant_date.replace(tzinfo=UTC):
+                logger.debug("Grant date for %s not found in metadata, resolved to %s", self.app_name, grant_date)
+                self.metadata.grant_date = grant_date
+                self.__save_metadata()
         return self.metadata.grant_date.replace(tzinfo=UTC)
 
     def set_origin_attributes(self, path: str, size: int = 0) -> None:
@@ -483,7 +466,8 @@ class RareGame(RareGameSlim):
             self.signals.game.installed.emit(self.app_name)
         else:
             self.signals.game.uninstalled.emit(self.app_name)
-        self.set_pixmap()
+        # lk: the widgets load the pixmap for the new state at the size they show
+        self.signals.widget.update.emit()
 
     @property
     def can_launch(self) -> bool:
@@ -495,23 +479,54 @@ class RareGame(RareGameSlim):
             return bool(not self.is_foreign or self.can_run_offline)
         return False
 
-    def get_pixmap(self, color=True) -> QPixmap:
-        QPixmapCache.clear()
-        return self.image_manager.get_pixmap(self.app_name, color)
+    def pixmap(self, preset: ImageSize.Preset = ImageSize.Display) -> QPixmap:
+        """!
+        @brief The pixmap for the current installation state, if it is loaded
+
+        Pixmaps are owned by the ImageManager's cache, this returns a null
+        QPixmap if the pixmap hasn't been loaded yet or has been evicted.
 
-    def set_pixmap(self):
-        self.pixmap = self.image_manager.get_pixmap(self.app_name, self.is_installed)
-        QPixmapCache.clear()
-        if not self.pixmap.isNull():
+        @param preset The size the pixmap is displayed at
+        @return QPixmap
+        """
+        pixmap = self.image_manager.cached_pixmap(self.app_name, self.is_installed, preset)
+        return pixmap if pixmap is not None else QPixmap()
+
+    def get_pixmap(self, color=True, preset: ImageSize.Preset = ImageSize.Display) -> QPixmap:
+        return self.image_manager.get_pixmap(self.app_name, color, preset)
+
+    def set_pixmap(self, preset: ImageSize.Preset = ImageSize.Display):
+        color = self.is_installed
+        self.image_manager.get_image_async(
+            self.app_name, color, lambda pm: self.__on_pixmap(pm, color), preset
+        )
+
+    def __set_pending_pixmaps(self):
+        presets, self.__pending_presets = self.__pending_presets, []
+        for preset in presets:
+            self.set_pixmap(preset)
+
+    def __on_pixmap(self, pixmap: QPixmap, color: bool):
+        # lk: the installation state changed while decoding, a newer request is on its way
+        if color != self.is_installed:
+            return
+        if not pixmap.isNull():
             self.signals.widget.update.emit()
 
-    def load_pixmap(self):
+    def load_pixmap(self, anchor: Optional[QRect] = None, preset: ImageSize.Preset = ImageSize.Display):
         """ Do not call this function, call set_pixmap instead. This is only used for startup image loading """
-        if self.pixmap.isNull():
-            self.image_manager.download_image(self.game, self.set_pixmap, 0, False)
+        if self.pixmap(preset).isNull():
+            # lk: the image manager keeps one request for each game, load every size that was asked for
+            if preset not in self.__pending_presets:
+                self.__pending_presets.append(preset)
+            self.image_manager.queue_image(self.game, self.__set_pending_pixmaps, anchor)
+        else:
+            # lk: already in memory, let the requesting widget pick it up
+            self.signals.widget.update.emit()
 
     def refresh_pixmap(self):
-        self.image_manager.download_image(self.game, self.set_pixmap, 0, True)
+        # lk: the widgets load the size they show once they see the pixmaps are gone
+        self.image_manager.download_image(self.game, self.signals.widget.update.emit, 0, True)
 
     def install(self) -> bool:
         if not self.is_idle:
@@ -1,4 +1,5 @@
 import locale
+import os
 import platform as pf
 from argparse import Namespace
 from typing import Any, Type
@@ -24,6 +25,8 @@ class Defaults(Namespace):
     unreal_meta = Value(key="unreal_meta", default=False, dtype=bool)
     exclude_non_asset = Value(key="exclude_non_asset", default=False, dtype=bool)
     exclude_entitlements = Value(key="exclude_entitlements", default=False, dtype=bool)
+    # Hours until the cached entitlements are requested again, they are used in the meantime
+    entitlements_ttl = Value(key="entitlements_ttl", default=24, dtype=int)
 
     language = Value(key="language", default=locale.getlocale()[0], dtype=str)
     sys_tray = Value(key="sys_tray", default=True, dtype=bool)
@@ -45,6 +48,30 @@ class Defaults(Namespace):
     )
     library_order = Value(key="library_order", default=int(LibraryOrder.TITLE), dtype=int)
 
+    # MiB of decoded covers kept in memory by the ImageManager
+    image_cache_budget = Value(key="image_cache_budget", default=256, dtype=int)
+    # MiB of image data kept on disk by the ImageManager, least recently shown covers are removed first
+    image_disk_budget = Value(key="image_disk_budget", default=1024, dtype=int)
+
+    # Downloads running at the same time, they share the shared memory and worker budgets below
+    max_downloads = Value(key="max_downloads", default=2, dtype=int)
+    # MiB of shared memory divided between the running downloads
+    download_memory_budget = Value(key="download_memory_budget", default=2048, dtype=int)
+    # Download worker processes divided between the running downloads
+    download_workers_budget = Value(key="download_workers_budget", default=min(os.cpu_count() * 2, 16), dtype=int)
+    # KiB/s shared by the running downloads, 0 for unlimited
+    download_rate_limit = Value(key="download_rate_limit", default=0, dtype=int)
+    # KiB/s for each download, 0 for unlimited
+    download_item_rate_limit = Value(key="download_item_rate_limit", default=0, dtype=int)
+    # Daily window as "HH:MM-HH:MM" in which `download_offpeak_rate_limit` replaces `download_rate_limit`
+    download_offpeak_hours = Value(key="download_offpeak_hours", default="", dtype=str)
+    # KiB/s shared by the running downloads during the off-peak hours, 0 for unlimited
+    download_offpeak_rate_limit = Value(key="download_offpeak_rate_limit", default=0, dtype=int)
+    # Tune the download workers and shared memory segments while downloading, within the budgets above
+    download_autotune = Value(key="download_autotune", default=False, dtype=bool)
+    # Workers the last tuned download settled on, the next one starts from it
+    download_autotune_workers = Value(key="download_autotune_workers", default=0, dtype=int)
+
     rpc_enable = Value(key="rpc_enable", default=0, dtype=int)
     rpc_name = Value(key="rpc_game", default=True, dtype=bool)
     rpc_time = Value(key="rpc_time", default=True, dtype=bool)
@@ -1,4 +1,11 @@
-import rare.resources.resources
+import os
+
+from PyQt5.QtCore import QResource
+
+# lk: prefer the binary bundle built by misc/qrc2rcc.py, Qt maps it into memory instead of
+# lk: keeping a copy of the data in a Python module. Fall back to the module if it is missing.
+if not QResource.registerResource(os.path.join(os.path.dirname(__file__), "resources.rcc")):
+    import rare.resources.resources
 # Static QSS independent of application style/colorsheme
 import rare.resources.static_css
 import rare.resources.stylesheets
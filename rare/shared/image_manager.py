@@ -1,43 +1,47 @@
-import hashlib
 import json
 import pickle
+import shutil
+import threading
+import time
 import zlib
-# from concurrent import futures
+from collections import OrderedDict
+from concurrent import futures
+from dataclasses import dataclass
 from logging import getLogger
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Set
-from typing import Tuple, Dict, Union, Type, List, Callable
+from typing import Tuple, Dict, Union, Type, List, Callable, Iterable
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PyQt5.QtCore import (
     Qt,
     pyqtSignal,
+    pyqtBoundSignal,
     QObject,
-    QSize,
     QThreadPool,
     QRunnable,
     QRect,
-    QRectF,
+    QTimer,
+    QThread,
+    QSettings,
 )
 from PyQt5.QtGui import (
     QPixmap,
     QImage,
-    QPainter,
-    QPainterPath,
-    QBrush,
-    QTransform,
-    QPen,
 )
 from PyQt5.QtWidgets import QApplication
 from legendary.models.game import Game
 
 from rare.lgndr.core import LegendaryCore
 from rare.models.image import ImageSize
+from rare.models.options import options
 from rare.models.signals import GlobalSignals
+from rare.utils.image_convert import convert_cover, conversion_pool, encode_png
+from rare.utils.image_pack import ImagePack
 from rare.utils.paths import image_dir, resources_path, desktop_icon_suffix
 
-# from requests_futures.sessions import FuturesSession
-
 if TYPE_CHECKING:
     pass
 
@@ -50,26 +54,91 @@ class ImageManager(QObject):
             # object: Game
             completed = pyqtSignal(object)
 
-        def __init__(self, func: Callable, updates: List, json_data: Dict, game: Game):
+        def __init__(self, func: Callable, updates: List, record: Dict, game: Game):
             super(ImageManager.Worker, self).__init__()
             self.signals = ImageManager.Worker.Signals()
             self.setAutoDelete(True)
             self.func = func
             self.updates = updates
-            self.json_data = json_data
+            self.record = record
             self.game = game
 
         def run(self):
-            self.func(self.updates, self.json_data, self.game)
+            self.func(self.updates, self.record, self.game)
             logger.debug(f"Emitting singal for {self.game.app_name} ({self.game.app_title})")
             self.signals.completed.emit(self.game)
 
+    class BatchWorker(QRunnable):
+        class Signals(QObject):
+            # object: Game
+            completed = pyqtSignal(object)
+            # object: Game
+            released = pyqtSignal(object)
+
+        def __init__(self, func: Callable, games: List[Game]):
+            super(ImageManager.BatchWorker, self).__init__()
+            self.signals = ImageManager.BatchWorker.Signals()
+            self.setAutoDelete(True)
+            self.func = func
+            self.games = games
+
+        def run(self):
+            self.func(self.games, self.signals.completed, self.signals.released)
+
+    class Collector(QRunnable):
+        class Signals(QObject):
+            # int: reclaimed bytes
+            collected = pyqtSignal(int)
+
+        def __init__(self, func: Callable, app_names: Set[str], budget: int):
+            super(ImageManager.Collector, self).__init__()
+            self.signals = ImageManager.Collector.Signals()
+            self.setAutoDelete(True)
+            self.func = func
+            self.app_names = app_names
+            self.budget = budget
+
+        def run(self):
+            self.signals.collected.emit(self.func(self.app_names, self.budget))
+
+    class Decoder(QRunnable):
+        class Signals(QObject):
+            # object: QImage
+            decoded = pyqtSignal(object)
+
+        def __init__(self, func: Callable, app_name: str, color: bool, preset: ImageSize.Preset):
+            super(ImageManager.Decoder, self).__init__()
+            self.signals = ImageManager.Decoder.Signals()
+            self.setAutoDelete(True)
+            self.func = func
+            self.app_name = app_name
+            self.color = color
+            self.preset = preset
+
+        def run(self):
+            self.signals.decoded.emit(self.func(QImage, self.app_name, self.color, self.preset))
+
+    @dataclass
+    class Request:
+        game: Game
+        callback: Callable[[], None]
+        # lk: geometry of the requesting widget in the coordinates of the library container,
+        # lk: None for requests that are not part of the library view
+        anchor: Optional[QRect] = None
+
     def __init__(self, signals: GlobalSignals, core: LegendaryCore):
         # lk: the ordering in __img_types matters for the order of fallbacks
         # self.__img_types: Tuple = ("DieselGameBoxTall", "Thumbnail", "DieselGameBoxLogo", "DieselGameBox", "OfferImageTall")
         self.__img_types: Tuple = ("DieselGameBoxTall", "Thumbnail", "DieselGameBoxLogo", "OfferImageTall")
-        self.__dl_retries = 1
+        self.__dl_retries = 3
+        # lk: global limit of concurrent image requests, shared between all games
+        self.__dl_concurrency = 16
         self.__worker_app_names: Set[str] = set()
+        # lk: number of games downloaded through `download_image()`, excluding the ones in a batch
+        self.__worker_count: int = 0
+        # lk: minimum number of games without covers to go through the batch pipeline, see `populate()`
+        self.__batch_threshold = 32
+        self.__batch_cancel = threading.Event()
         super(QObject, self).__init__()
         self.signals = signals
         self.core = core
@@ -84,47 +153,142 @@ class ImageManager(QObject):
         self.threadpool = QThreadPool()
         self.threadpool.setMaxThreadCount(4)
 
+        # lk: separate pool for decoding, so covers on disk don't wait behind downloads
+        self.decode_threadpool = QThreadPool()
+        self.decode_threadpool.setMaxThreadCount(max(2, QThread.idealThreadCount() // 2))
+
+        # lk: the batch worker waits on its fetches and conversions for a long time,
+        # lk: keep it out of `threadpool` so it doesn't take a slot from the per-game downloads
+        self.batch_threadpool = QThreadPool()
+        self.batch_threadpool.setMaxThreadCount(1)
+
+        self.__pack = ImagePack(self.image_dir)
+        # lk: records are updated from the download threads and the decoders, serialize read-modify-write cycles
+        self.__record_lock = threading.RLock()
+
+        # lk: decoded covers, keyed by (app_name, color, preset divisor, device pixel ratio), least recently used first
+        self.__pixmap_cache: OrderedDict[Tuple[str, bool, float, float], QPixmap] = OrderedDict()
+        self.__pixmap_cache_cost: int = 0
+        self.__pixmap_cache_budget: int = QSettings().value(*options.image_cache_budget) * 1024 * 1024
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        # lk: callbacks of the covers being decoded, keyed like the cache, repeated requests wait for the same decode
+        self.__decoding: Dict[Tuple[str, bool, float, float], List[Callable[[QPixmap], None]]] = {}
+
+        # lk: one pooled session to reuse keep-alive connections to the CDN across games
+        self.__session = requests.Session()
+        retries = Retry(
+            total=self.__dl_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(pool_maxsize=self.__dl_concurrency, max_retries=retries)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+        self.__dl_executor = futures.ThreadPoolExecutor(
+            max_workers=self.__dl_concurrency, thread_name_prefix="ImageDownload"
+        )
+
+        # lk: requests from the library view waiting for a free thread, see `queue_image()`
+        self.__requests: Dict[str, ImageManager.Request] = {}
+        self.__viewport: Optional[QRect] = None
+        self.__direction: int = 0
+        self.__schedule_timer = QTimer()
+        self.__schedule_timer.setSingleShot(True)
+        self.__schedule_timer.setInterval(0)
+        self.__schedule_timer.timeout.connect(self.__schedule)
+
     def __img_dir(self, app_name: str) -> Path:
         return self.image_dir.joinpath(app_name)
 
-    def __img_json(self, app_name: str) -> Path:
-        return self.__img_dir(app_name).joinpath("image.json")
-
-    def __img_cache(self, app_name: str) -> Path:
-        return self.__img_dir(app_name).joinpath("image.cache")
+    def __img_desktop_icon(self, app_name: str) -> Path:
+        return self.__img_dir(app_name).joinpath(f"icon.{desktop_icon_suffix()}")
 
-    def __img_color(self, app_name: str) -> Path:
-        return self.__img_dir(app_name).joinpath("installed.png")
+    def __new_record(self) -> Dict:
+        return {
+            "images": dict(zip(self.__img_types, [None] * len(self.__img_types))),
+            "color": None,
+            "variants": {},
+            "scale": ImageSize.Image.pixel_ratio,
+            "size": {"w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()},
+        }
 
-    def __img_gray(self, app_name: str) -> Path:
-        return self.__img_dir(app_name).joinpath("uninstalled.png")
+    def __migrate_legacy(self, app_name: str) -> Optional[Dict]:
+        """
+        Import the images of a game from the per-directory layout of previous versions into the pack
 
-    def __img_desktop_icon(self, app_name: str) -> Path:
-        return self.__img_dir(app_name).joinpath(f"icon.{desktop_icon_suffix()}")
+        The old layout stored `image.json`, a zlib-compressed pickle of the downloaded images
+        in `image.cache` and the converted covers as `installed.png` and `uninstalled.png`.
+        The grayscale cover is not imported, it is derived from the colored one when needed.
+        """
+        legacy_json = self.__img_dir(app_name).joinpath("image.json")
+        legacy_cache = self.__img_dir(app_name).joinpath("image.cache")
+        legacy_color = self.__img_dir(app_name).joinpath("installed.png")
+        legacy_gray = self.__img_dir(app_name).joinpath("uninstalled.png")
+        if not legacy_json.is_file():
+            return None
+
+        record = self.__new_record()
+        try:
+            with open(legacy_json, "r") as file:
+                json_data: Dict = json.load(file)
+            cache_data: Dict = {}
+            if legacy_cache.is_file():
+                with open(legacy_cache, "rb") as archive:
+                    cache_data = pickle.loads(zlib.decompress(archive.read()))
+            for image_type in self.__img_types:
+                md5 = json_data.get(image_type, None)
+                if md5 is not None and cache_data.get(image_type, None) is not None:
+                    record["images"][image_type] = self.__pack.put(cache_data[image_type], md5)
+            # lk: only keep the converted covers if the images they were created from were imported
+            if legacy_color.is_file() and (
+                any(record["images"].values()) or not any(json_data.get(t) for t in self.__img_types)
+            ):
+                record["color"] = self.__pack.put(legacy_color.read_bytes())
+        except (OSError, ValueError, zlib.error, pickle.UnpicklingError) as e:
+            logger.warning("Failed to import legacy images for %s: %s", app_name, e)
+        self.__save_record(app_name, record)
+
+        for legacy in (legacy_json, legacy_cache, legacy_color, legacy_gray):
+            legacy.unlink(missing_ok=True)
+        logger.info("Migrated images for %s into the image pack", app_name)
+        return record
+
+    def __load_record(self, app_name: str) -> Dict:
+        if (record := self.__pack.get_app(app_name)) is not None:
+            # lk: records stored before variants were introduced
+            record.setdefault("variants", {})
+            return record
+        # lk: records are loaded from the batch worker and the decoders, only one of them may migrate a game
+        with self.__record_lock:
+            if (record := self.__pack.get_app(app_name)) is not None:
+                record.setdefault("variants", {})
+                return record
+            if (record := self.__migrate_legacy(app_name)) is not None:
+                return record
+        return self.__new_record()
+
+    def __has_covers(self, app_name: str, record: Dict) -> bool:
+        return (
+            record["color"] in self.__pack
+            and self.__img_desktop_icon(app_name).is_file()
+        )
 
     def __prepare_download(self, game: Game, force: bool = False) -> Tuple[List, Dict]:
-        if force and self.__img_dir(game.app_name).exists():
-            self.__img_color(game.app_name).unlink(missing_ok=True)
-            self.__img_gray(game.app_name).unlink(missing_ok=True)
+        record = self.__load_record(game.app_name)
+        if force:
+            record["color"] = None
+            record["variants"] = {}
             self.__img_desktop_icon(game.app_name).unlink(missing_ok=True)
         if not self.__img_dir(game.app_name).is_dir():
             self.__img_dir(game.app_name).mkdir()
 
-        # Load image checksums
-        if not self.__img_json(game.app_name).is_file():
-            json_data: Dict = dict(zip(self.__img_types, [None] * len(self.__img_types)))
-        else:
-            json_data = json.load(open(self.__img_json(game.app_name), "r"))
-
         # lk: Find updates or initialize if images are missing.
         # lk: `updates` will be empty for games without images
         # lk: so everything below it is skipped
         updates = []
-        if not (
-            self.__img_color(game.app_name).is_file()
-            and self.__img_gray(game.app_name).is_file()
-            and self.__img_desktop_icon(game.app_name).is_file()
-        ):
+        if not self.__has_covers(game.app_name, record):
             # lk: fast path for games without images, convert Rare's logo
             if not game.metadata.get("keyImages", []):
                 cache_data: Dict = dict(zip(self.__img_types, [None] * len(self.__img_types)))
@@ -133,191 +297,161 @@ class ImageManager(QObject):
                 ).read()
                 # cache_data["DieselGameBoxLogo"] = open(
                 #         resources_path.joinpath("images", "Rare_nonsquared.png"), "rb").read()
-                self.__convert(game, cache_data)
-                json_data["cache"] = None
-                json_data["scale"] = ImageSize.Image.pixel_ratio
-                json_data["size"] = ImageSize.Image.size.__str__()
-                json.dump(json_data, open(self.__img_json(game.app_name), "w"))
+                self.__convert(game, cache_data, record)
+                self.__save_record(game.app_name, record)
             else:
                 updates = [image for image in game.metadata["keyImages"] if image["type"] in self.__img_types]
         else:
             for image in game.metadata.get("keyImages", []):
                 if image["type"] in self.__img_types:
-                    if image["type"] not in json_data.keys() or json_data[image["type"]] != image["md5"]:
+                    if record["images"].get(image["type"], None) != image["md5"]:
                         updates.append(image)
 
-        return updates, json_data
+        return updates, record
 
-    def __download(self, updates, json_data, game, use_async: bool = False) -> bool:
-        # Decompress existing image.cache
-        if not self.__img_cache(game.app_name).is_file():
-            cache_data = dict(zip(self.__img_types, [None] * len(self.__img_types)))
-        else:
-            cache_data = self.__decompress(game)
+    def __fetch(self, image: Dict) -> bytes:
+        payload = {"resize": 1, "w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()}
+        response = self.__session.get(image["url"], params=payload, timeout=10)
+        response.raise_for_status()
+        return response.content
+
+    def __save_record(self, app_name: str, record: Dict) -> None:
+        with self.__record_lock:
+            self.__pack.set_app(app_name, record)
+
+    def __set_cover(self, record: Dict, cover: bytes) -> None:
+        record["color"] = self.__pack.put(cover)
+        # lk: variants are scaled from the cover, they are generated again on the next load
+        record["variants"] = {}
 
+    def __convert(self, game: Game, images: Dict, record: Dict) -> None:
+        self.__set_cover(
+            record,
+            convert_cover(
+                images, self.__img_types, str(self.__img_desktop_icon(game.app_name)), desktop_icon_suffix().upper()
+            ),
+        )
+
+    def __load_cache(self, record: Dict) -> Dict:
+        # Map existing images from the pack
+        return {
+            image_type: self.__pack.get(record["images"].get(image_type, None))
+            for image_type in self.__img_types
+        }
+
+    @staticmethod
+    def __filter_updates(updates: List, record: Dict, cache_data: Dict) -> List:
         # lk: filter updates again against the cache now that it is available
-        updates = [
+        return [
             image
             for image in updates
-            if cache_data.get(image["type"], None) is None or json_data[image["type"]] != image["md5"]
+            if cache_data.get(image["type"], None) is None or record["images"][image["type"]] != image["md5"]
         ]
 
-        # Download
-        # # lk: Keep this here, so I don't have to go looking for it again,
-        # # lk: it might be useful in the future.
-        # if use_async and len(updates) > 1:
-        #     session = FuturesSession(max_workers=len(self.__img_types))
-        #     image_requests = []
-        #     for image in updates:
-        #         logger.info(f"Downloading {image['type']} for {game.app_title}")
-        #         json_data[image["type"]] = image["md5"]
-        #         payload = {"resize": 1, "w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()}
-        #         req = session.get(image["url"], params=payload)
-        #         req.image_type = image["type"]
-        #         image_requests.append(req)
-        #     for req in futures.as_completed(image_requests):
-        #         cache_data[req.image_type] = req.result().content
-        # else:
+    def __submit_fetches(self, updates: List, game: Game) -> Dict[futures.Future, Dict]:
+        image_requests = {}
         for image in updates:
             logger.info(f"Downloading {image['type']} for {game.app_name} ({game.app_title})")
-            json_data[image["type"]] = image["md5"]
-            payload = {"resize": 1, "w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()}
-            try:
-                # cache_data[image["type"]] = requests.get(image["url"], params=payload).content
-                cache_data[image["type"]] = requests.get(image["url"], params=payload, timeout=10).content
-            except Exception as e:
-                logger.error(e)
-                return False
-
-        self.__convert(game, cache_data)
-        # lk: don't keep the cache if there is no logo (kept for me)
-        # if cache_data["DieselGameBoxLogo"] is not None:
-        #     self.__compress(game, cache_data)
-        self.__compress(game, cache_data)
-
-        # hash image cache
-        try:
-            with open(self.__img_cache(game.app_name), "rb") as archive:
-                archive_hash = hashlib.md5(archive.read()).hexdigest()
-        except FileNotFoundError:
-            archive_hash = None
+            image_requests[self.__dl_executor.submit(self.__fetch, image)] = image
+        return image_requests
 
-        json_data["cache"] = archive_hash
-        json_data["scale"] = ImageSize.Image.pixel_ratio
-        json_data["size"] = {"w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()}
-
-        # write image.json
-        with open(self.__img_json(game.app_name), "w") as file:
-            json.dump(json_data, file)
+    def __store_fetch(self, request: futures.Future, image: Dict, record: Dict, cache_data: Dict, game: Game) -> None:
+        try:
+            data = request.result()
+        except Exception as e:
+            # lk: leave the failed image out of the record, it will be retried on the next request
+            logger.error("Failed to download %s for %s: %s", image["type"], game.app_name, e)
+            return
+        # lk: the pack is content-addressed by the md5 of the keyImage
+        record["images"][image["type"]] = self.__pack.put(data, image["md5"])
+        cache_data[image["type"]] = self.__pack.get(image["md5"])
 
-        return bool(updates)
+    def __store_record(self, game: Game, record: Dict) -> None:
+        record["scale"] = ImageSize.Image.pixel_ratio
+        record["size"] = {"w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()}
+        self.__save_record(game.app_name, record)
 
-    __icon_overlay: Optional[QPainterPath] = None
+    def __download(self, updates, record, game) -> bool:
+        cache_data = self.__load_cache(record)
+        updates = self.__filter_updates(updates, record, cache_data)
 
-    @staticmethod
-    def __generate_icon_overlay(rect: QRect) -> QPainterPath:
-        if ImageManager.__icon_overlay is not None:
-            return ImageManager.__icon_overlay
-        rounded_path = QPainterPath()
-        margin = 0.1
-        rounded_path.addRoundedRect(
-            QRectF(
-                rect.width() * margin,
-                rect.height() * margin,
-                rect.width() - (rect.width() * margin * 2),
-                rect.height() - (rect.width() * margin * 2)
-            ),
-            rect.height() * 0.2,
-            rect.height() * 0.2,
-        )
-        ImageManager.__icon_overlay = rounded_path
-        return ImageManager.__icon_overlay
+        # Download
+        image_requests = self.__submit_fetches(updates, game)
+        for request in futures.as_completed(image_requests):
+            self.__store_fetch(request, image_requests[request], record, cache_data, game)
 
-    @staticmethod
-    def __convert_icon(cover: QImage) -> QImage:
-        icon_size = QSize(128, 128)
-        icon = QImage(icon_size, QImage.Format_ARGB32_Premultiplied)
-        painter = QPainter(icon)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
-        painter.setRenderHint(QPainter.Antialiasing, True)
-        painter.setCompositionMode(QPainter.CompositionMode_Source)
-        painter.fillRect(icon.rect(), Qt.transparent)
-        overlay = ImageManager.__generate_icon_overlay(icon.rect())
-        brush = QBrush(cover)
-        scale = max(icon.width()/cover.width(), icon.height()/cover.height())
-        transform = QTransform().scale(scale, scale)
-        brush.setTransform(transform)
-        painter.fillPath(overlay, brush)
-        pen = QPen(Qt.black, 2)
-        painter.setPen(pen)
-        painter.drawPath(overlay)
-        painter.end()
-        return icon
-
-    def __convert(self, game, images, force=False) -> None:
-        for image in [self.__img_color(game.app_name), self.__img_gray(game.app_name)]:
-            if force and image.exists():
-                image.unlink(missing_ok=True)
-
-        cover_data = None
-        for image_type in self.__img_types:
-            if images[image_type] is not None:
-                cover_data = images[image_type]
-                break
+        if not any(data is not None for data in cache_data.values()):
+            return False
 
-        cover = QImage()
-        cover.loadFromData(cover_data)
-        cover.convertToFormat(QImage.Format_ARGB32_Premultiplied)
-        # lk: Images are not always 4/3, crop them to size
-        factor = min(cover.width() // 3, cover.height() // 4)
-        rem_w = (cover.width() - factor * 3) // 2
-        rem_h = (cover.height() - factor * 4) // 2
-        cover = cover.copy(rem_w, rem_h, factor * 3, factor * 4)
-
-        if images["DieselGameBoxLogo"] is not None:
-            logo = QImage()
-            logo.loadFromData(images["DieselGameBoxLogo"])
-            logo.convertToFormat(QImage.Format_ARGB32_Premultiplied)
-            if logo.width() > cover.width():
-                logo = logo.scaled(cover.width(), cover.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            painter = QPainter(cover)
-            painter.drawImage((cover.width() - logo.width()) // 2, cover.height() - logo.height(), logo)
-            painter.end()
-
-        cover = cover.scaled(ImageSize.Image.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        icon = self.__convert_icon(cover)
-        icon.save(str(self.__img_desktop_icon(game.app_name)), format=desktop_icon_suffix().upper())
-
-        # this is not required if we ever want to re-apply the alpha channel
-        # cover = cover.convertToFormat(QImage.Format_Indexed8)
-
-        # add the alpha channel back to the cover
-        cover = cover.convertToFormat(QImage.Format_ARGB32_Premultiplied)
-
-        cover.save(str(self.__img_color(game.app_name)), format="PNG")
-        # quick way to convert to grayscale
-        cover = cover.convertToFormat(QImage.Format_Grayscale8)
-        # add the alpha channel back to the grayscale cover
-        cover = cover.convertToFormat(QImage.Format_ARGB32_Premultiplied)
-        cover.save(str(self.__img_gray(game.app_name)), format="PNG")
+        self.__convert(game, cache_data, record)
+        self.__store_record(game, record)
 
-    def __compress(self, game: Game, data: Dict) -> None:
-        archive = open(self.__img_cache(game.app_name), "wb")
-        cdata = zlib.compress(pickle.dumps(data), level=-1)
-        archive.write(cdata)
-        archive.close()
+        return bool(updates)
 
-    def __decompress(self, game: Game) -> Dict:
-        archive = open(self.__img_cache(game.app_name), "rb")
-        try:
-            data = zlib.decompress(archive.read())
-            data = pickle.loads(data)
-        except zlib.error:
-            data = dict(zip(self.__img_types, [None] * len(self.__img_types)))
-        finally:
-            archive.close()
-        return data
+    def __download_batch(self, batch: List[Tuple[Game, List, Dict]], completed: pyqtBoundSignal) -> None:
+        start_time = time.perf_counter()
+        fetches: Dict[futures.Future, Tuple[Game, Dict, Dict, Dict]] = {}
+        conversions: Dict[futures.Future, Tuple[Game, Dict]] = {}
+        remaining: Dict[str, int] = {}
+        converted = 0
+
+        with conversion_pool() as pool:
+
+            def submit_conversion(_game: Game, _record: Dict, _cache_data: Dict) -> Optional[futures.Future]:
+                if not any(data is not None for data in _cache_data.values()):
+                    completed.emit(_game)
+                    return None
+                # lk: memoryviews into the pack can't be pickled, copy them for the worker processes
+                images = {t: bytes(d) if d is not None else None for t, d in _cache_data.items()}
+                conversion = pool.submit(
+                    convert_cover, images, self.__img_types,
+                    str(self.__img_desktop_icon(_game.app_name)), desktop_icon_suffix().upper(),
+                )
+                conversions[conversion] = (_game, _record)
+                return conversion
+
+            pending: Set[futures.Future] = set()
+            for game, updates, record in batch:
+                cache_data = self.__load_cache(record)
+                updates = self.__filter_updates(updates, record, cache_data)
+                if not updates:
+                    if (conversion := submit_conversion(game, record, cache_data)) is not None:
+                        pending.add(conversion)
+                    continue
+                remaining[game.app_name] = len(updates)
+                for request, image in self.__submit_fetches(updates, game).items():
+                    fetches[request] = (game, image, record, cache_data)
+                    pending.add(request)
+
+            while pending:
+                if self.__batch_cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    break
+                done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        game, image, record, cache_data = fetches.pop(future)
+                        self.__store_fetch(future, image, record, cache_data, game)
+                        remaining[game.app_name] -= 1
+                        if not remaining[game.app_name]:
+                            if (conversion := submit_conversion(game, record, cache_data)) is not None:
+                                pending.add(conversion)
+                    else:
+                        game, record = conversions.pop(future)
+                        try:
+                            self.__set_cover(record, future.result())
+                        except Exception as e:
+                            logger.error("Failed to convert cover for %s: %s", game.app_name, e)
+                        else:
+                            self.__store_record(game, record)
+                            converted += 1
+                        completed.emit(game)
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            "Batch converted %s covers in %.2f seconds (%.1f covers/s)", converted, elapsed, converted / elapsed
+        )
 
     def download_image(
         self, game: Game, load_callback: Callable[[], None], priority: int, force: bool = False
@@ -325,61 +459,433 @@ class ImageManager(QObject):
         if game.app_name in self.__worker_app_names:
             return
         self.__worker_app_names.add(game.app_name)
-        updates, json_data = self.__prepare_download(game, force)
+        if force:
+            self.evict(game.app_name)
+        updates, record = self.__prepare_download(game, force)
         if not updates:
             self.__worker_app_names.remove(game.app_name)
             load_callback()
         else:
-            image_worker = ImageManager.Worker(self.__download, updates, json_data, game)
-            image_worker.signals.completed.connect(lambda g: self.__worker_app_names.remove(g.app_name))
+            self.__worker_count += 1
+            image_worker = ImageManager.Worker(self.__download, updates, record, game)
+            image_worker.signals.completed.connect(self.__on_completed)
             image_worker.signals.completed.connect(load_callback)
             self.threadpool.start(image_worker, priority)
 
+    def __on_completed(self, game: Game) -> None:
+        self.__worker_count -= 1
+        self.__on_batch_completed(game)
+
+    def __on_batch_completed(self, game: Game) -> None:
+        self.__worker_app_names.discard(game.app_name)
+        self.evict(game.app_name)
+        self.__schedule_timer.start()
+
+    def __on_batch_released(self, game: Game) -> None:
+        self.__worker_app_names.discard(game.app_name)
+        self.__schedule_timer.start()
+
+    def __populate(self, games: List[Game], completed: pyqtBoundSignal, released: pyqtBoundSignal) -> None:
+        # lk: loading the records migrates the images of previous versions, keep it off the GUI thread
+        batch = []
+        for game in games:
+            if self.__batch_cancel.is_set():
+                return
+            updates, record = self.__prepare_download(game)
+            if updates:
+                batch.append((game, updates, record))
+            else:
+                released.emit(game)
+        if len(batch) < self.__batch_threshold:
+            for game, _, _ in batch:
+                released.emit(game)
+            return
+        logger.info("Populating covers for %s games", len(batch))
+        self.__download_batch(batch, completed)
+
+    def populate(self, games: List[Game]) -> None:
+        """
+        Download and convert the covers of many games at once, for example on the first run.
+
+        Images are fetched through the shared session and the covers are converted in a pool
+        of processes, one for each core. Games are marked as in progress until their cover is
+        stored, requests from the library view for them are served after the batch finished it.
+        Libraries with fewer than `__batch_threshold` missing covers are left to `queue_image()`.
+        Finding the missing covers happens in the background too, the games are released to
+        `queue_image()` as soon as they turn out to need nothing or not to be part of the batch.
+
+        @param games: The games to create covers for
+        """
+        games = [
+            game for game in games
+            if game.app_name not in self.__worker_app_names and game.metadata.get("keyImages", [])
+        ]
+        self.__worker_app_names.update(game.app_name for game in games)
+        batch_worker = ImageManager.BatchWorker(self.__populate, games)
+        batch_worker.signals.completed.connect(self.__on_batch_completed)
+        batch_worker.signals.released.connect(self.__on_batch_released)
+        self.batch_threadpool.start(batch_worker)
+
+    def __in_range(self, anchor: Optional[QRect]) -> bool:
+        if anchor is None or self.__viewport is None:
+            return True
+        # lk: keep requests one viewport behind and two viewports ahead of the scroll direction
+        height = self.__viewport.height()
+        above = height * 2 if self.__direction < 0 else height // 2 if self.__direction > 0 else height
+        below = height * 2 if self.__direction > 0 else height // 2 if self.__direction < 0 else height
+        return self.__viewport.adjusted(0, -above, 0, below).intersects(anchor)
+
+    def __rank(self, anchor: Optional[QRect]) -> int:
+        if anchor is None or self.__viewport is None:
+            return 0
+        if anchor.bottom() < self.__viewport.top():
+            distance = self.__viewport.top() - anchor.bottom()
+            ahead = self.__direction < 0
+        elif anchor.top() > self.__viewport.bottom():
+            distance = anchor.top() - self.__viewport.bottom()
+            ahead = self.__direction > 0
+        else:
+            # lk: visible, rank by position to load them top to bottom
+            return anchor.top() - self.__viewport.top() - self.__viewport.height()
+        # lk: rows the user is heading towards are worth twice as much as the ones left behind
+        return distance // 2 if ahead else distance
+
+    def __schedule(self) -> None:
+        # lk: requests for games that are part of a running batch wait until the batch has stored them
+        while self.__worker_count < self.threadpool.maxThreadCount():
+            waiting = [a for a in self.__requests if a not in self.__worker_app_names]
+            if not waiting:
+                break
+            app_name = min(waiting, key=lambda a: self.__rank(self.__requests[a].anchor))
+            request = self.__requests.pop(app_name)
+            self.download_image(request.game, request.callback, 0, False)
+
+    def set_viewport(self, viewport: QRect, direction: int = 0) -> None:
+        """
+        Update the visible area of the library, queued requests are re-ranked and
+        the ones that have been scrolled out of range are cancelled.
+
+        @param viewport: The visible rectangle in the coordinates of the library container
+        @param direction: Negative if the last scroll was upwards, positive if downwards
+        """
+        self.__viewport = viewport
+        self.__direction = direction
+        for app_name in [a for a, r in self.__requests.items() if not self.__in_range(r.anchor)]:
+            self.__requests.pop(app_name)
+        self.__schedule_timer.start()
+
+    def queue_image(self, game: Game, load_callback: Callable[[], None], anchor: Optional[QRect] = None) -> None:
+        """
+        Queue loading the image of a game, requests closer to the viewport are served first.
+
+        @param game: The Game to load the image for
+        @param load_callback: Callable to run after the image is available
+        @param anchor: The geometry of the requesting widget in the coordinates of the library container
+        """
+        if not self.__in_range(anchor):
+            return
+        self.__requests[game.app_name] = ImageManager.Request(game, load_callback, anchor)
+        self.__schedule_timer.start()
+
     def download_image_blocking(self, game: Game, force: bool = False) -> None:
-        updates, json_data = self.__prepare_download(game, force)
+        updates, record = self.__prepare_download(game, force)
         if not updates:
             return
         if updates:
-            self.__download(updates, json_data, game, use_async=True)
+            self.__download(updates, record, game)
+
+    @staticmethod
+    def __desaturate(image: QImage) -> QImage:
+        # quick way to convert to grayscale
+        gray = image.convertToFormat(QImage.Format_Grayscale8)
+        # add the alpha channel back to the grayscale cover
+        gray = gray.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        gray.setDevicePixelRatio(image.devicePixelRatioF())
+        return gray
+
+    def __variant(self, preset: ImageSize.Preset) -> ImageSize.Preset:
+        return ImageSize.Preset(preset.divisor, self.device.pixel_ratio)
+
+    @staticmethod
+    def __variant_key(variant: ImageSize.Preset) -> str:
+        return f"{variant.divisor:g}@{variant.pixel_ratio:g}"
+
+    def __store_variant(self, app_name: str, cover: str, key: str, image: QImage) -> None:
+        data = self.__pack.put(encode_png(image))
+        with self.__record_lock:
+            record = self.__load_record(app_name)
+            # lk: the cover has been replaced while scaling, this variant is already stale
+            if record["color"] != cover:
+                return
+            record["variants"][key] = data
+            self.__pack.set_app(app_name, record)
+
+    def __touch(self, app_name: str, record: Dict) -> None:
+        # lk: access times are only used to order games for garbage collection,
+        # lk: an hour of resolution is enough and spares a journal write on every load
+        now = int(time.time())
+        if record["color"] is None or now - record.get("access", 0) < 3600:
+            return
+        with self.__record_lock:
+            record = self.__load_record(app_name)
+            record["access"] = now
+            self.__pack.set_app(app_name, record)
+
+    @staticmethod
+    def __record_blobs(record: Dict) -> Iterable[Optional[str]]:
+        yield from record["images"].values()
+        yield record["color"]
+        yield from record.get("variants", {}).values()
+
+    @staticmethod
+    def __path_size(path: Path) -> int:
+        if path.is_file():
+            return path.stat().st_size
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+    def __collect_garbage(self, app_names: Set[str], budget: int) -> int:
+        reclaimed = 0
+        variant_suffix = f"@{self.device.pixel_ratio:g}"
+
+        # lk: games that left the account, expired bundles and covers created at a different resolution
+        with self.__record_lock:
+            for app_name in self.__pack.apps():
+                record = self.__load_record(app_name)
+                if app_name not in app_names or record["scale"] != ImageSize.Image.pixel_ratio or record["size"] != {
+                    "w": ImageSize.Image.size.width(), "h": ImageSize.Image.size.height()
+                }:
+                    self.__pack.remove_app(app_name)
+                    continue
+                variants = {k: v for k, v in record["variants"].items() if k.endswith(variant_suffix)}
+                if variants != record["variants"]:
+                    record["variants"] = variants
+                    self.__pack.set_app(app_name, record)
+        for path in self.image_dir.iterdir():
+            if path.is_dir() and path.name not in app_names:
+                reclaimed += self.__path_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+
+        # lk: drop the least recently shown games until the pack fits in the budget,
+        # lk: their images are downloaded again when they are shown
+        with self.__record_lock:
+            records = {app_name: self.__load_record(app_name) for app_name in self.__pack.apps()}
+            refcount: Dict[str, int] = {}
+            for record in records.values():
+                for key in filter(None, self.__record_blobs(record)):
+                    refcount[key] = refcount.get(key, 0) + 1
+            size = sum(self.__pack.size(key) for key in refcount)
+            for app_name in sorted(records, key=lambda a: records[a].get("access", 0)):
+                if size <= budget:
+                    break
+                for key in filter(None, self.__record_blobs(records[app_name])):
+                    refcount[key] -= 1
+                    if not refcount[key]:
+                        size -= self.__pack.size(key)
+                self.__pack.remove_app(app_name)
+                logger.debug("Removed images of %s to fit the disk budget", app_name)
+
+        reclaimed += self.__pack.compact(self.__record_blobs)
+        return reclaimed
+
+    def collect_garbage(self, app_names: Iterable[str]) -> None:
+        """
+        Remove images of games that are not in the library anymore and keep the rest in the disk budget.
+
+        Runs in the background. Images of games that are not in `app_names` are removed, along
+        with covers created for a different resolution. If the remaining images exceed the
+        `image_disk_budget` option, the least recently shown games are removed from the image
+        cache until they fit, their images are downloaded again when needed.
+
+        @param app_names: The app_names of all games and DLCs in the library
+        """
+        app_names = set(app_names)
+        if not app_names:
+            # lk: an empty library is more likely a failed fetch than an empty account
+            return
+        budget = QSettings().value(*options.image_disk_budget) * 1024 * 1024
+        collector = ImageManager.Collector(self.__collect_garbage, app_names, budget)
+        collector.signals.collected.connect(
+            lambda reclaimed: logger.info("Reclaimed %.2f MiB from the image cache", reclaimed / 1024 / 1024)
+        )
+        self.decode_threadpool.start(collector)
 
     def __get_cover(
-        self, container: Union[Type[QPixmap], Type[QImage]], app_name: str, color: bool = True
+        self, container: Union[Type[QPixmap], Type[QImage]], app_name: str, color: bool, preset: ImageSize.Preset
     ) -> Union[QPixmap, QImage]:
-        ret = container()
         if not app_name:
             raise RuntimeError("app_name is an empty string")
-        if color:
-            if self.__img_color(app_name).is_file():
-                ret.load(str(self.__img_color(app_name)))
-        else:
-            if self.__img_gray(app_name).is_file():
-                ret.load(str(self.__img_gray(app_name)))
+        record = self.__load_record(app_name)
+        self.__touch(app_name, record)
+        variant = self.__variant(preset)
+        key = self.__variant_key(variant)
+        ret = QImage()
+        if (data := self.__pack.get(record["variants"].get(key, None))) is not None:
+            ret.loadFromData(data)
+        if ret.isNull() and (data := self.__pack.get(record["color"])) is not None:
+            ret.loadFromData(data)
+            # lk: scale the cover once to the exact size it is painted at and keep the result,
+            # lk: following loads of this variant only need to decode it
+            if not ret.isNull() and ret.size() != variant.size:
+                ret = ret.scaled(variant.size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                self.__store_variant(app_name, record["color"], key, ret)
         if not ret.isNull():
-            ret.setDevicePixelRatio(ImageSize.Image.pixel_ratio)
-            # lk: Scaling happens at painting. It might be inefficient so leave this here as an alternative
-            # lk: If this is uncommented, the transformation in ImageWidget should be adjusted also
-            ret = ret.scaled(self.device.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            ret.setDevicePixelRatio(self.device.pixel_ratio)
+            ret.setDevicePixelRatio(variant.pixel_ratio)
+            # lk: only the colored cover is stored, the grayscale one is derived at the display size
+            if not color:
+                ret = self.__desaturate(ret)
+        if container is QPixmap:
+            pixmap = QPixmap.fromImage(ret)
+            pixmap.setDevicePixelRatio(ret.devicePixelRatioF())
+            return pixmap
         return ret
 
-    def get_pixmap(self, app_name: str, color: bool = True) -> QPixmap:
+    def __derive_gray(self, app_name: str, preset: ImageSize.Preset) -> Optional[QPixmap]:
+        """
+        Derive the grayscale pixmap from the colored one if it is in memory, without touching the disk
+        """
+        if (color := self.cached_pixmap(app_name, True, preset)) is None:
+            return None
+        gray = self.__desaturate(color.toImage())
+        pixmap = QPixmap.fromImage(gray)
+        pixmap.setDevicePixelRatio(gray.devicePixelRatioF())
+        self.__cache_insert(app_name, False, preset, pixmap)
+        return pixmap
+
+    def __cache_key(self, app_name: str, color: bool, preset: ImageSize.Preset) -> Tuple[str, bool, float, float]:
+        return app_name, color, preset.divisor, self.device.pixel_ratio
+
+    @staticmethod
+    def __cache_cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def __cache_insert(self, app_name: str, color: bool, preset: ImageSize.Preset, pixmap: QPixmap) -> None:
+        if pixmap.isNull():
+            return
+        key = self.__cache_key(app_name, color, preset)
+        if (previous := self.__pixmap_cache.pop(key, None)) is not None:
+            self.__pixmap_cache_cost -= self.__cache_cost(previous)
+        self.__pixmap_cache[key] = pixmap
+        self.__pixmap_cache_cost += self.__cache_cost(pixmap)
+        while self.__pixmap_cache_cost > self.__pixmap_cache_budget and len(self.__pixmap_cache) > 1:
+            _, evicted = self.__pixmap_cache.popitem(last=False)
+            self.__pixmap_cache_cost -= self.__cache_cost(evicted)
+
+    def __cache_lookup(self, app_name: str, color: bool, preset: ImageSize.Preset) -> Optional[QPixmap]:
+        key = self.__cache_key(app_name, color, preset)
+        if (pixmap := self.__pixmap_cache.get(key, None)) is not None:
+            self.__pixmap_cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        return pixmap
+
+    def cached_pixmap(
+        self, app_name: str, color: bool = True, preset: ImageSize.Preset = ImageSize.Display
+    ) -> Optional[QPixmap]:
+        """
+        Get the pixmap of a game only if it is already in memory, without counting it as a cache hit or miss
+
+        @param app_name: The RareGame object for this game
+        @param color: True to get the colored pixmap, False to get the grayscale
+        @param preset: The size the pixmap is displayed at
+        @return: QPixmap or None if it has not been loaded or it has been evicted
+        """
+        key = self.__cache_key(app_name, color, preset)
+        if (pixmap := self.__pixmap_cache.get(key, None)) is not None:
+            self.__pixmap_cache.move_to_end(key)
+        return pixmap
+
+    def evict(self, app_name: str) -> None:
+        """
+        Drop the in-memory pixmaps of a single game, for example after its cover has been updated
+
+        @param app_name: The RareGame object for this game
+        """
+        for key in [key for key in self.__pixmap_cache if key[0] == app_name]:
+            self.__pixmap_cache_cost -= self.__cache_cost(self.__pixmap_cache.pop(key))
+
+    def get_pixmap(self, app_name: str, color: bool = True, preset: ImageSize.Preset = ImageSize.Display) -> QPixmap:
         """
         Use when the image is to be presented directly on the screen.
 
         @param app_name: The RareGame object for this game
         @param color: True to load the colored pixmap, False to load the grayscale
+        @param preset: The size the pixmap is displayed at, the pixmap is scaled to it for the current pixel ratio
         @return: QPixmap
         """
-        pixmap: QPixmap = self.__get_cover(QPixmap, app_name, color)
+        if (pixmap := self.__cache_lookup(app_name, color, preset)) is not None:
+            return pixmap
+        if not color and (pixmap := self.__derive_gray(app_name, preset)) is not None:
+            return pixmap
+        pixmap: QPixmap = self.__get_cover(QPixmap, app_name, color, preset)
+        self.__cache_insert(app_name, color, preset, pixmap)
         return pixmap
 
-    def get_image(self, app_name: str, color: bool = True) -> QImage:
+    def get_image(self, app_name: str, color: bool = True, preset: ImageSize.Preset = ImageSize.Display) -> QImage:
         """
         Use when the image has to be manipulated before being rendered.
 
         @param app_name: The RareGame object for this game
         @param color: True to load the colored image, False to load the grayscale
+        @param preset: The size the image is displayed at, the image is scaled to it for the current pixel ratio
         @return: QImage
         """
-        image: QImage = self.__get_cover(QImage, app_name, color)
+        image: QImage = self.__get_cover(QImage, app_name, color, preset)
         return image
+
+    def get_image_async(
+        self,
+        app_name: str,
+        color: bool,
+        callback: Callable[[QPixmap], None],
+        preset: ImageSize.Preset = ImageSize.Display,
+    ) -> None:
+        """
+        Use when the image is to be presented on the screen without blocking the GUI thread.
+
+        The image is decoded and scaled on a worker thread, only the conversion
+        to QPixmap happens on the GUI thread before `callback` is called.
+
+        @param app_name: The RareGame object for this game
+        @param color: True to load the colored image, False to load the grayscale
+        @param callback: Called on the GUI thread with the QPixmap
+        @param preset: The size the image is displayed at, the image is scaled to it for the current pixel ratio
+        """
+        if not app_name:
+            raise RuntimeError("app_name is an empty string")
+        if (pixmap := self.__cache_lookup(app_name, color, preset)) is not None:
+            callback(pixmap)
+            return
+        if not color and (pixmap := self.__derive_gray(app_name, preset)) is not None:
+            callback(pixmap)
+            return
+        key = self.__cache_key(app_name, color, preset)
+        if (callbacks := self.__decoding.get(key, None)) is not None:
+            callbacks.append(callback)
+            return
+        self.__decoding[key] = [callback]
+
+        def on_decoded(image: QImage):
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(image.devicePixelRatioF())
+            self.__cache_insert(app_name, color, preset, pixmap)
+            for pending in self.__decoding.pop(key, []):
+                pending(pixmap)
+
+        decoder = ImageManager.Decoder(self.__get_cover, app_name, color, preset)
+        decoder.signals.decoded.connect(on_decoded)
+        self.decode_threadpool.start(decoder)
+
+    def deleteLater(self) -> None:
+        logger.debug("Pixmap cache hits: %s, misses: %s", self.cache_hits, self.cache_misses)
+        self.__pixmap_cache.clear()
+        self.__decoding.clear()
+        self.__requests.clear()
+        self.__batch_cancel.set()
+        self.batch_threadpool.waitForDone()
+        self.threadpool.waitForDone()
+        self.decode_threadpool.waitForDone()
+        self.__dl_executor.shutdown(wait=True)
+        self.__session.close()
+        self.__pack.close()
+        super(ImageManager, self).deleteLater()
@@ -2,10 +2,14 @@ import configparser
 import os
 import time
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from itertools import chain
 from logging import getLogger
+from pathlib import Path
+from threading import Event
 from typing import Dict, Iterator, Callable, Optional, List, Union, Iterable, Tuple, Set
 
+import orjson
 from PyQt5.QtCore import QObject, pyqtSignal, QSettings, pyqtSlot, QThreadPool, QRunnable, QTimer
 from legendary.lfs.eos import EOSOverlayApp
 from legendary.models.game import Game, SaveGameFile
@@ -14,9 +18,11 @@ from requests.exceptions import HTTPError, ConnectionError
 from rare.lgndr.core import LegendaryCore
 from rare.models.base_game import RareSaveGame
 from rare.models.game import RareGame, RareEosOverlay
+from rare.models.options import options
 from rare.models.signals import GlobalSignals
-from rare.utils.metrics import timelogger
+from rare.utils.metrics import span, timelogger, tracer
 from rare.utils import config_helper
+from rare.utils.paths import cache_dir
 from .image_manager import ImageManager
 from .workers import (
     QueueWorker,
@@ -26,6 +32,7 @@ from .workers import (
     GamesDlcsWorker,
     EntitlementsWorker,
     OriginWineWorker,
+    ValidateWorker,
 )
 from .workers.uninstall import uninstall_game
 from .workers.worker import QueueWorkerInfo, QueueWorkerState
@@ -37,6 +44,11 @@ logger = getLogger("RareCore")
 class RareCore(QObject):
     progress = pyqtSignal(int, str)
     completed = pyqtSignal()
+    # lk: emitted when a fetch updated a library that was already loaded, either from the snapshot or a refresh
+    # lk: list: app_names of added games, list: app_names of changed games, list: app_names of removed games
+    reconciled = pyqtSignal(list, list, list)
+    # lk: emitted when the entitlements requested in the background differ from the cached ones used at startup
+    entitlements_changed = pyqtSignal()
     # lk: these are unused but remain if case they are become relevant
     # completed_saves = pyqtSignal()
     # completed_origin = pyqtSignal()
@@ -45,6 +57,24 @@ class RareCore(QObject):
     # lk: special case class attribute, this has to be here
     __instance: Optional['RareCore'] = None
 
+    # lk: conditions of the library indexes. Static ones depend only on the game's metadata and are
+    # lk: evaluated when a game is added or updated, dynamic ones are evaluated again on the game's signals
+    __static_indexes: Dict[str, Callable[[RareGame], bool]] = {
+        "games": lambda game: not game.is_dlc or game.is_launchable_addon,
+        "origin_games": lambda game: game.is_origin and not game.is_dlc,
+        "ubisoft_games": lambda game: game.is_ubisoft and not game.is_dlc,
+        "bit32_games": lambda game: game.is_win32,
+        "mac_games": lambda game: game.is_mac,
+        "non_asset_games": lambda game: game.is_non_asset,
+        "unreal_engine": lambda game: game.is_unreal,
+    }
+    __dynamic_indexes: Dict[str, Callable[[RareGame], bool]] = {
+        "installed_games": lambda game: game.is_installed and not game.is_dlc,
+        "updates": lambda game: game.has_update,
+        "has_saves": lambda game: bool(game.saves),
+        "has_dlcs": lambda game: bool(game.owned_dlcs),
+    }
+
     def __init__(self, args: Namespace):
         if self.__instance is not None:
             raise RuntimeError("RareCore already initialized")
@@ -69,8 +99,15 @@ class RareCore(QObject):
         self.queue_workers: List[QueueWorker] = []
         self.queue_threadpool = QThreadPool()
         self.queue_threadpool.setMaxThreadCount(2)
+        self.validate_threadpool = QThreadPool()
+        self.validate_threadpool.setMaxThreadCount(8)
+        self.__validate_cancel = Event()
 
         self.__library: Dict[str, RareGame] = {}
+        # lk: dicts are used as insertion ordered sets of the games matching each condition
+        self.__indexes: Dict[str, Dict[str, RareGame]] = {
+            name: {} for name in chain(self.__static_indexes, self.__dynamic_indexes)
+        }
         self.__eos_overlay = RareEosOverlay(self.__core, EOSOverlayApp)
         self.__eos_overlay.signals.game.install.connect(self.__signals.game.install)
         self.__eos_overlay.signals.game.uninstall.connect(self.__signals.game.uninstall)
@@ -78,6 +115,8 @@ class RareCore(QObject):
         self.__fetch_progress: int = 0
         self.__fetched_games_dlcs: bool = False
         self.__fetched_entitlements: bool = False
+        self.__reconcile: bool = False
+        self.__reconciled: Tuple[List, List, List] = ([], [], [])
 
         RareCore.__instance = self
 
@@ -218,6 +257,15 @@ class RareCore(QObject):
         return self.__settings
 
     def deleteLater(self) -> None:
+        # lk: stop the validations still running, but don't wait long for them,
+        # lk: they might be stuck on an unresponsive device
+        self.__validate_cancel.set()
+        self.validate_threadpool.clear()
+        if not self.validate_threadpool.waitForDone(2000):
+            logger.warning("Validations are still running, not waiting for them")
+
+        RareGame.metadata_store().flush()
+
         self.__image_manager.deleteLater()
         del self.__image_manager
         self.__image_manager = None
@@ -239,8 +287,28 @@ class RareCore(QObject):
         RareCore.__instance = None
         super(RareCore, self).deleteLater()
 
-    def __validate_install(self, rgame: RareGame):
-        if not os.path.exists(rgame.igame.install_path):
+    def __validate_installs(self, rgames: List[RareGame]) -> None:
+        installs = []
+        for rgame in rgames:
+            # lk: games that don't have an override and can't find their executable due to case sensitivity
+            # lk: will still erroneously require verification. This might need to be removed completely
+            # lk: or be decoupled from the verification requirement
+            if override_exe := self.__core.lgd.config.get(rgame.app_name, "override_exe", fallback=""):
+                igame_executable = override_exe
+            else:
+                igame_executable = rgame.igame.executable
+            installs.append((rgame.app_name, rgame.igame.install_path, igame_executable))
+        # lk: validate installations on different devices in parallel, but don't flood a single one
+        # lk: with requests. Results are applied as they arrive, a slow device doesn't hold up the rest
+        for worker in ValidateWorker.create(installs, per_device=2, cancel=self.__validate_cancel):
+            worker.signals.result.connect(self.__on_validate_result)
+            self.validate_threadpool.start(worker)
+
+    @pyqtSlot(str, int, str)
+    def __on_validate_result(self, app_name: str, result: int, message: str):
+        if (rgame := self.__library.get(app_name, None)) is None or not rgame.is_installed:
+            return
+        if result == ValidateWorker.Result.MISSING:
             # lk: since install_path is lost anyway, set keep_files to True
             # lk: to avoid spamming the log with "file not found" errors
             for dlc in rgame.owned_dlcs:
@@ -254,22 +322,20 @@ class RareCore(QObject):
             uninstall_game(self.__core, rgame, keep_files=True, keep_config=True)
             logger.info(f"Uninstalled {rgame.app_title}, because no game files exist")
             rgame.igame = None
-            return
-        # lk: games that don't have an override and can't find their executable due to case sensitivity
-        # lk: will still erroneously require verification. This might need to be removed completely
-        # lk: or be decoupled from the verification requirement
-        if override_exe := self.__core.lgd.config.get(rgame.app_name, "override_exe", fallback=""):
-            igame_executable = override_exe
-        else:
-            igame_executable = rgame.igame.executable
-        # lk: Case-insensitive search for the game's executable (example: Brothers - A Tale of two Sons)
-        executable_path = os.path.join(rgame.igame.install_path, igame_executable.replace("\\", "/").lstrip("/"))
-        file_list = map(str.lower, os.listdir(os.path.dirname(executable_path)))
-        if not os.path.basename(executable_path).lower() in file_list:
+            rgame.signals.game.uninstalled.emit(rgame.app_name)
+        elif result == ValidateWorker.Result.NEEDS_VERIFICATION:
             rgame.igame.needs_verification = True
             self.__core.lgd.set_installed_game(rgame.app_name, rgame.igame)
             rgame.update_igame()
             logger.info(f"{rgame.app_title} needs verification")
+        elif result == ValidateWorker.Result.ERROR:
+            logger.info(f'Marking "{rgame.app_title}" as not installed because an exception has occurred...')
+            logger.error(message)
+            rgame.set_installed(False)
+            return
+        else:
+            return
+        rgame.signals.widget.update.emit()
 
     def get_game(self, app_name: str) -> Union[RareEosOverlay, RareGame]:
         if app_name == EOSOverlayApp.app_name:
@@ -288,42 +354,204 @@ class RareCore(QObject):
         rgame.signals.game.uninstalled.connect(self.__signals.game.uninstalled)
         rgame.signals.game.finished.connect(self.__signals.application.update_tray)
         rgame.signals.game.finished.connect(lambda: self.__signals.discord_rpc.set_title.emit(""))
+        # lk: keep the dynamic indexes up to date with the state of the game. These are slots of RareCore
+        # lk: so that they run in the GUI thread even when the signals are emitted from a worker
+        rgame.signals.game.installed.connect(self.__on_game_state_changed)
+        rgame.signals.game.uninstalled.connect(self.__on_game_state_changed)
+        rgame.signals.game.saves_loaded.connect(self.__on_game_saves_loaded)
+        rgame.signals.download.enqueue.connect(self.__on_game_state_changed)
+        rgame.signals.download.dequeue.connect(self.__on_game_state_changed)
         self.__library[rgame.app_name] = rgame
+        self.__update_index(rgame)
+
+    @pyqtSlot(str)
+    def __on_game_state_changed(self, app_name: str) -> None:
+        if rgame := self.__library.get(app_name, None):
+            self.__update_index(rgame, self.__dynamic_indexes)
+
+    @pyqtSlot(str)
+    def __on_game_saves_loaded(self, app_name: str) -> None:
+        if rgame := self.__library.get(app_name, None):
+            self.__update_index(rgame, {"has_saves": self.__dynamic_indexes["has_saves"]})
+
+    def __update_index(self, rgame: RareGame, conditions: Optional[Dict[str, Callable]] = None) -> None:
+        if rgame.app_name not in self.__library:
+            return
+        if conditions is None:
+            conditions = dict(chain(self.__static_indexes.items(), self.__dynamic_indexes.items()))
+        for name, condition in conditions.items():
+            if condition(rgame):
+                self.__indexes[name][rgame.app_name] = rgame
+            else:
+                self.__indexes[name].pop(rgame.app_name, None)
+
+    def __indexed_games(self, name: str) -> Iterator[RareGame]:
+        # lk: iterate over a copy, the indexes can change while the caller iterates
+        return iter(tuple(self.__indexes[name].values()))
 
     def __filter_games(self, condition: Callable[[RareGame], bool]) -> Iterator[RareGame]:
         return filter(condition, self.__library.values())
 
+    @staticmethod
+    def __game_revision(game: Game) -> Tuple:
+        """
+        Identify the revision of a game's metadata
+
+        @param game: The game to identify
+        @return: The build versions of its assets, the modification date of its catalog item and its sidecar revision
+        """
+        return (
+            tuple(sorted((platform, asset.build_version) for platform, asset in (game.asset_infos or {}).items())),
+            game.metadata.get("lastModifiedDate", None),
+            game.sidecar.rev if game.sidecar else None,
+        )
+
     def __create_or_update_rgame(self, game: Game) -> RareGame:
         if rgame := self.__library.get(game.app_name, False):
-            logger.warning(f"{rgame.app_name} already present in {type(self).__name__}")
-            logger.info(f"Updating Game for {rgame.app_name}")
+            # lk: skip rebuilding games whose metadata did not change since they were loaded,
+            # lk: but still pick up changes to their installation made outside of Rare
+            if self.__game_revision(rgame.game) == self.__game_revision(game):
+                igame = rgame.igame
+                rgame.update_igame()
+                if rgame.igame != igame:
+                    logger.debug(f"Updating InstalledGame for {rgame.app_name}")
+                    self.__update_index(rgame, self.__dynamic_indexes)
+                    rgame.signals.widget.update.emit()
+                return rgame
+            logger.debug(f"Updating Game for {rgame.app_name}")
             rgame.update_rgame()
+            self.__update_index(rgame)
+            rgame.signals.widget.update.emit()
         else:
             rgame = RareGame(self.__core, self.__image_manager, game)
             self.__add_game(rgame)
         return rgame
 
     def __add_games_and_dlcs(self, games: List[Game], dlcs_dict: Dict[str, List]) -> None:
-        length = len(games)
-        for idx, game in enumerate(games):
-            rgame = self.__create_or_update_rgame(game)
-            if game_dlcs := dlcs_dict.get(rgame.game.catalog_item_id, False):
-                for dlc in game_dlcs:
-                    rdlc = self.__create_or_update_rgame(dlc)
-                    if rdlc not in rgame.owned_dlcs:
-                        rgame.add_dlc(rdlc)
-            # lk: since loading has to know about game state,
-            # validate installation just adding each RareGamesu
-            # TODO: this should probably be moved into RareGame
-            if rgame.is_installed and not (rgame.is_dlc or rgame.is_non_asset):
-                try:
-                    self.__validate_install(rgame)
-                except FileNotFoundError as e:
-                    logger.info(f'Marking "{rgame.app_title}" as not installed because an exception has occurred...')
-                    logger.error(e)
-                    rgame.set_installed(False)
-            progress = int(idx/length * self.__fetch_progress) + (100 - self.__fetch_progress)
-            self.progress.emit(progress, self.tr("Loaded <b>{}</b>").format(rgame.app_title))
+        with span("Build library", "RareCore", games=len(games)):
+            length = len(games)
+            validate: List[RareGame] = []
+            for idx, game in enumerate(games):
+                is_new = game.app_name not in self.__library
+                rgame = self.__create_or_update_rgame(game)
+                if game_dlcs := dlcs_dict.get(rgame.game.catalog_item_id, False):
+                    for dlc in game_dlcs:
+                        rdlc = self.__create_or_update_rgame(dlc)
+                        if rdlc not in rgame.owned_dlcs:
+                            rgame.add_dlc(rdlc)
+                    self.__update_index(rgame, self.__dynamic_indexes)
+                # lk: games that were already loaded have been validated when they were added
+                if is_new and rgame.is_installed and not (rgame.is_dlc or rgame.is_non_asset):
+                    validate.append(rgame)
+                progress = int(idx/length * self.__fetch_progress) + (100 - self.__fetch_progress)
+                self.progress.emit(progress, self.tr("Loaded <b>{}</b>").format(rgame.app_title))
+            self.__validate_installs(validate)
+
+    def __remove_game(self, rgame: RareGame) -> None:
+        for owner in self.__filter_games(lambda g: rgame in g.owned_dlcs):
+            owner.owned_dlcs.discard(rgame)
+            self.__update_index(owner, self.__dynamic_indexes)
+        self.__library.pop(rgame.app_name)
+        for index in self.__indexes.values():
+            index.pop(rgame.app_name, None)
+
+    def __reconcile_games_and_dlcs(
+        self, games: List[Game], dlcs_dict: Dict[str, List], complete: bool
+    ) -> Tuple[List, List, List]:
+        """
+        Apply the results of a fetch to the library that is already loaded
+
+        @param games: The fetched games
+        @param dlcs_dict: The fetched DLCs by catalog item id of their base game
+        @param complete: False if the fetch failed in part or returned nothing, games are not removed then
+        @return: The app_names of the added, changed and removed games
+        """
+        fetched = {game.app_name for game in chain(games, chain.from_iterable(dlcs_dict.values()))}
+        # lk: a failed, partial or empty fetch is more likely than games leaving the account
+        missing = list(self.__filter_games(lambda g: g.app_name not in fetched))
+        if missing and not complete:
+            logger.warning("Library fetch is incomplete, keeping %s games that are missing from it", len(missing))
+            missing = []
+        removed = []
+        for rgame in missing:
+            # lk: keep installed games even if they are not part of the account anymore
+            if rgame.is_installed:
+                continue
+            logger.info("Removing %s (%s) from the library", rgame.app_name, rgame.app_title)
+            self.__remove_game(rgame)
+            removed.append(rgame.app_name)
+        revisions = {app_name: self.__game_revision(rgame.game) for app_name, rgame in self.__library.items()}
+        self.__add_games_and_dlcs(games, dlcs_dict)
+        added = [app_name for app_name in self.__library if app_name not in revisions]
+        changed = [
+            app_name for app_name, revision in revisions.items()
+            if self.__game_revision(self.__library[app_name].game) != revision
+        ]
+        logger.info("Reconciled library, added: %s, changed: %s, removed: %s", len(added), len(changed), len(removed))
+        return added, changed, removed
+
+    @staticmethod
+    def __snapshot_path() -> Path:
+        return cache_dir().joinpath("library.json")
+
+    def __snapshot_key(self) -> Optional[Dict]:
+        if not (account_id := (self.__core.lgd.userdata or {}).get("account_id", None)):
+            return None
+        return {
+            "version": 1,
+            "account_id": account_id,
+            "unreal_meta": self.__settings.value(*options.unreal_meta),
+            "win32_meta": self.__settings.value(*options.win32_meta),
+            "macos_meta": self.__settings.value(*options.macos_meta),
+            "exclude_non_asset": self.__settings.value(*options.exclude_non_asset),
+        }
+
+    def __load_snapshot(self) -> Optional[Tuple[List[Game], Dict[str, List[Game]]]]:
+        """
+        Load the library as it was built by the last successful fetch
+
+        The snapshot is only used if it was created for the same account and with the same
+        metadata options. Installation state is not part of it, it is read from legendary.
+        """
+        if (key := self.__snapshot_key()) is None:
+            return None
+        try:
+            with open(self.__snapshot_path(), "rb") as file:
+                snapshot = orjson.loads(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning("Failed to load library snapshot: %s", e)
+            return None
+        if snapshot.get("key", None) != key:
+            logger.info("Library snapshot is outdated, ignoring it")
+            return None
+        games = [Game.from_json(game) for game in snapshot["games"]]
+        dlcs = {
+            catalog_id: [Game.from_json(dlc) for dlc in dlcs] for catalog_id, dlcs in snapshot["dlcs"].items()
+        }
+        return games, dlcs
+
+    def __save_snapshot(self, games: List[Game], dlcs_dict: Dict[str, List[Game]]) -> None:
+        if (key := self.__snapshot_key()) is None:
+            return
+        path = self.__snapshot_path()
+
+        def __save() -> None:
+            snapshot = {
+                "key": key,
+                "games": [game.__dict__ for game in games],
+                "dlcs": {catalog_id: [dlc.__dict__ for dlc in dlcs] for catalog_id, dlcs in dlcs_dict.items()},
+            }
+            try:
+                with timelogger(logger, "Save library snapshot"):
+                    with open(path.with_suffix(".tmp"), "wb") as file:
+                        file.write(orjson.dumps(snapshot))
+                    os.replace(path.with_suffix(".tmp"), path)
+            except OSError as e:
+                logger.error("Failed to save library snapshot: %s", e)
+
+        QThreadPool.globalInstance().start(QRunnable.create(__save))
 
     @pyqtSlot(int, str)
     def __on_fetch_progress(self, increment: int, message: str):
@@ -333,26 +561,61 @@ class RareCore(QObject):
     @pyqtSlot(object, int)
     def __on_fetch_result(self, result: Tuple, result_type: int):
         if result_type == FetchWorker.Result.GAMESDLCS:
-            self.__add_games_and_dlcs(*result)
+            games, dlcs_dict, complete = result
+            if self.__reconcile:
+                self.__reconciled = self.__reconcile_games_and_dlcs(games, dlcs_dict, complete)
+                save = any(self.__reconciled)
+            else:
+                self.__add_games_and_dlcs(games, dlcs_dict)
+                save = True
+            # lk: the snapshot is only replaced by the results of a successful full fetch
+            if save and complete:
+                self.__save_snapshot(games, dlcs_dict)
             self.__fetched_games_dlcs = True
 
         if result_type == FetchWorker.Result.ENTITLEMENTS:
             self.__core.lgd.entitlements = result
             self.__fetched_entitlements = True
 
+        if result_type == FetchWorker.Result.ENTITLEMENTS_CHANGED:
+            # lk: the library has been set up with the cached entitlements already
+            self.__core.lgd.entitlements = result
+            self.entitlements_changed.emit()
+            return
+
         logger.info("Acquired data from %s worker", FetchWorker.Result(result_type).name)
 
         if all([self.__fetched_games_dlcs, self.__fetched_entitlements]):
             logger.debug("Fetch time %s seconds", time.perf_counter() - self.__start_time)
+            tracer.complete("Fetch", "RareCore", self.__start_time, time.perf_counter())
             self.__wrappers.import_wrappers(
                 self.__core, self.__settings, [rgame.app_name for rgame in self.games]
             )
-            self.progress.emit(100, self.tr("Launching Rare"))
-            self.completed.emit()
+            if self.__reconcile:
+                self.reconciled.emit(*self.__reconciled)
+            else:
+                self.progress.emit(100, self.tr("Launching Rare"))
+                self.completed.emit()
             QTimer.singleShot(100, self.__post_init)
 
     def fetch(self):
         self.__start_time = time.perf_counter()
+        self.__fetch_progress = 0
+        self.__fetched_games_dlcs = False
+        self.__fetched_entitlements = False
+
+        # lk: show the library from the last run while the fetch is running, results are reconciled with it
+        self.__reconcile = bool(self.__library)
+        if not self.__reconcile and (snapshot := self.__load_snapshot()) is not None:
+            with timelogger(logger, "Load library snapshot"):
+                self.__add_games_and_dlcs(*snapshot)
+            self.__wrappers.import_wrappers(
+                self.__core, self.__settings, [rgame.app_name for rgame in self.games]
+            )
+            self.__reconcile = True
+            logger.debug("Snapshot load time %s seconds", time.perf_counter() - self.__start_time)
+            self.progress.emit(100, self.tr("Launching Rare"))
+            self.completed.emit()
 
         games_dlcs_worker = GamesDlcsWorker(self.__core, self.__args)
         games_dlcs_worker.signals.progress.connect(self.__on_fetch_progress)
@@ -376,14 +639,21 @@ class RareCore(QObject):
                         saves_dict[s.app_name] = [s]
                     else:
                         saves_dict[s.app_name].append(s)
-                for app_name, saves in saves_dict.items():
-                    if app_name not in self.__library.keys():
-                        continue
-                    self.__library[app_name].load_saves(saves)
             except (HTTPError, ConnectionError) as e:
                 logger.error("Exception while fetching saves from EGS.")
                 logger.error(e)
                 return
+            # lk: evaluating the saves walks each game's save path, do it for a few games at a time
+            with timelogger(logger, "Evaluate saves"), ThreadPoolExecutor(max_workers=4) as executor:
+                evaluations = [
+                    executor.submit(self.__library[app_name].load_saves, saves)
+                    for app_name, saves in saves_dict.items() if app_name in self.__library
+                ]
+                for evaluation in as_completed(evaluations):
+                    try:
+                        evaluation.result()
+                    except OSError as e:
+                        logger.error("Failed to evaluate saves: %s", e)
             logger.info(f"Saves: {len(saves_dict)}")
 
         saves_worker = QRunnable.create(__fetch)
@@ -396,6 +666,8 @@ class RareCore(QObject):
     def __post_init(self) -> None:
         if not self.__args.offline:
             self.fetch_saves()
+            self.__image_manager.populate([rgame.game for rgame in self.games_and_dlcs])
+            self.__image_manager.collect_garbage(rgame.app_name for rgame in self.games_and_dlcs)
         self.resolve_origin()
 
     @property
@@ -405,19 +677,19 @@ class RareCore(QObject):
 
     @property
     def games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: not game.is_dlc or game.is_launchable_addon)
+        return self.__indexed_games("games")
 
     @property
     def installed_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_installed and not game.is_dlc)
+        return self.__indexed_games("installed_games")
 
     @property
     def origin_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_origin and not game.is_dlc)
+        return self.__indexed_games("origin_games")
 
     @property
     def ubisoft_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_ubisoft and not game.is_dlc)
+        return self.__indexed_games("ubisoft_games")
 
     @property
     def game_list(self) -> Iterator[Game]:
@@ -437,27 +709,27 @@ class RareCore(QObject):
         """!
         RareGames that HAVE DLCs associated with them
         """
-        return self.__filter_games(lambda game: bool(game.owned_dlcs))
+        return self.__indexed_games("has_dlcs")
 
     @property
     def bit32_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_win32)
+        return self.__indexed_games("bit32_games")
 
     @property
     def mac_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_mac)
+        return self.__indexed_games("mac_games")
 
     @property
     def non_asset_games(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_non_asset)
+        return self.__indexed_games("non_asset_games")
 
     @property
     def unreal_engine(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.is_unreal)
+        return self.__indexed_games("unreal_engine")
 
     @property
     def updates(self) -> Iterator[RareGame]:
-        return self.__filter_games(lambda game: game.has_update)
+        return self.__indexed_games("updates")
 
     @property
     def saves(self) -> Iterator[RareSaveGame]:
@@ -471,5 +743,5 @@ class RareCore(QObject):
         """!
         RareGames that have SaveGameFiles associated with them
         """
-        return self.__filter_games(lambda game: bool(game.saves))
+        return self.__indexed_games("has_saves")
 
@@ -2,6 +2,7 @@ from .fetch import FetchWorker, GamesDlcsWorker, EntitlementsWorker
 from .install_info import InstallInfoWorker
 from .move import MoveWorker
 from .uninstall import UninstallWorker
+from .validate import ValidateWorker
 from .verify import VerifyWorker
 from .wine_resolver import OriginWineWorker
 from .worker import Worker, QueueWorker
@@ -1,7 +1,9 @@
 import platform
 from argparse import Namespace
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import IntEnum
 from logging import getLogger
+from typing import Callable, Dict, List, Optional, Tuple
 
 from PyQt5.QtCore import QObject, pyqtSignal, QSettings
 from requests.exceptions import HTTPError, ConnectionError
@@ -19,6 +21,7 @@ class FetchWorker(Worker):
         ERROR = 0
         GAMESDLCS = 1
         ENTITLEMENTS = 2
+        ENTITLEMENTS_CHANGED = 3
 
     class Signals(QObject):
         progress = pyqtSignal(int, str)
@@ -34,24 +37,91 @@ class FetchWorker(Worker):
 
 class EntitlementsWorker(FetchWorker):
 
+    def __request(self) -> List[Dict]:
+        with timelogger(logger, "Request entitlements"):
+            entitlements = self.core.egs.get_user_entitlements()
+        self.core.lgd.entitlements = entitlements
+        return entitlements
+
     def run_real(self):
 
         want_entitlements = not self.settings.value(*options.exclude_entitlements)
 
         entitlements = ()
-        if want_entitlements and not self.args.offline:
+        if not want_entitlements:
+            self.signals.result.emit(entitlements, FetchWorker.Result.ENTITLEMENTS)
+            return
+
+        # lk: legendary keeps the entitlements from the last request, use them right away, even if they are stale
+        cached = self.core.lgd.entitlements
+        age = self.core.lgd.entitlements_age
+        if cached is not None:
+            entitlements = cached
+        elif not self.args.offline:
             # Get entitlements, Ubisoft integration also uses them
             self.signals.progress.emit(0, self.signals.tr("Updating entitlements"))
-            with timelogger(logger, "Request entitlements"):
-                entitlements = self.core.egs.get_user_entitlements()
-            self.core.lgd.entitlements = entitlements
+            entitlements = self.__request()
+        if entitlements:
             logger.info(f"Entitlements: %s", len(list(entitlements)))
+            # lk: build the grant date index here instead of on the first sort by date
+            with timelogger(logger, "Index entitlements"):
+                _ = self.core.lgd.grant_dates
         self.signals.result.emit(entitlements, FetchWorker.Result.ENTITLEMENTS)
-        return
+
+        ttl = self.settings.value(*options.entitlements_ttl) * 3600
+        if cached is None or self.args.offline or age is None or age < ttl:
+            return
+
+        # lk: revalidate the stale entitlements in the background, report them only if they changed
+        logger.info("Cached entitlements are %s hours old, requesting them again", int(age // 3600))
+        try:
+            entitlements = self.__request()
+        except (HTTPError, ConnectionError) as e:
+            logger.error("Failed to request entitlements: %s", e)
+            return
+        if {ent.get("id", None) for ent in entitlements} != {ent.get("id", None) for ent in cached}:
+            logger.info("Entitlements changed: %s", len(entitlements))
+            self.signals.result.emit(entitlements, FetchWorker.Result.ENTITLEMENTS_CHANGED)
 
 
 class GamesDlcsWorker(FetchWorker):
 
+    @staticmethod
+    def __timed(title: str, func: Callable, *args, **kwargs):
+        with timelogger(logger, title):
+            return func(*args, **kwargs)
+
+    def __request(self, platforms: List[str], want_non_asset: bool) -> Tuple[Dict[str, List[Dict]], Optional[Future]]:
+        """
+        Request the asset lists and the library items concurrently
+
+        @param platforms: The platforms to request the assets of
+        @param want_non_asset: Request the library items for the non-asset games
+        @return: The assets by platform, and the future of the library items request
+        """
+        executor = ThreadPoolExecutor(max_workers=len(platforms) + 1, thread_name_prefix="FetchWorker")
+        assets = {
+            name: executor.submit(
+                self.__timed, f"Request {name} assets", self.core.egs.get_game_assets, platform=name
+            )
+            for name in platforms
+        }
+        library_items = None
+        if want_non_asset:
+            library_items = executor.submit(
+                self.__timed, "Request non-asset library items", self.core.egs.get_library_items
+            )
+        executor.shutdown(wait=False)
+
+        # lk: merge the results in a fixed order, platforms that failed are requested again by legendary
+        platform_assets = {}
+        for name, future in assets.items():
+            try:
+                platform_assets[name] = future.result()
+            except Exception as e:
+                logger.warning("Failed to request %s assets: %s", name, e)
+        return platform_assets, library_items
+
     def run_real(self):
 
         # Fetch regular EGL games with assets
@@ -65,68 +135,89 @@ class GamesDlcsWorker(FetchWorker):
         need_macos = platform.system() == "Darwin"
         need_windows = not any([want_win32, want_macos, need_macos]) and not self.args.offline
 
-        if want_win32:
-            logger.info(
-                "Requesting Win32 metadata due to %s, %s Unreal engine",
-                "settings" if want_win32 else "debug",
-                "with" if want_unreal else "without"
+        # lk: legendary always updates the assets for Windows and the installed platforms along with the
+        # lk: requested one, request all of them at once instead of once for every `get_game_and_dlc_list()`
+        platforms = []
+        if not self.args.offline and self.core.egs.user:
+            platforms = sorted(
+                {"Windows"}
+                | ({"Win32"} if want_win32 else set())
+                | ({"Mac"} if need_macos or want_macos else set())
+                | self.core.get_installed_platforms()
             )
-            self.signals.progress.emit(00, self.signals.tr("Updating game metadata for Windows"))
-            with timelogger(logger, "Request Win32 games"):
-                self.core.get_game_and_dlc_list(
-                    update_assets=not self.args.offline, platform="Win32", skip_ue=not want_unreal
+        with timelogger(logger, "Request library"):
+            platform_assets, library_items = self.__request(platforms, want_non_asset)
+        # lk: only a complete result may remove games from the library, see `RareCore.__reconcile_games_and_dlcs()`
+        complete = not self.args.offline and len(platform_assets) == len(platforms)
+
+        entitlements_ttl = self.settings.value(*options.entitlements_ttl) * 3600
+        with self.core.prefetched_assets(platform_assets, entitlements_ttl):
+            if want_win32:
+                logger.info(
+                    "Requesting Win32 metadata due to %s, %s Unreal engine",
+                    "settings" if want_win32 else "debug",
+                    "with" if want_unreal else "without"
                 )
-
-        if need_macos or want_macos:
-            logger.info(
-                "Requesting macOS metadata due to %s, %s Unreal engine",
-                "platform" if need_macos else "settings" if want_macos else "debug",
-                "with" if want_unreal else "without"
-            )
-            self.signals.progress.emit(15, self.signals.tr("Updating game metadata for macOS"))
-            with timelogger(logger, "Request macOS games"):
-                self.core.get_game_and_dlc_list(
-                    update_assets=not self.args.offline, platform="Mac", skip_ue=not want_unreal
+                self.signals.progress.emit(00, self.signals.tr("Updating game metadata for Windows"))
+                with timelogger(logger, "Request Win32 games"):
+                    self.core.get_game_and_dlc_list(
+                        update_assets=not self.args.offline, platform="Win32", skip_ue=not want_unreal
+                    )
+
+            if need_macos or want_macos:
+                logger.info(
+                    "Requesting macOS metadata due to %s, %s Unreal engine",
+                    "platform" if need_macos else "settings" if want_macos else "debug",
+                    "with" if want_unreal else "without"
                 )
-
-        if need_windows:
-            self.signals.progress.emit(00, self.signals.tr("Updating game metadata for Windows"))
-            logger.info(
-                "Requesting Windows metadata, %s Unreal engine",
-                "with" if want_unreal else "without"
-            )
-        with timelogger(logger, "Request Windows games"):
-            games, dlc_dict = self.core.get_game_and_dlc_list(
-                update_assets=need_windows, platform="Windows", skip_ue=not want_unreal
-            )
-        logger.info(f"Games: %s. Games with DLCs: %s", len(games), len(dlc_dict))
-
-        # Fetch non-asset games
-        if want_non_asset:
-            self.signals.progress.emit(30, self.signals.tr("Updating non-asset game metadata"))
-            try:
-                with timelogger(logger, "Request non-asset"):
-                    na_games, na_dlc_dict = self.core.get_non_asset_library_items(force_refresh=False, skip_ue=False)
-            except (HTTPError, ConnectionError) as e:
-                logger.error(f"Network error while fetching non asset games")
-                logger.error(e)
-                na_games, na_dlc_dict = ([], {})
-            # NOTE: This is here because of broken appIds from Epic
-            # https://discord.com/channels/826881530310819914/884510635642216499/1111321692703305729
-            except Exception as e:
-                logger.error("General exception while fetching non asset games from EGS.")
-                logger.error(e)
-                na_games, na_dlc_dict = ([], {})
-            logger.info("Non-asset: %s. Non-asset with DLCs: %s", len(na_games), len(na_dlc_dict))
-
-            # Combine the two games lists and the two dlc dictionaries between regular and non-asset results
-            games += na_games
-            for catalog_id, dlcs in na_dlc_dict.items():
-                if catalog_id in dlc_dict.keys():
-                    dlc_dict[catalog_id] += dlcs
-                else:
-                    dlc_dict[catalog_id] = dlcs
-            logger.info(f"Games: {len(games)}. Games with DLCs: {len(dlc_dict)}")
+                self.signals.progress.emit(15, self.signals.tr("Updating game metadata for macOS"))
+                with timelogger(logger, "Request macOS games"):
+                    self.core.get_game_and_dlc_list(
+                        update_assets=not self.args.offline, platform="Mac", skip_ue=not want_unreal
+                    )
+
+            if need_windows:
+                self.signals.progress.emit(00, self.signals.tr("Updating game metadata for Windows"))
+                logger.info(
+                    "Requesting Windows metadata, %s Unreal engine",
+                    "with" if want_unreal else "without"
+                )
+            with timelogger(logger, "Request Windows games"):
+                games, dlc_dict = self.core.get_game_and_dlc_list(
+                    update_assets=need_windows, platform="Windows", skip_ue=not want_unreal
+                )
+            logger.info(f"Games: %s. Games with DLCs: %s", len(games), len(dlc_dict))
+
+            # Fetch non-asset games
+            if want_non_asset:
+                self.signals.progress.emit(30, self.signals.tr("Updating non-asset game metadata"))
+                try:
+                    with timelogger(logger, "Request non-asset"):
+                        na_games, na_dlc_dict = self.core.get_non_asset_library_items(
+                            force_refresh=False, skip_ue=False, library_items=library_items.result()
+                        )
+                except (HTTPError, ConnectionError) as e:
+                    logger.error(f"Network error while fetching non asset games")
+                    logger.error(e)
+                    na_games, na_dlc_dict = ([], {})
+                    complete = False
+                # NOTE: This is here because of broken appIds from Epic
+                # https://discord.com/channels/826881530310819914/884510635642216499/1111321692703305729
+                except Exception as e:
+                    logger.error("General exception while fetching non asset games from EGS.")
+                    logger.error(e)
+                    na_games, na_dlc_dict = ([], {})
+                    complete = False
+                logger.info("Non-asset: %s. Non-asset with DLCs: %s", len(na_games), len(na_dlc_dict))
+
+                # Combine the two games lists and the two dlc dictionaries between regular and non-asset results
+                games += na_games
+                for catalog_id, dlcs in na_dlc_dict.items():
+                    if catalog_id in dlc_dict.keys():
+                        dlc_dict[catalog_id] += dlcs
+                    else:
+                        dlc_dict[catalog_id] = dlcs
+                logger.info(f"Games: {len(games)}. Games with DLCs: {len(dlc_dict)}")
 
         self.signals.progress.emit(40, self.signals.tr("Preparing library"))
-        self.signals.result.emit((games, dlc_dict), FetchWorker.Result.GAMESDLCS)
+        self.signals.result.emit((games, dlc_dict, complete and bool(games)), FetchWorker.Result.GAMESDLCS)
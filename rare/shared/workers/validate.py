@@ -0,0 +1,125 @@
+import os
+import platform
+from collections import deque
+from enum import IntEnum
+from functools import lru_cache
+from logging import getLogger
+from threading import Event, Lock
+from typing import Deque, List, Tuple
+
+from PyQt5.QtCore import pyqtSignal, QObject
+
+from rare.utils.metrics import span
+from .worker import Worker
+
+logger = getLogger("ValidateWorker")
+
+
+@lru_cache(maxsize=None)
+def _mount_points() -> Tuple[str, ...]:
+    # lk: read the mount table once, stat'ing the install paths could block on the devices we try to avoid
+    mounts = ["/"]
+    if platform.system() == "Linux":
+        try:
+            with open("/proc/self/mounts", "r", encoding="utf-8") as file:
+                # lk: spaces in mount points are escaped as \040
+                mounts.extend(line.split()[1].replace("\\040", " ") for line in file)
+        except OSError as e:
+            logger.warning("Failed to read mount points: %s", e)
+    elif platform.system() == "Darwin":
+        if os.path.isdir("/Volumes"):
+            mounts.extend(os.path.join("/Volumes", volume) for volume in os.listdir("/Volumes"))
+    return tuple(sorted(set(mounts), key=len, reverse=True))
+
+
+def device_key(path: str) -> str:
+    """
+    Find the device a path is on, without accessing the path itself
+
+    @param path: The path to look up
+    @return: The drive on Windows, the longest mount point containing the path otherwise
+    """
+    drive, _ = os.path.splitdrive(path)
+    if drive:
+        return drive.lower()
+    for mount in _mount_points():
+        if path == mount or path.startswith(mount.rstrip("/") + "/"):
+            return mount
+    return "/"
+
+
+class ValidateWorker(Worker):
+    """
+    Validates installations on a single device
+
+    Workers for the same device share a queue, so the number of workers started for a
+    device is the number of concurrent requests made to it. All workers share `cancel`,
+    once it is set they stop after the installation they are validating.
+    """
+
+    class Result(IntEnum):
+        OK = 0
+        MISSING = 1
+        NEEDS_VERIFICATION = 2
+        ERROR = 3
+
+    class Signals(QObject):
+        # str: app_name, int: ValidateWorker.Result, str: error message
+        result = pyqtSignal(str, int, str)
+
+    def __init__(self, queue: Deque[Tuple[str, str, str]], lock: Lock, cancel: Event):
+        super(ValidateWorker, self).__init__()
+        self.signals = ValidateWorker.Signals()
+        self.queue = queue
+        self.lock = lock
+        self.cancel = cancel
+
+    @staticmethod
+    def validate(install_path: str, executable: str) -> "ValidateWorker.Result":
+        if not os.path.exists(install_path):
+            return ValidateWorker.Result.MISSING
+        # lk: Case-insensitive search for the game's executable (example: Brothers - A Tale of two Sons)
+        executable_path = os.path.join(install_path, executable.replace("\\", "/").lstrip("/"))
+        file_list = map(str.lower, os.listdir(os.path.dirname(executable_path)))
+        if not os.path.basename(executable_path).lower() in file_list:
+            return ValidateWorker.Result.NEEDS_VERIFICATION
+        return ValidateWorker.Result.OK
+
+    def run_real(self):
+        while not self.cancel.is_set():
+            with self.lock:
+                if not self.queue:
+                    return
+                app_name, install_path, executable = self.queue.popleft()
+            try:
+                with span("Validate install", "ValidateWorker", app_name=app_name):
+                    result, message = self.validate(install_path, executable), ""
+            except FileNotFoundError as e:
+                result, message = ValidateWorker.Result.ERROR, str(e)
+            except OSError as e:
+                # lk: leave the installation as it is, the device might just be unavailable at the moment
+                logger.warning("Failed to validate %s: %s", app_name, e)
+                continue
+            if self.cancel.is_set():
+                return
+            self.signals.result.emit(app_name, result, message)
+
+    @staticmethod
+    def create(installs: List[Tuple[str, str, str]], per_device: int, cancel: Event) -> List["ValidateWorker"]:
+        """
+        Create the workers to validate a list of installations
+
+        @param installs: Tuples of app_name, install path and executable
+        @param per_device: Maximum number of concurrent workers for each device
+        @param cancel: Set to stop the workers between installations
+        @return: The workers, one queue per device is shared by at most `per_device` of them
+        """
+        queues = {}
+        for install in installs:
+            queues.setdefault(device_key(install[1]), deque()).append(install)
+        workers = []
+        for device, queue in queues.items():
+            logger.debug("Validating %s installations on %s", len(queue), device)
+            lock = Lock()
+            workers.extend(ValidateWorker(queue, lock, cancel) for _ in range(min(per_device, len(queue))))
+        return workers
@@ -0,0 +1,128 @@
+"""
+Cover conversion functions
+
+These functions only depend on QtGui's image classes and do not need a QApplication,
+so they can be used from worker threads as well as from worker processes. Keep the
+imports of this module light, it is imported by every process of the conversion pool.
+"""
+
+import os
+from concurrent import futures
+from multiprocessing import get_context
+from typing import Dict, Optional, Tuple, Union
+
+from PyQt5.QtCore import Qt, QSize, QRect, QRectF, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QBrush, QTransform, QPen
+
+from rare.models.image import ImageSize
+
+ImageData = Union[bytes, memoryview]
+
+_icon_overlay: Optional[QPainterPath] = None
+
+
+def _generate_icon_overlay(rect: QRect) -> QPainterPath:
+    global _icon_overlay
+    if _icon_overlay is not None:
+        return _icon_overlay
+    rounded_path = QPainterPath()
+    margin = 0.1
+    rounded_path.addRoundedRect(
+        QRectF(
+            rect.width() * margin,
+            rect.height() * margin,
+            rect.width() - (rect.width() * margin * 2),
+            rect.height() - (rect.width() * margin * 2)
+        ),
+        rect.height() * 0.2,
+        rect.height() * 0.2,
+    )
+    _icon_overlay = rounded_path
+    return _icon_overlay
+
+
+def convert_icon(cover: QImage) -> QImage:
+    icon_size = QSize(128, 128)
+    icon = QImage(icon_size, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(icon)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    painter.fillRect(icon.rect(), Qt.transparent)
+    overlay = _generate_icon_overlay(icon.rect())
+    brush = QBrush(cover)
+    scale = max(icon.width()/cover.width(), icon.height()/cover.height())
+    transform = QTransform().scale(scale, scale)
+    brush.setTransform(transform)
+    painter.fillPath(overlay, brush)
+    pen = QPen(Qt.black, 2)
+    painter.setPen(pen)
+    painter.drawPath(overlay)
+    painter.end()
+    return icon
+
+
+def encode_png(image: QImage) -> bytes:
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return data.data()
+
+
+def convert_cover(images: Dict[str, Optional[ImageData]], img_types: Tuple, icon_path: str, icon_format: str) -> bytes:
+    """
+    Create the cover of a game from its keyImages
+
+    @param images: Raw image data by keyImage type, None for missing types
+    @param img_types: keyImage types in order of preference for the cover
+    @param icon_path: Path to save the desktop icon to
+    @param icon_format: Image format of the desktop icon
+    @return: The cover encoded as PNG
+    """
+    cover_data = None
+    for image_type in img_types:
+        if images[image_type] is not None:
+            cover_data = images[image_type]
+            break
+
+    cover = QImage()
+    cover.loadFromData(cover_data)
+    cover.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    # lk: Images are not always 4/3, crop them to size
+    factor = min(cover.width() // 3, cover.height() // 4)
+    rem_w = (cover.width() - factor * 3) // 2
+    rem_h = (cover.height() - factor * 4) // 2
+    cover = cover.copy(rem_w, rem_h, factor * 3, factor * 4)
+
+    if images["DieselGameBoxLogo"] is not None:
+        logo = QImage()
+        logo.loadFromData(images["DieselGameBoxLogo"])
+        logo.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        if logo.width() > cover.width():
+            logo = logo.scaled(cover.width(), cover.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        painter = QPainter(cover)
+        painter.drawImage((cover.width() - logo.width()) // 2, cover.height() - logo.height(), logo)
+        painter.end()
+
+    cover = cover.scaled(ImageSize.Image.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    icon = convert_icon(cover)
+    icon.save(icon_path, format=icon_format)
+
+    # this is not required if we ever want to re-apply the alpha channel
+    # cover = cover.convertToFormat(QImage.Format_Indexed8)
+
+    # add the alpha channel back to the cover
+    cover = cover.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return encode_png(cover)
+
+
+def conversion_pool() -> futures.ProcessPoolExecutor:
+    """
+    Create a process pool for batch cover conversion, with one worker per core
+
+    Workers are spawned instead of forked, forking a process that runs Qt threads is not safe.
+    """
+    return futures.ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=get_context("spawn"))
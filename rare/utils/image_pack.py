@@ -0,0 +1,266 @@
+import hashlib
+import json
+import mmap
+import os
+from copy import deepcopy
+from logging import getLogger
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Dict, Iterable, Optional, Tuple, List
+
+logger = getLogger("ImagePack")
+
+
+class ImagePack:
+    """
+    Content-addressed, append-only store for image data.
+
+    Blobs are appended to `<name>.pack` and addressed by an md5 hex digest, either the one
+    supplied by the caller (for example the `md5` of a keyImage) or the digest of the data.
+    The location of each blob and the per-app records are kept in `<name>.idx`, a journal
+    of JSON lines which is replayed when the pack is opened. The last record for a key wins.
+
+    Reads return slices of a memory-map of the pack file, so they neither copy the data
+    nor need to deserialize anything.
+
+    Unreferenced blobs are only reclaimed by `compact()`, which rewrites both files.
+    """
+
+    def __init__(self, path: Path, name: str = "images"):
+        self.__pack_path = path.joinpath(f"{name}.pack")
+        self.__index_path = path.joinpath(f"{name}.idx")
+        self.__lock = RLock()
+        self.__blobs: Dict[str, Tuple[int, int]] = {}
+        self.__apps: Dict[str, Dict] = {}
+        self.__mmap: Optional[mmap.mmap] = None
+
+        self.__recover()
+        self.__pack = open(self.__pack_path, "ab")
+        self.__index = open(self.__index_path, "a", encoding="utf-8")
+        self.__load_index()
+        # lk: blobs written after this offset may not be referenced by a record yet, see `compact()`
+        self.__session_offset = os.path.getsize(self.__pack_path)
+
+    def __tmp_paths(self) -> Tuple[Path, Path]:
+        return (
+            self.__pack_path.with_name(f"{self.__pack_path.name}.tmp"),
+            self.__index_path.with_name(f"{self.__index_path.name}.tmp"),
+        )
+
+    def __recover(self) -> None:
+        # lk: finish or roll back a compaction that was interrupted
+        tmp_pack, tmp_index = self.__tmp_paths()
+        complete = False
+        if tmp_index.is_file():
+            with open(tmp_index, "rb") as index:
+                complete = any(line == b'{"compacted":true}\n' for line in index)
+        if complete:
+            logger.info("Completing interrupted compaction of %s", self.__pack_path)
+            if tmp_pack.is_file():
+                os.replace(tmp_pack, self.__pack_path)
+            os.replace(tmp_index, self.__index_path)
+        else:
+            tmp_pack.unlink(missing_ok=True)
+            tmp_index.unlink(missing_ok=True)
+
+    def __load_index(self) -> None:
+        pack_size = os.path.getsize(self.__pack_path)
+        with open(self.__index_path, "r", encoding="utf-8") as index:
+            for line in index:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # lk: a partially written line from an interrupted write, skip it
+                    logger.warning("Skipping corrupt line in %s", self.__index_path)
+                    continue
+                if "blob" in record:
+                    if record["offset"] + record["length"] > pack_size:
+                        logger.warning("Blob %s is outside of %s, dropping it", record["blob"], self.__pack_path)
+                        continue
+                    self.__blobs[record["blob"]] = (record["offset"], record["length"])
+                elif "compacted" in record:
+                    continue
+                elif "app" in record:
+                    if record["data"] is None:
+                        self.__apps.pop(record["app"], None)
+                    else:
+                        self.__apps[record["app"]] = record["data"]
+        logger.debug("Loaded %s blobs for %s apps from %s", len(self.__blobs), len(self.__apps), self.__pack_path)
+
+    def __journal(self, record: Dict) -> None:
+        self.__index.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.__index.flush()
+
+    def __remap(self) -> None:
+        # lk: do not close the previous map, memoryviews returned by `get()` might still reference it.
+        # lk: It will be closed when the last of them is garbage collected.
+        if os.path.getsize(self.__pack_path):
+            with open(self.__pack_path, "rb") as pack:
+                self.__mmap = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__blobs
+
+    def put(self, data: bytes, key: Optional[str] = None) -> str:
+        """
+        Store a blob in the pack
+
+        @param data: The data to store
+        @param key: The key to store the data under, defaults to the md5 of the data
+        @return: The key of the stored data
+        """
+        if key is None:
+            key = hashlib.md5(data).hexdigest()
+        with self.__lock:
+            if key in self.__blobs:
+                return key
+            self.__pack.seek(0, os.SEEK_END)
+            offset = self.__pack.tell()
+            self.__pack.write(data)
+            # lk: flush before journaling, the index must never point to data that is not written yet
+            self.__pack.flush()
+            self.__journal({"blob": key, "offset": offset, "length": len(data)})
+            self.__blobs[key] = (offset, len(data))
+        return key
+
+    def get(self, key: Optional[str]) -> Optional[memoryview]:
+        """
+        Get a read-only view of a blob in the pack
+
+        @param key: The key of the blob
+        @return: memoryview of the blob or None if it doesn't exist
+        """
+        with self.__lock:
+            if (location := self.__blobs.get(key, None)) is None:
+                return None
+            offset, length = location
+            if self.__mmap is None or offset + length > len(self.__mmap):
+                self.__remap()
+            return memoryview(self.__mmap)[offset:offset + length]
+
+    def size(self, key: Optional[str]) -> int:
+        """
+        Get the size of a blob in the pack
+
+        @param key: The key of the blob
+        @return: The size of the blob in bytes, 0 if it doesn't exist
+        """
+        with self.__lock:
+            return self.__blobs.get(key, (0, 0))[1]
+
+    def get_app(self, app_name: str) -> Optional[Dict]:
+        with self.__lock:
+            record = self.__apps.get(app_name, None)
+            return deepcopy(record)
+
+    def set_app(self, app_name: str, record: Dict) -> None:
+        with self.__lock:
+            self.__journal({"app": app_name, "data": record})
+            self.__apps[app_name] = deepcopy(record)
+
+    def remove_app(self, app_name: str) -> None:
+        with self.__lock:
+            if app_name not in self.__apps:
+                return
+            self.__journal({"app": app_name, "data": None})
+            self.__apps.pop(app_name)
+
+    def apps(self) -> List[str]:
+        with self.__lock:
+            return list(self.__apps.keys())
+
+    def compact(self, refs: Callable[[Dict], Iterable[Optional[str]]]) -> int:
+        """
+        Rewrite the pack and the index without the blobs that no record references anymore
+
+        Blobs written since the pack was opened are always kept, they might belong to a record
+        that is not stored yet. The new files are written next to the current ones and replace
+        them only when complete, an interrupted compaction is finished or rolled back on open.
+
+        @param refs: Callable returning the keys of the blobs that an app record references
+        @return: The number of bytes reclaimed
+        """
+        with self.__lock:
+            live = set()
+            for record in self.__apps.values():
+                live.update(key for key in refs(record) if key is not None)
+            blobs = sorted(self.__blobs.items(), key=lambda item: item[1][0])
+            keep = [(key, loc) for key, loc in blobs if key in live or loc[0] >= self.__session_offset]
+            old_size = os.path.getsize(self.__pack_path) + os.path.getsize(self.__index_path)
+            records_size = sum(len(json.dumps(record)) + 64 for record in self.__apps.values()) + len(blobs) * 80
+            if len(keep) == len(blobs) and os.path.getsize(self.__index_path) < records_size * 2:
+                # lk: nothing to drop and the journal is not much larger than the records it holds
+                return 0
+
+            tmp_pack, tmp_index = self.__tmp_paths()
+            new_blobs: Dict[str, Tuple[int, int]] = {}
+            session_offset = None
+            try:
+                with open(self.__pack_path, "rb") as src, open(tmp_pack, "wb") as dst:
+                    for key, (offset, length) in keep:
+                        if session_offset is None and offset >= self.__session_offset:
+                            session_offset = dst.tell()
+                        src.seek(offset)
+                        new_blobs[key] = (dst.tell(), length)
+                        dst.write(src.read(length))
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    if session_offset is None:
+                        session_offset = dst.tell()
+                with open(tmp_index, "w", encoding="utf-8") as index:
+                    for key, (offset, length) in new_blobs.items():
+                        index.write(json.dumps({"blob": key, "offset": offset, "length": length}, separators=(",", ":")))
+                        index.write("\n")
+                    for app_name, record in self.__apps.items():
+                        index.write(json.dumps({"app": app_name, "data": record}, separators=(",", ":")) + "\n")
+                    index.write(json.dumps({"compacted": True}, separators=(",", ":")) + "\n")
+                    index.flush()
+                    os.fsync(index.fileno())
+            except OSError as e:
+                logger.error("Failed to compact %s: %s", self.__pack_path, e)
+                tmp_pack.unlink(missing_ok=True)
+                tmp_index.unlink(missing_ok=True)
+                return 0
+
+            self.__pack.close()
+            self.__index.close()
+            if self.__mmap is not None:
+                try:
+                    self.__mmap.close()
+                except BufferError:
+                    pass
+                self.__mmap = None
+            index_path = self.__index_path
+            try:
+                os.replace(tmp_pack, self.__pack_path)
+            except OSError as e:
+                # lk: on Windows files that are still mapped can't be replaced, try again on the next run
+                logger.warning("Failed to replace %s, skipping compaction: %s", self.__pack_path, e)
+                tmp_pack.unlink(missing_ok=True)
+                tmp_index.unlink(missing_ok=True)
+            else:
+                self.__blobs = new_blobs
+                self.__session_offset = session_offset
+                try:
+                    os.replace(tmp_index, self.__index_path)
+                except OSError as e:
+                    # lk: keep journaling into the new index, it replaces the old one when the pack is opened again
+                    logger.warning("Failed to replace %s, it will be replaced on the next run: %s", index_path, e)
+                    index_path = tmp_index
+            self.__pack = open(self.__pack_path, "ab")
+            self.__index = open(index_path, "a", encoding="utf-8")
+            new_size = os.path.getsize(self.__pack_path) + os.path.getsize(index_path)
+        logger.info("Compacted %s, kept %s of %s blobs", self.__pack_path, len(keep), len(blobs))
+        return old_size - new_size
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__pack.close()
+            self.__index.close()
+            if self.__mmap is not None:
+                try:
+                    self.__mmap.close()
+                except BufferError:
+                    pass
+                self.__mmap = None
+
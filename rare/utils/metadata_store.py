@@ -0,0 +1,103 @@
+import atexit
+import os
+import time
+from logging import getLogger
+from pathlib import Path
+from threading import Condition, Lock, RLock, Thread
+from typing import Dict, Optional, Set
+
+import orjson
+
+logger = getLogger("MetadataStore")
+
+
+class MetadataStore:
+    """
+    Write-behind store for per-app records kept in a single JSON document.
+
+    Changes are applied in memory and marked dirty, the document is written once the
+    changes have settled for `delay` seconds instead of on every change. Writes go to a
+    temporary file which replaces the document only when complete, so an interrupted
+    write never leaves a truncated document behind, and happens outside of the lock on the
+    records so it doesn't block them. Pending changes are flushed when the interpreter exits.
+
+    A single writer thread waits out the delay, it is started by the first change after a
+    write and exits once it has written, later changes only move its deadline.
+    """
+
+    def __init__(self, path: Path, delay: float = 2.0):
+        self.__path = path
+        self.__delay = delay
+        self.__lock = RLock()
+        self.__write_lock = Lock()
+        self.__records: Optional[Dict[str, Dict]] = None
+        self.__dirty: Set[str] = set()
+        self.__wakeup = Condition(self.__lock)
+        self.__deadline: Optional[float] = None
+        self.__writer: Optional[Thread] = None
+        atexit.register(self.flush)
+
+    def __load(self) -> Dict[str, Dict]:
+        if self.__records is None:
+            records = {}
+            try:
+                with open(self.__path, "rb") as file:
+                    records = orjson.loads(file.read())
+            except FileNotFoundError:
+                logger.info("%s does not exist", self.__path)
+            except orjson.JSONDecodeError:
+                logger.warning("%s is corrupt", self.__path)
+            self.__records = records
+        return self.__records
+
+    def get(self, app_name: str) -> Optional[Dict]:
+        with self.__lock:
+            return self.__load().get(app_name, None)
+
+    def set(self, app_name: str, record: Dict) -> None:
+        with self.__lock:
+            self.__load()[app_name] = record
+            self.__dirty.add(app_name)
+            # lk: push the write back, writing while changes are still coming in is wasted
+            self.__deadline = time.monotonic() + self.__delay
+            if self.__writer is None:
+                self.__writer = Thread(target=self.__write_behind, name=type(self).__name__, daemon=True)
+                self.__writer.start()
+
+    def __write_behind(self) -> None:
+        while True:
+            with self.__lock:
+                while self.__deadline is not None and (remaining := self.__deadline - time.monotonic()) > 0:
+                    self.__wakeup.wait(remaining)
+                if self.__deadline is None:
+                    self.__writer = None
+                    return
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending changes to disk
+        """
+        with self.__write_lock:
+            # lk: only take the snapshot under the lock, readers and writers shouldn't wait on the disk
+            with self.__lock:
+                self.__deadline = None
+                self.__wakeup.notify_all()
+                if not self.__dirty:
+                    return
+                dirty, self.__dirty = self.__dirty, set()
+                data = orjson.dumps(self.__records, option=orjson.OPT_INDENT_2)
+            tmp_path = self.__path.with_name(f"{self.__path.name}.tmp")
+            try:
+                with open(tmp_path, "wb") as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.__path)
+            except OSError as e:
+                # lk: mark the changes dirty again, they will be written with the next flush
+                logger.error("Failed to write %s: %s", self.__path, e)
+                with self.__lock:
+                    self.__dirty.update(dirty)
+                return
+            logger.debug("Wrote %s changed records to %s", len(dirty), self.__path)
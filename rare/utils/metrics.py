@@ -1,10 +1,142 @@
+import json
+import os
+import threading
 import time
 from contextlib import contextmanager
-from logging import Logger
+from logging import Logger, getLogger
+from typing import Dict, List, Optional, Set
+
+logger = getLogger("Tracer")
+
+
+class Tracer:
+    """
+    Records spans of work in memory and writes them as a Chrome trace.
+
+    The trace can be opened in chrome://tracing or https://ui.perfetto.dev. Spans on the same
+    thread are nested by their timestamps, each thread is shown as a separate track. Recording
+    is disabled by default, while it is disabled every call is a no-op.
+    """
+
+    def __init__(self):
+        self.__enabled: bool = False
+        self.__origin: float = time.perf_counter()
+        self.__events: List[Dict] = []
+        self.__threads: Dict[int, str] = {}
+        self.__marks: Set[str] = set()
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def enable(self) -> None:
+        self.__enabled = True
+
+    def __timestamp(self, counter: float) -> float:
+        # lk: Chrome traces use microseconds
+        return (counter - self.__origin) * 1e6
+
+    def __thread_id(self) -> int:
+        thread_id = threading.get_native_id()
+        if thread_id not in self.__threads:
+            self.__threads[thread_id] = threading.current_thread().name
+        return thread_id
+
+    def complete(self, name: str, category: str, start: float, end: float, args: Optional[Dict] = None) -> None:
+        """
+        Record a span that has finished
+
+        @param name: The name of the span
+        @param category: The category of the span, usually the name of the logger
+        @param start: The `time.perf_counter()` at the start of the span
+        @param end: The `time.perf_counter()` at the end of the span
+        @param args: Additional information shown with the span
+        """
+        if not self.__enabled:
+            return
+        event = {
+            "name": name, "cat": category, "ph": "X",
+            "ts": self.__timestamp(start), "dur": (end - start) * 1e6,
+            "pid": os.getpid(), "tid": self.__thread_id(),
+        }
+        if args:
+            event["args"] = args
+        with self.__lock:
+            self.__events.append(event)
+
+    def mark(self, name: str, category: str = "rare", once: bool = False) -> None:
+        """
+        Record an instant event
+
+        @param name: The name of the event
+        @param category: The category of the event
+        @param once: Only record the first event with this name
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            if once and name in self.__marks:
+                return
+            self.__marks.add(name)
+            self.__events.append({
+                "name": name, "cat": category, "ph": "i", "s": "p",
+                "ts": self.__timestamp(time.perf_counter()),
+                "pid": os.getpid(), "tid": self.__thread_id(),
+            })
+
+    def write(self, path: str) -> None:
+        """
+        Write the recorded events as a Chrome trace
+
+        @param path: The file to write the trace to
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            events = list(self.__events)
+            threads = dict(self.__threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, file)
+        except OSError as e:
+            logger.error("Failed to write trace to %s: %s", path, e)
+            return
+        logger.info("Wrote %s trace events to %s", len(events), path)
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, category: str = "rare", **kwargs):
+    """
+    Record the enclosed block as a span of the trace
+
+    @param name: The name of the span
+    @param category: The category of the span
+    @param kwargs: Additional information shown with the span
+    """
+    if not tracer.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.complete(name, category, start, time.perf_counter(), kwargs)
 
 
 @contextmanager
 def timelogger(logger: Logger, title: str):
     start = time.perf_counter()
-    yield
-    logger.debug("%s: %s seconds", title, time.perf_counter() - start)
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        logger.debug("%s: %s seconds", title, end - start)
+        tracer.complete(title, logger.name, start, end)
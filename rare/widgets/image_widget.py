@@ -16,6 +16,7 @@ from PyQt5.QtGui import (
 from PyQt5.QtWidgets import QWidget
 
 from rare.models.image import ImageSize
+from rare.utils.metrics import tracer
 
 OverlayPath = Tuple[QPainterPath, Union[QColor, QLinearGradient]]
 
@@ -48,20 +49,20 @@ class ImageWidget(QWidget):
         if not pixmap.isNull():
             self._pixmap = pixmap
             self.paint_image = self.paint_image_cover
-            if not self._image_size:
-                self._transform = QTransform().scale(
-                    1 / pixmap.devicePixelRatioF(),
-                    1 / pixmap.devicePixelRatioF(),
-                )
-            else:
-                self._transform = QTransform().scale(
-                    1 / pixmap.devicePixelRatioF() / self._image_size.divisor,
-                    1 / pixmap.devicePixelRatioF() / self._image_size.divisor,
-                )
+            scale = 1 / pixmap.devicePixelRatioF()
+            # lk: pixmaps already scaled to the preset's size are painted as they are,
+            # lk: others are downscaled during painting
+            if self._image_size and abs(pixmap.width() * scale - self._image_size.size.width()) >= 1:
+                scale /= self._image_size.divisor
+            self._transform = QTransform().scale(scale, scale)
         else:
+            self._pixmap = None
             self.paint_image = self.paint_image_empty
         self.update()
 
+    def pixmap(self) -> Optional[QPixmap]:
+        return self._pixmap
+
     def sizeHint(self) -> QSize:
         return self._image_size.size if self._image_size else super(ImageWidget, self).sizeHint()
 
@@ -149,6 +150,8 @@ class ImageWidget(QWidget):
             return
         # helps with better image quality
         painter.setRenderHint(QPainter.SmoothPixmapTransform, self._smooth_transform)
+        if self._pixmap is not None:
+            tracer.mark("First image paint", "ImageWidget", once=True)
         self.paint_image(painter, a0)
         self.paint_overlay(painter, a0)
         painter.end()
@@ -0,0 +1,48 @@
+from typing import Callable, Optional
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QShowEvent
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+from rare.utils.metrics import span
+
+
+class LazyWidget(QWidget):
+    """
+    Placeholder that creates its contents the first time it is shown.
+
+    Use it for pages that are expensive to build or import and are not needed at startup.
+    Import the contents' module inside the factory to defer the import as well.
+    """
+
+    # QWidget: the created contents
+    created = pyqtSignal(QWidget)
+
+    def __init__(self, factory: Callable[[QWidget], QWidget], parent=None):
+        super(LazyWidget, self).__init__(parent=parent)
+        self.__factory = factory
+        self.__widget: Optional[QWidget] = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def widget(self) -> QWidget:
+        """
+        Get the contents, creating them if they have not been created yet
+
+        @return: The contents
+        """
+        if self.__widget is None:
+            with span(f"Create {getattr(self.__factory, '__qualname__', 'contents')}", "LazyWidget"):
+                self.__widget = self.__factory(self)
+            self.layout().addWidget(self.__widget)
+            self.created.emit(self.__widget)
+        return self.__widget
+
+    def showEvent(self, a0: QShowEvent) -> None:
+        if a0.spontaneous():
+            return super().showEvent(a0)
+        self.widget()
+        super().showEvent(a0)
+
+
+__all__ = ["LazyWidget"]
@@ -22,9 +22,10 @@ from PyQt5.QtCore import (
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication, QMessageBox
 
-import rare.resources.resources
+import rare.resources
 from rare.models.options import options
 from rare.utils import paths
+from rare.utils.metrics import tracer
 from rare.utils.misc import set_color_pallete, set_style_sheet, get_static_style
 
 
@@ -82,6 +83,9 @@ class RareApp(QApplication):
             filename=os.path.join(paths.log_dir(), log_file.format(start_time)),
             encoding="utf-8",
         )
+        if tracer.enabled:
+            trace_file = os.path.join(paths.log_dir(), f"{os.path.splitext(log_file.format(start_time))[0]}.trace.json")
+            self.aboutToQuit.connect(lambda: tracer.write(trace_file))
         file_handler.setFormatter(fmt=logging.Formatter("[%(name)s] %(levelname)s: %(message)s"))
 
         # Set up common logging channel to stderr